@@ -1,270 +1,826 @@
-import google.generativeai as genai
-import os
-import json
-from typing import Dict, List, Optional
-import cv2
-from datetime import datetime
-from dotenv import load_dotenv
-import base64
-import tempfile
-from PIL import Image
-import numpy as np
-
-# Load environment variables from .env file
-load_dotenv()
-
-class AIMetadataGenerator:
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize the AI Metadata Generator with Gemini 2.0 Flash"""
-        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
-        if not self.api_key:
-            raise ValueError("Gemini API key not found. Please set GEMINI_API_KEY in .env file or pass it as parameter.")
-        
-        genai.configure(api_key=self.api_key) # type: ignore
-        self.model = genai.GenerativeModel('gemini-2.0-flash-exp') # type: ignore
-    
-    def extract_video_frames(self, video_path: str, num_frames: int = 3) -> List[str]:
-        """Extract representative frames from video for AI analysis"""
-        try:
-            cap = cv2.VideoCapture(video_path)
-            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            frames = []
-            
-            # Extract frames at regular intervals
-            for i in range(num_frames):
-                frame_number = int((i + 1) * frame_count / (num_frames + 1))
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-                ret, frame = cap.read()
-                
-                if ret:
-                    # Convert BGR to RGB
-                    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    # Convert to PIL Image
-                    pil_image = Image.fromarray(frame_rgb)
-                    # Resize for efficient processing
-                    pil_image = pil_image.resize((512, 512), Image.Resampling.LANCZOS)
-                    frames.append(pil_image)
-            
-            cap.release()
-            return frames
-            
-        except Exception as e:
-            print(f"Error extracting frames: {e}")
-            return []
-    
-    def analyze_video_content(self, video_path: str) -> str:
-        """Analyze video content using AI vision to understand what's in the video frames"""
-        try:
-            # Extract video frames
-            frames = self.extract_video_frames(video_path, 3)  # Increased to 3 frames for better coverage
-            if not frames:
-                return "Unable to analyze video content"
-            
-            # Analyze frames for text and visual content
-            combined_analysis = []
-            
-            for i, frame in enumerate(frames):
-                prompt = f"""
-                Analyze this video frame {i+1} and describe what you see in detail. Focus on:
-                1. Any visible text in the frame
-                2. Main subject/person and their actions
-                3. Setting/location 
-                4. Key objects or activities visible
-                5. Overall mood and style
-                
-                Extract any text that appears in the image if present.
-                Provide detailed analysis of what's shown in the frame.
-                """
-                
-                response = self.model.generate_content([prompt, frame])
-                combined_analysis.append(response.text.strip())
-            
-            # Combine analyses from all frames
-            final_prompt = f"""
-            Based on the following analyses of different frames from a video, provide a comprehensive understanding of what the video is about:
-            
-            FRAME ANALYSES:
-            {' '.join(combined_analysis)}
-            
-            Create a concise summary that captures the essence of this video, focusing especially on any text that appears in the frames.
-            """
-            
-            final_response = self.model.generate_content(final_prompt)
-            return final_response.text.strip()
-            
-        except Exception as e:
-            print(f"Error analyzing video content: {e}")
-            return "Video content analysis unavailable"
-    
-    def generate_title(self, video_analysis: str) -> str:
-        """Generate engaging YouTube shorts title with hashtags based on text and visual content"""
-        prompt = f"""
-        Based on this video analysis, create a catchy YouTube Shorts title:
-        
-        VIDEO CONTENT: {video_analysis}
-        
-        Requirements:
-        - Make it extremely engaging, click-worthy and optimized for high CTR
-        - Keep it under 60 characters including hashtags
-        - Include 2-3 relevant hashtags directly in the title
-        - Focus on the most intriguing aspect of the video, especially any text that appears in the video
-        - Use trending language patterns popular in viral shorts
-        - Consider using emojis strategically
-        - Make it provocative but not clickbait
-        
-        The title should follow formats that are proven to work for viral shorts.
-        Return only the title with hashtags, nothing else.
-        """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip().replace('"', '').replace("'", "")
-        except Exception as e:
-            print(f"Error generating title: {e}")
-            return "🔥 Viral Moment You Won't Believe! #shorts #viral #trending"
-    
-    def generate_description(self, video_analysis: str) -> str:
-        """Generate YouTube shorts description optimized for virality based on text and visual content"""
-        prompt = f"""
-        Create a YouTube Shorts description based on this video analysis:
-        
-        VIDEO CONTENT: {video_analysis}
-        
-        Structure the description exactly like this:
-        
-        1. Write exactly 3-5 lines of engaging, high-emotion description that creates curiosity
-        2. Add a line break then write "Keywords:" followed by exactly 20 trending keywords separated by commas
-        3. Add a line break then write "Hashtags:" followed by exactly 15 viral hashtags (MUST include #shorts, #viral, #trending and other relevant ones)
-        4. Add a line break then add this call-to-action: "👉 Follow for more content like this! 🔔 Turn on notifications!"
-        5. Add this copyright disclaimer: "⚠️ Copyright Disclaimer: All rights to respective owners."
-        
-        Make the description extremely engaging and optimized for Shorts algorithm with high-emotion language patterns.
-        Focus on keywords and hashtags that are currently trending for short-form viral content.
-        If there was any text in the video, incorporate it into the description.
-        """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
-        except Exception as e:
-            print(f"Error generating description: {e}")
-            return self._fallback_description()
-    
-    def generate_tags_and_keywords(self, video_analysis: str) -> Dict:
-        """Generate optimized tags and keywords specifically for viral shorts"""
-        prompt = f"""
-        Based on this video analysis, generate optimized tags and keywords for a viral YouTube Short:
-        
-        VIDEO CONTENT: {video_analysis}
-        
-        Provide your response as JSON with these exact fields:
-        1. "tags": List of 30 tags optimized for YouTube search algorithm (keep each under 30 characters)
-        2. "keywords": List of 40 relevant keywords (single words or short phrases) related to the content
-        3. "trending_keywords": List of 15 currently trending keywords related to the content
-        
-        Tags should include general category terms, specific content descriptors, and trending terms.
-        Format the response as valid JSON only - no explanation or other text.
-        """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            result = json.loads(response.text.strip())
-            return result
-        except Exception as e:
-            print(f"Error generating tags and keywords: {e}")
-            return {
-                "tags": ["shorts", "viral", "trending"],
-                "keywords": ["viral video", "trending content", "shorts"],
-                "trending_keywords": ["viral shorts", "trending now"]
-            }
-    
-    def _fallback_description(self) -> str:
-        """Fallback description when AI generation fails"""
-        return """Amazing video content that will keep you entertained!
-Watch this incredible moment captured on video.
-Perfect for sharing with friends and family.
-Don't forget to like and subscribe for more content.
-This video showcases some really cool stuff.
-You won't believe what happens in this video.
-Make sure to watch until the end.
-Comment below what you think about this.
-Share this video if you enjoyed it.
-Thanks for watching our content!
-
-Keywords: viral video, trending content, amazing moments, entertainment, social media, short video, funny clips, must watch, incredible, awesome, cool stuff, viral clips, trending now, popular video, engaging content, shareable, entertaining, video content, social sharing, watch now
-
-Hashtags: #shorts #viral #trending #amazing #entertainment #video #content #socialmedia #funny #cool #awesome #mustwatch #incredible #popular #engaging #shareable #entertaining #videooftheday #trend #viral2024 #shortsvideo #viralshorts #trendingshorts #amazingvideo #viralcontent #shortsfeed #explore #fyp #foryou #viralmoment
-
-⚠️ Copyright Disclaimer: This content is used for educational and entertainment purposes. All rights belong to their respective owners. If you are the owner and want this removed, please contact us."""
-    
-    def generate_complete_metadata(self, video_path: str, **kwargs) -> Dict:
-        """Generate complete metadata package based on video frame analysis"""
-        
-        print("🤖 Analyzing video frames with AI...")
-        video_analysis = self.analyze_video_content(video_path)
-        print(f"📹 Video analysis complete")
-        
-        print("🎯 Generating viral shorts title with hashtags...")
-        title = self.generate_title(video_analysis)
-        
-        print("📝 Generating description optimized for shorts...")
-        description = self.generate_description(video_analysis)
-        
-        print("🏷️ Generating optimized tags and keywords...")
-        tags_keywords = self.generate_tags_and_keywords(video_analysis)
-        
-        # Extract hashtags from description
-        description_lines = description.split('\n')
-        hashtags = []
-        keywords = []
-        
-        for line in description_lines:
-            if line.startswith('Hashtags:'):
-                hashtags_text = line.replace('Hashtags:', '').strip()
-                hashtags = [tag.strip() for tag in hashtags_text.split() if tag.startswith('#')]
-            elif line.startswith('Keywords:'):
-                keywords_text = line.replace('Keywords:', '').strip()
-                keywords = [kw.strip() for kw in keywords_text.split(',')]
-        
-        metadata = {
-            "video_analysis": video_analysis,
-            "title": title,
-            "description": description,
-            "tags": tags_keywords.get("tags", []),
-            "hashtags": hashtags,
-            "keywords": tags_keywords.get("keywords", []),
-            "trending_keywords": tags_keywords.get("trending_keywords", []),
-            "generated_at": datetime.now().isoformat()
-        }
-        
-        return metadata
-    
-    def save_metadata(self, metadata: Dict, output_path: str):
-        """Save metadata to JSON file"""
-        try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
-            print(f"Metadata saved to: {output_path}")
-        except Exception as e:
-            print(f"Error saving metadata: {e}")
-
-# Example usage
-if __name__ == "__main__":
-    # Initialize the generator (API key will be loaded from .env)
-    generator = AIMetadataGenerator()
-    
-    # Example video processing
-    video_path = r"c:\Users\DELL\OneDrive\Desktop\youtube automation ai\sample_video.mp4"
-    
-    # Generate complete metadata
-    metadata = generator.generate_complete_metadata(video_path=video_path)
-    
-    # Print results
-    print("Generated Metadata:")
-    print("-" * 50)
-    print(f"Title: {metadata['title']}")
-    print(f"\nDescription:\n{metadata['description']}")
-    
-    # Save to file
-    output_file = r"c:\Users\DELL\OneDrive\Desktop\youtube automation ai\metadata_output.json"
+from __future__ import annotations
+
+import os
+import json
+import time
+import asyncio
+import contextvars
+from typing import Dict, List, Optional
+from datetime import datetime
+from dotenv import load_dotenv
+import base64
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from metadata_cache import MetadataCache, get_metadata_cache
+from downloader import file_sha256
+from rate_limiter import acquire_gemini, acquire_gemini_async
+from metrics import gemini_calls, gemini_failures, gemini_seconds, stage_seconds
+from lazy_imports import lazy_import
+
+# Heavy dependencies load on first use, so importing this module (and app.py) stays cheap
+genai = lazy_import('google.generativeai')
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+Image = lazy_import('PIL.Image')
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Bump whenever prompts or output post-processing change, so cached metadata is regenerated
+PROMPT_VERSION = "1"
+
+# Rough token accounting for the Gemini TPM limiter
+TOKENS_PER_IMAGE = 258
+OUTPUT_TOKEN_ALLOWANCE = 1024
+
+# Set while running Gemini calls whose rate-limiter slots the caller already took
+_limiter_reserved = contextvars.ContextVar('gemini_limiter_reserved', default=False)
+
+# 'multi' uses separate title/description/tags prompts; 'structured' gets everything from one JSON-schema call
+METADATA_MODES = ('multi', 'structured')
+
+# YouTube Data API limits for video snippets
+YOUTUBE_TITLE_MAX_CHARS = 100
+YOUTUBE_DESCRIPTION_MAX_CHARS = 5000
+YOUTUBE_TAGS_MAX_CHARS = 500
+
+# Response schema for structured metadata generation
+METADATA_RESPONSE_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'title': {'type': 'string'},
+        'description': {'type': 'string'},
+        'hashtags': {'type': 'array', 'items': {'type': 'string'}},
+        'keywords': {'type': 'array', 'items': {'type': 'string'}},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+        'trending_keywords': {'type': 'array', 'items': {'type': 'string'}}
+    },
+    'required': ['title', 'description', 'hashtags', 'keywords', 'tags']
+}
+
+def dhash(image: np.ndarray, hash_size: int = 8) -> int:
+    """Difference hash of an RGB or grayscale frame as a hash_size*hash_size-bit integer"""
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count('1')
+
+def enforce_youtube_limits(title: str, description: str, tags: List[str]):
+    """Clamp title, description and tags to what videos.insert accepts; returns (title, description, tags)"""
+    # Angle brackets are rejected in titles and descriptions
+    title = title.replace('<', '').replace('>', '').strip()[:YOUTUBE_TITLE_MAX_CHARS]
+    description = description.replace('<', '').replace('>', '').strip()[:YOUTUBE_DESCRIPTION_MAX_CHARS]
+    
+    # The tag budget counts separating commas, and tags with spaces are quoted (+2 characters)
+    kept_tags = []
+    used = 0
+    for tag in tags:
+        tag = str(tag).replace('<', '').replace('>', '').replace(',', '').strip()
+        if not tag or tag in kept_tags:
+            continue
+        cost = len(tag) + (2 if ' ' in tag else 0) + (1 if kept_tags else 0)
+        if used + cost > YOUTUBE_TAGS_MAX_CHARS:
+            continue
+        kept_tags.append(tag)
+        used += cost
+    
+    return title, description, kept_tags
+
+# 'batched' sends all frames in one multimodal request; 'per_frame' makes one call per frame plus a summary call
+FRAME_ANALYSIS_MODES = ('batched', 'per_frame')
+
+class AIMetadataGenerator:
+    def __init__(self, api_key: Optional[str] = None, model_name: str = 'gemini-2.0-flash-exp',
+                 cache: Optional[MetadataCache] = None, frame_analysis_mode: Optional[str] = None,
+                 num_frames: Optional[int] = None, metadata_mode: Optional[str] = None):
+        """Initialize the AI Metadata Generator with Gemini 2.0 Flash"""
+        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+        if not self.api_key:
+            raise ValueError("Gemini API key not found. Please set GEMINI_API_KEY in .env file or pass it as parameter.")
+        
+        endpoint = os.getenv('GEMINI_API_ENDPOINT')
+        if endpoint:
+            # Alternative endpoint (a proxy, or the local stand-in used by the benchmarks)
+            genai.configure(api_key=self.api_key, transport='rest', client_options={'api_endpoint': endpoint}) # type: ignore
+        else:
+            genai.configure(api_key=self.api_key) # type: ignore
+        self.transport = 'rest' if endpoint else 'grpc'
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name) # type: ignore
+        self.cache = cache
+        self.frame_analysis_mode = frame_analysis_mode or os.getenv('FRAME_ANALYSIS_MODE', 'batched')
+        if self.frame_analysis_mode not in FRAME_ANALYSIS_MODES:
+            raise ValueError(f"Unknown frame analysis mode: {self.frame_analysis_mode}")
+        self.num_frames = num_frames or int(os.getenv('AI_NUM_FRAMES', '3'))
+        self.metadata_mode = metadata_mode or os.getenv('AI_METADATA_MODE', 'multi')
+        if self.metadata_mode not in METADATA_MODES:
+            raise ValueError(f"Unknown metadata mode: {self.metadata_mode}")
+        # Per-request timeout for Gemini calls, in seconds
+        self.call_timeout = float(os.getenv('GEMINI_CALL_TIMEOUT', '60'))
+        # Frames whose dHash is within this Hamming distance of a kept frame are dropped (-1 disables)
+        self.duplicate_frame_distance = int(os.getenv('DUPLICATE_FRAME_DISTANCE', '6'))
+        # Near-duplicate frames dropped during the current generation
+        self._frames_skipped = 0
+        # Stages that fell back to canned output during the current generation
+        self._fallbacks = []
+    
+    def extract_video_frames(self, video_path: str, num_frames: int = 3) -> List[Image.Image]:
+        """Extract the most visually distinct keyframes from video for AI analysis.
+
+        Decodes the video in one sequential pass: every frame is grab()bed but only
+        sampled candidates are retrieve()d, then the top num_frames candidates are
+        picked by histogram distance so near-identical shots aren't sent twice.
+        """
+        try:
+            cap = cv2.VideoCapture(video_path)
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30
+            
+            max_candidates = max(num_frames * 8, 24)
+            if frame_count > 0:
+                stride = max(1, frame_count // max_candidates)
+            else:
+                # Unknown length: start at one candidate per second and thin out as needed
+                stride = max(1, int(round(fps)))
+            
+            candidates = []  # (frame_index, 512x512 RGB frame, grayscale thumbnail)
+            frame_index = -1
+            while cap.grab():
+                frame_index += 1
+                if (frame_index - stride // 2) % stride != 0:
+                    continue
+                ret, frame = cap.retrieve()
+                if not ret:
+                    continue
+                
+                # Resize for efficient processing, and keep a tiny grayscale copy for scoring
+                frame_rgb = cv2.cvtColor(cv2.resize(frame, (512, 512), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2RGB)
+                thumbnail = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (64, 36), interpolation=cv2.INTER_AREA)
+                candidates.append((frame_index, frame_rgb, thumbnail))
+                
+                if len(candidates) > max_candidates:
+                    # Keep memory bounded by dropping every other candidate and halving the sampling rate
+                    candidates = candidates[::2]
+                    stride *= 2
+            
+            cap.release()
+            
+            selected = self._select_distinct_frames([c[2] for c in candidates], num_frames)
+            return [Image.fromarray(candidates[i][1]) for i in selected]
+            
+        except Exception as e:
+            print(f"Error extracting frames: {e}")
+            return []
+    
+    @staticmethod
+    def _select_distinct_frames(thumbnails: List[np.ndarray], num_frames: int) -> List[int]:
+        """Indices (in time order) of the num_frames thumbnails that differ most from each other"""
+        if len(thumbnails) <= num_frames:
+            return list(range(len(thumbnails)))
+        
+        # Normalized 32-bin intensity histograms for every candidate at once
+        stack = np.stack(thumbnails).reshape(len(thumbnails), -1)
+        bins = np.minimum(stack // 8, 31).astype(np.int64)
+        offsets = np.arange(len(thumbnails))[:, None] * 32
+        histograms = np.bincount((bins + offsets).ravel(), minlength=len(thumbnails) * 32)
+        histograms = histograms.reshape(len(thumbnails), 32) / stack.shape[1]
+        
+        # Pairwise L1 histogram distances
+        distances = np.abs(histograms[:, None, :] - histograms[None, :, :]).sum(axis=2)
+        
+        # Seed with the strongest scene change, then greedily add the candidate farthest from those chosen
+        scene_change = np.concatenate([[0.0], np.abs(np.diff(histograms, axis=0)).sum(axis=1)])
+        selected = [int(np.argmax(scene_change))]
+        min_distance = distances[selected[0]].copy()
+        for _ in range(num_frames - 1):
+            min_distance[selected] = -1
+            next_index = int(np.argmax(min_distance))
+            selected.append(next_index)
+            min_distance = np.minimum(min_distance, distances[next_index])
+        
+        return sorted(selected)
+    
+    def suppress_duplicate_frames(self, frames: List[Image.Image]):
+        """Drop frames that are perceptually near-identical to an earlier kept frame; returns (frames, skipped)"""
+        if self.duplicate_frame_distance < 0 or len(frames) < 2:
+            return frames, 0
+        
+        kept = []
+        kept_signatures = []
+        for frame in frames:
+            pixels = np.asarray(frame)
+            # dHash ignores overall brightness, so flat cards of different colors also need a luma check
+            frame_hash, brightness = dhash(pixels), float(pixels.mean())
+            if any(hamming_distance(frame_hash, h) <= self.duplicate_frame_distance and abs(brightness - b) < 16
+                   for h, b in kept_signatures):
+                continue
+            kept.append(frame)
+            kept_signatures.append((frame_hash, brightness))
+        
+        skipped = len(frames) - len(kept)
+        if skipped:
+            print(f"🪞 Skipped {skipped} near-duplicate frame(s)")
+        return kept, skipped
+    
+    def _generate(self, contents, call: str = 'generate', **kwargs):
+        """Call Gemini with the per-request timeout applied, after waiting for room under the rate limits.
+
+        ``call`` names the call site in the Gemini metrics.
+        """
+        if not _limiter_reserved.get():
+            acquire_gemini(self._estimate_tokens(contents))
+        gemini_calls.inc(call=call)
+        try:
+            with gemini_seconds.time(call=call):
+                return self.model.generate_content(contents, request_options={'timeout': self.call_timeout}, **kwargs)
+        except Exception:
+            gemini_failures.inc(call=call)
+            raise
+    
+    async def _generate_async(self, contents, call: str = 'generate', **kwargs):
+        """_generate() for coroutines, through Gemini's asyncio client.
+
+        The REST transport (used with GEMINI_API_ENDPOINT) has no asyncio client, so
+        there the blocking call runs on a worker thread instead.
+        """
+        if self.transport == 'rest':
+            return await asyncio.to_thread(self._generate, contents, call, **kwargs)
+        if not _limiter_reserved.get():
+            await acquire_gemini_async(self._estimate_tokens(contents))
+        gemini_calls.inc(call=call)
+        try:
+            with gemini_seconds.time(call=call):
+                return await self.model.generate_content_async(
+                    contents, request_options={'timeout': self.call_timeout}, **kwargs
+                )
+        except Exception:
+            gemini_failures.inc(call=call)
+            raise
+    
+    @staticmethod
+    def _estimate_tokens(contents) -> int:
+        """Approximate prompt + response tokens: ~4 characters per text token, a flat cost per image"""
+        parts = contents if isinstance(contents, list) else [contents]
+        tokens = OUTPUT_TOKEN_ALLOWANCE
+        for part in parts:
+            tokens += len(part) // 4 if isinstance(part, str) else TOKENS_PER_IMAGE
+        return tokens
+    
+    def analyze_video_content(self, video_path: str, num_frames: Optional[int] = None,
+                              mode: Optional[str] = None) -> str:
+        """Analyze video content using AI vision to understand what's in the video frames"""
+        try:
+            frames = self._prepare_frames(video_path, num_frames or self.num_frames)
+            if not frames:
+                self._fallbacks.append('video_analysis')
+                return "Unable to analyze video content"
+            
+            if (mode or self.frame_analysis_mode) == 'per_frame':
+                return self._analyze_frames_individually(frames)
+            return self._analyze_frames_batched(frames)
+            
+        except Exception as e:
+            return self._analysis_failed(e)
+    
+    async def analyze_video_content_async(self, video_path: str, num_frames: Optional[int] = None,
+                                          mode: Optional[str] = None) -> str:
+        """analyze_video_content() for coroutines; decoding and encoding frames runs on a worker thread"""
+        try:
+            frames = await asyncio.to_thread(self._prepare_frames, video_path, num_frames or self.num_frames, True)
+            if not frames:
+                self._fallbacks.append('video_analysis')
+                return "Unable to analyze video content"
+            
+            if (mode or self.frame_analysis_mode) == 'per_frame':
+                # Frames are independent, so describe them concurrently
+                responses = await asyncio.gather(*(
+                    self._generate_async([self._frame_analysis_prompt(i), frame], call='frame_analysis')
+                    for i, frame in enumerate(frames)
+                ))
+                final_response = await self._generate_async(
+                    self._analysis_summary_prompt([response.text.strip() for response in responses]),
+                    call='analysis_summary'
+                )
+                return final_response.text.strip()
+            
+            contents, options = self._batched_analysis_request(frames)
+            response = await self._generate_async(contents, **options)
+            return self._parse_batched_analysis(response.text)
+            
+        except Exception as e:
+            return self._analysis_failed(e)
+    
+    def _analysis_failed(self, error: Exception) -> str:
+        print(f"Error analyzing video content: {error}")
+        self._fallbacks.append('video_analysis')
+        return "Video content analysis unavailable"
+    
+    def _prepare_frames(self, video_path: str, num_frames: int, encode: bool = False) -> List:
+        """Distinct keyframes for analysis; encode=True returns them as Gemini blobs (lossless WebP, CPU-heavy)"""
+        frames = self.extract_video_frames(video_path, num_frames)
+        frames, self._frames_skipped = self.suppress_duplicate_frames(frames)
+        if encode:
+            return [genai.types.content_types.image_to_blob(frame) for frame in frames]
+        return frames
+    
+    def _analyze_frames_batched(self, frames: List) -> str:
+        """Describe all frames and summarize the video in a single multimodal request"""
+        contents, options = self._batched_analysis_request(frames)
+        return self._parse_batched_analysis(self._generate(contents, **options).text)
+    
+    def _batched_analysis_request(self, frames: List):
+        """(contents, _generate() options) of the batched analysis request"""
+        return ([self._batched_analysis_prompt(len(frames)), *frames],
+                {'call': 'batched_analysis', 'generation_config': {'response_mime_type': 'application/json'}})
+    
+    @staticmethod
+    def _batched_analysis_prompt(frame_count: int) -> str:
+        return f"""
+        These are {frame_count} frames taken in order from one short video. For each frame, note:
+        1. Any visible text in the frame
+        2. Main subject/person and their actions
+        3. Setting/location
+        4. Key objects or activities visible
+        5. Overall mood and style
+        
+        Then write a concise summary that captures the essence of the whole video,
+        focusing especially on any text that appears in the frames.
+        
+        Respond as JSON only, with these exact fields:
+        "frames": list of per-frame notes (one string per frame, in order)
+        "summary": the overall video summary
+        """
+    
+    @staticmethod
+    def _parse_batched_analysis(text: str) -> str:
+        """Summary from a batched analysis response"""
+        text = text.strip()
+        try:
+            result = json.loads(text)
+        except json.JSONDecodeError:
+            # Model ignored the JSON instruction; its prose still describes the video
+            return text
+        
+        summary = str(result.get('summary', '')).strip()
+        return summary or text
+    
+    def _analyze_frames_individually(self, frames: List) -> str:
+        """Describe each frame with its own request, then combine them with a final summary request"""
+        # Analyze frames for text and visual content
+        combined_analysis = []
+            
+        for i, frame in enumerate(frames):
+            response = self._generate([self._frame_analysis_prompt(i), frame], call='frame_analysis')
+            combined_analysis.append(response.text.strip())
+        
+        final_response = self._generate(self._analysis_summary_prompt(combined_analysis), call='analysis_summary')
+        return final_response.text.strip()
+    
+    @staticmethod
+    def _frame_analysis_prompt(i: int) -> str:
+        return f"""
+            Analyze this video frame {i+1} and describe what you see in detail. Focus on:
+            1. Any visible text in the frame
+            2. Main subject/person and their actions
+            3. Setting/location 
+            4. Key objects or activities visible
+            5. Overall mood and style
+            
+            Extract any text that appears in the image if present.
+            Provide detailed analysis of what's shown in the frame.
+            """
+    
+    @staticmethod
+    def _analysis_summary_prompt(combined_analysis: List[str]) -> str:
+        # Combine analyses from all frames
+        return f"""
+        Based on the following analyses of different frames from a video, provide a comprehensive understanding of what the video is about:
+        
+        FRAME ANALYSES:
+        {' '.join(combined_analysis)}
+        
+        Create a concise summary that captures the essence of this video, focusing especially on any text that appears in the frames.
+        """
+    
+    def generate_title(self, video_analysis: str) -> str:
+        """Generate engaging YouTube shorts title with hashtags based on text and visual content"""
+        return self._generate_part('title', video_analysis)
+    
+    @staticmethod
+    def _title_prompt(video_analysis: str) -> str:
+        return f"""
+        Based on this video analysis, create a catchy YouTube Shorts title:
+        
+        VIDEO CONTENT: {video_analysis}
+        
+        Requirements:
+        - Make it extremely engaging, click-worthy and optimized for high CTR
+        - Keep it under 60 characters including hashtags
+        - Include 2-3 relevant hashtags directly in the title
+        - Focus on the most intriguing aspect of the video, especially any text that appears in the video
+        - Use trending language patterns popular in viral shorts
+        - Consider using emojis strategically
+        - Make it provocative but not clickbait
+        
+        The title should follow formats that are proven to work for viral shorts.
+        Return only the title with hashtags, nothing else.
+        """
+    
+    @staticmethod
+    def _clean_title(text: str) -> str:
+        return text.strip().replace('"', '').replace("'", "")
+    
+    def generate_description(self, video_analysis: str) -> str:
+        """Generate YouTube shorts description optimized for virality based on text and visual content"""
+        return self._generate_part('description', video_analysis)
+    
+    @staticmethod
+    def _description_prompt(video_analysis: str) -> str:
+        return f"""
+        Create a YouTube Shorts description based on this video analysis:
+        
+        VIDEO CONTENT: {video_analysis}
+        
+        Structure the description exactly like this:
+        
+        1. Write exactly 3-5 lines of engaging, high-emotion description that creates curiosity
+        2. Add a line break then write "Keywords:" followed by exactly 20 trending keywords separated by commas
+        3. Add a line break then write "Hashtags:" followed by exactly 15 viral hashtags (MUST include #shorts, #viral, #trending and other relevant ones)
+        4. Add a line break then add this call-to-action: "👉 Follow for more content like this! 🔔 Turn on notifications!"
+        5. Add this copyright disclaimer: "⚠️ Copyright Disclaimer: All rights to respective owners."
+        
+        Make the description extremely engaging and optimized for Shorts algorithm with high-emotion language patterns.
+        Focus on keywords and hashtags that are currently trending for short-form viral content.
+        If there was any text in the video, incorporate it into the description.
+        """
+    
+    def generate_tags_and_keywords(self, video_analysis: str) -> Dict:
+        """Generate optimized tags and keywords specifically for viral shorts"""
+        return self._generate_part('tags_and_keywords', video_analysis)
+    
+    def _metadata_parts(self) -> Dict:
+        """Calls made concurrently by multi mode: part -> (prompt builder, metrics call name, parser, fallback)"""
+        return {
+            'title': (self._title_prompt, 'title', self._clean_title, self._fallback_title),
+            'description': (self._description_prompt, 'description', str.strip, self._fallback_description),
+            'tags_and_keywords': (self._tags_prompt, 'tags', lambda text: json.loads(text.strip()),
+                                  self._fallback_tags_and_keywords),
+        }
+    
+    def _generate_part(self, part: str, video_analysis: str):
+        """Generate one metadata part, falling back to canned output if the call fails"""
+        prompt, call, parse, fallback = self._metadata_parts()[part]
+        try:
+            return parse(self._generate(prompt(video_analysis), call=call).text)
+        except Exception as e:
+            return self._part_failed(part, e, fallback)
+    
+    async def _generate_part_async(self, part: str, video_analysis: str):
+        """_generate_part() for coroutines"""
+        prompt, call, parse, fallback = self._metadata_parts()[part]
+        try:
+            return parse((await self._generate_async(prompt(video_analysis), call=call)).text)
+        except Exception as e:
+            return self._part_failed(part, e, fallback)
+    
+    def _part_failed(self, part: str, error: Exception, fallback):
+        print(f"Error generating {part.replace('_', ' ')}: {error}")
+        self._fallbacks.append(part)
+        return fallback()
+    
+    @staticmethod
+    def _tags_prompt(video_analysis: str) -> str:
+        return f"""
+        Based on this video analysis, generate optimized tags and keywords for a viral YouTube Short:
+        
+        VIDEO CONTENT: {video_analysis}
+        
+        Provide your response as JSON with these exact fields:
+        1. "tags": List of 30 tags optimized for YouTube search algorithm (keep each under 30 characters)
+        2. "keywords": List of 40 relevant keywords (single words or short phrases) related to the content
+        3. "trending_keywords": List of 15 currently trending keywords related to the content
+        
+        Tags should include general category terms, specific content descriptors, and trending terms.
+        Format the response as valid JSON only - no explanation or other text.
+        """
+    
+    def _fallback_title(self) -> str:
+        """Fallback title when AI generation fails"""
+        return "🔥 Viral Moment You Won't Believe! #shorts #viral #trending"
+    
+    def _fallback_tags_and_keywords(self) -> Dict:
+        """Fallback tags and keywords when AI generation fails"""
+        return {
+            "tags": ["shorts", "viral", "trending"],
+            "keywords": ["viral video", "trending content", "shorts"],
+            "trending_keywords": ["viral shorts", "trending now"]
+        }
+    
+    def _fallback_description(self) -> str:
+        """Fallback description when AI generation fails"""
+        return """Amazing video content that will keep you entertained!
+Watch this incredible moment captured on video.
+Perfect for sharing with friends and family.
+Don't forget to like and subscribe for more content.
+This video showcases some really cool stuff.
+You won't believe what happens in this video.
+Make sure to watch until the end.
+Comment below what you think about this.
+Share this video if you enjoyed it.
+Thanks for watching our content!
+
+Keywords: viral video, trending content, amazing moments, entertainment, social media, short video, funny clips, must watch, incredible, awesome, cool stuff, viral clips, trending now, popular video, engaging content, shareable, entertaining, video content, social sharing, watch now
+
+Hashtags: #shorts #viral #trending #amazing #entertainment #video #content #socialmedia #funny #cool #awesome #mustwatch #incredible #popular #engaging #shareable #entertaining #videooftheday #trend #viral2024 #shortsvideo #viralshorts #trendingshorts #amazingvideo #viralcontent #shortsfeed #explore #fyp #foryou #viralmoment
+
+⚠️ Copyright Disclaimer: This content is used for educational and entertainment purposes. All rights belong to their respective owners. If you are the owner and want this removed, please contact us."""
+    
+    def generate_complete_metadata(self, video_path: str, use_cache: bool = True,
+                                   content_hash: Optional[str] = None, **kwargs) -> Dict:
+        """Generate complete metadata package based on video frame analysis.
+
+        Results are cached by video content hash and generator version; pass
+        use_cache=False to force a fresh generation (which then refreshes the cache).
+        """
+        cache_key, cached = self._cached_metadata(video_path, content_hash, kwargs, use_cache)
+        if cached:
+            return cached
+        
+        with stage_seconds.time(stage='metadata'):
+            metadata = self._generate_metadata(video_path)
+        
+        self._store_metadata(cache_key, metadata)
+        return metadata
+    
+    async def generate_complete_metadata_async(self, video_path: str, use_cache: bool = True,
+                                               content_hash: Optional[str] = None, **kwargs) -> Dict:
+        """generate_complete_metadata() for coroutines, sharing the same cache entries"""
+        cache_key, cached = await asyncio.to_thread(self._cached_metadata, video_path, content_hash, kwargs, use_cache)
+        if cached:
+            return cached
+        
+        with stage_seconds.time(stage='metadata'):
+            metadata = await self._generate_metadata_async(video_path)
+        
+        await asyncio.to_thread(self._store_metadata, cache_key, metadata)
+        return metadata
+    
+    def _cached_metadata(self, video_path: str, content_hash: Optional[str], options: Dict, use_cache: bool):
+        """(cache key, cached metadata or None)"""
+        cache_key = self._cache_key(video_path, content_hash, options)
+        cached = (self.cache or get_metadata_cache()).get(cache_key) if use_cache else None
+        if cached:
+            print("♻️ Using cached AI metadata")
+        return cache_key, cached
+    
+    def _store_metadata(self, cache_key: str, metadata: Dict):
+        # Don't pin canned fallback output in the cache; the next request should retry Gemini
+        if not metadata['fallbacks']:
+            (self.cache or get_metadata_cache()).put(cache_key, metadata)
+    
+    def _cache_key(self, video_path: str, content_hash: Optional[str], options: Dict) -> str:
+        return MetadataCache.make_key(
+            content_hash or file_sha256(video_path),
+            prompt_version=PROMPT_VERSION,
+            model=self.model_name,
+            frame_analysis_mode=self.frame_analysis_mode,
+            num_frames=self.num_frames,
+            duplicate_frame_distance=self.duplicate_frame_distance,
+            metadata_mode=self.metadata_mode,
+            options=options
+        )
+    
+    def _generate_metadata(self, video_path: str) -> Dict:
+        """Run the Gemini calls that make up a complete metadata package"""
+        self._fallbacks = []
+        self._frames_skipped = 0
+        
+        print("🤖 Analyzing video frames with AI...")
+        video_analysis = self.analyze_video_content(video_path)
+        print(f"📹 Video analysis complete")
+        
+        if self.metadata_mode == 'structured':
+            try:
+                print("🧩 Generating complete metadata package in one structured call...")
+                return self._with_generation_info(self.generate_structured_metadata(video_analysis), video_analysis)
+            except Exception as e:
+                print(f"Structured metadata generation failed, using separate prompts: {e}")
+        
+        # Title, description and tags only depend on the analysis, so request them concurrently
+        print("🎯 Generating title, 📝 description and 🏷️ tags concurrently...")
+        # Wait for rate-limit room before the deadline below starts, so a busy limiter delays
+        # the calls instead of turning them into fallbacks
+        for prompt in self._concurrent_prompts(video_analysis):
+            acquire_gemini(self._estimate_tokens(prompt))
+        executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='gemini')
+        try:
+            futures = {part: executor.submit(self._with_limiter_reserved, self._generate_part, part, video_analysis)
+                       for part in self._metadata_parts()}
+            
+            # The request timeout should fire first; this only guards against a hung client
+            deadline = time.monotonic() + self.call_timeout + 5
+            results = {part: self._result_or_fallback(future, deadline, part) for part, future in futures.items()}
+        finally:
+            # Don't wait on calls that already timed out
+            executor.shutdown(wait=False)
+        
+        return self._assemble_metadata(video_analysis, results['title'], results['description'],
+                                       results['tags_and_keywords'])
+    
+    async def _generate_metadata_async(self, video_path: str) -> Dict:
+        """_generate_metadata() for coroutines; the title, description and tags calls run concurrently on the loop"""
+        self._fallbacks = []
+        self._frames_skipped = 0
+        
+        print("🤖 Analyzing video frames with AI...")
+        video_analysis = await self.analyze_video_content_async(video_path)
+        print(f"📹 Video analysis complete")
+        
+        if self.metadata_mode == 'structured':
+            try:
+                print("🧩 Generating complete metadata package in one structured call...")
+                metadata = await self.generate_structured_metadata_async(video_analysis)
+                return self._with_generation_info(metadata, video_analysis)
+            except Exception as e:
+                print(f"Structured metadata generation failed, using separate prompts: {e}")
+        
+        print("🎯 Generating title, 📝 description and 🏷️ tags concurrently...")
+        for prompt in self._concurrent_prompts(video_analysis):
+            await acquire_gemini_async(self._estimate_tokens(prompt))
+        # Tasks copy the current context, so they skip the limiter slots taken above
+        token = _limiter_reserved.set(True)
+        try:
+            tasks = {part: asyncio.ensure_future(self._generate_part_async(part, video_analysis))
+                     for part in self._metadata_parts()}
+        finally:
+            _limiter_reserved.reset(token)
+        # The request timeout should fire first; this only guards against a hung client
+        _, pending = await asyncio.wait(tasks.values(), timeout=self.call_timeout + 5)
+        results = {}
+        for part, task in tasks.items():
+            if task in pending:
+                task.cancel()
+                results[part] = self._timed_out(part)
+            else:
+                results[part] = task.result()
+        
+        return self._assemble_metadata(video_analysis, results['title'], results['description'],
+                                       results['tags_and_keywords'])
+    
+    def _concurrent_prompts(self, video_analysis: str) -> List[str]:
+        """Prompts of the title, description and tags calls, for taking their rate-limiter slots up front"""
+        return [prompt(video_analysis) for prompt, _, _, _ in self._metadata_parts().values()]
+    
+    @staticmethod
+    def _with_limiter_reserved(fn, *args):
+        """Run a generation call whose rate-limiter slot was already taken"""
+        token = _limiter_reserved.set(True)
+        try:
+            return fn(*args)
+        finally:
+            _limiter_reserved.reset(token)
+    
+    def _with_generation_info(self, metadata: Dict, video_analysis: str) -> Dict:
+        metadata.update({
+            "video_analysis": video_analysis,
+            "fallbacks": list(self._fallbacks),
+            "frames_skipped_duplicates": self._frames_skipped,
+            "generated_at": datetime.now().isoformat()
+        })
+        return metadata
+    
+    def _assemble_metadata(self, video_analysis: str, title: str, description: str, tags_keywords: Dict) -> Dict:
+        """Metadata package from separately generated title, description and tags"""
+        # Extract hashtags from description
+        description_lines = description.split('\n')
+        hashtags = []
+        keywords = []
+        
+        for line in description_lines:
+            if line.startswith('Hashtags:'):
+                hashtags_text = line.replace('Hashtags:', '').strip()
+                hashtags = [tag.strip() for tag in hashtags_text.split() if tag.startswith('#')]
+            elif line.startswith('Keywords:'):
+                keywords_text = line.replace('Keywords:', '').strip()
+                keywords = [kw.strip() for kw in keywords_text.split(',')]
+        
+        metadata = {
+            "video_analysis": video_analysis,
+            "title": title,
+            "description": description,
+            "tags": tags_keywords.get("tags", []),
+            "hashtags": hashtags,
+            "keywords": tags_keywords.get("keywords", []),
+            "trending_keywords": tags_keywords.get("trending_keywords", []),
+            "fallbacks": list(self._fallbacks),
+            "frames_skipped_duplicates": self._frames_skipped,
+            "generated_at": datetime.now().isoformat()
+        }
+        
+        return metadata
+    
+    def generate_structured_metadata(self, video_analysis: str) -> Dict:
+        """Generate title, description, hashtags, keywords and tags with one JSON-schema-constrained call"""
+        contents, options = self._structured_request(video_analysis)
+        return self._parse_structured_metadata(self._generate(contents, **options).text)
+    
+    async def generate_structured_metadata_async(self, video_analysis: str) -> Dict:
+        contents, options = self._structured_request(video_analysis)
+        return self._parse_structured_metadata((await self._generate_async(contents, **options)).text)
+    
+    def _structured_request(self, video_analysis: str):
+        """(contents, _generate() options) of the structured metadata request"""
+        return (self._structured_prompt(video_analysis),
+                {'call': 'structured_metadata', 'generation_config': {
+                    'response_mime_type': 'application/json',
+                    'response_schema': METADATA_RESPONSE_SCHEMA
+                }})
+    
+    @staticmethod
+    def _structured_prompt(video_analysis: str) -> str:
+        return f"""
+        Create the complete metadata package for a viral YouTube Short based on this video analysis:
+        
+        VIDEO CONTENT: {video_analysis}
+        
+        Fields:
+        - "title": extremely engaging, high-CTR title under 60 characters including 2-3 relevant hashtags; emojis welcome; provocative but not clickbait
+        - "description": 3-5 lines of engaging, high-emotion description that creates curiosity, then the line
+          "👉 Follow for more content like this! 🔔 Turn on notifications!" and the line
+          "⚠️ Copyright Disclaimer: All rights to respective owners." (do not list hashtags or keywords here)
+        - "hashtags": exactly 15 viral hashtags starting with #, including #shorts, #viral and #trending
+        - "keywords": 20 trending keywords (single words or short phrases)
+        - "tags": 30 tags optimized for YouTube search (each under 30 characters)
+        - "trending_keywords": 15 currently trending keywords related to the content
+        
+        If there was any text in the video, incorporate it into the title and description.
+        """
+    
+    @staticmethod
+    def _parse_structured_metadata(text: str) -> Dict:
+        result = json.loads(text.strip())
+        
+        hashtags = [f"#{tag.strip().lstrip('#')}" for tag in result.get('hashtags', []) if tag.strip().lstrip('#')]
+        description = result['description'].strip()
+        if hashtags:
+            description = f"{description}\n\n{' '.join(hashtags)}"
+        
+        title, description, tags = enforce_youtube_limits(result['title'], description, result.get('tags', []))
+        if not title:
+            raise ValueError("Structured response has an empty title")
+        
+        return {
+            "title": title,
+            "description": description,
+            "tags": tags,
+            "hashtags": hashtags,
+            "keywords": [str(kw).strip() for kw in result.get('keywords', [])],
+            "trending_keywords": [str(kw).strip() for kw in result.get('trending_keywords', [])]
+        }
+    
+    def _result_or_fallback(self, future, deadline: float, part: str):
+        """Result of a concurrent generation call, or its fallback if it misses the deadline"""
+        try:
+            return future.result(timeout=max(0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            return self._timed_out(part)
+    
+    def _timed_out(self, part: str):
+        print(f"Timed out generating {part}")
+        self._fallbacks.append(part)
+        return self._metadata_parts()[part][3]()
+    
+    def save_metadata(self, metadata: Dict, output_path: str):
+        """Save metadata to JSON file"""
+        try:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            print(f"Metadata saved to: {output_path}")
+        except Exception as e:
+            print(f"Error saving metadata: {e}")
+
+# Example usage
+if __name__ == "__main__":
+    # Initialize the generator (API key will be loaded from .env)
+    generator = AIMetadataGenerator()
+    
+    # Example video processing
+    video_path = r"c:\Users\DELL\OneDrive\Desktop\youtube automation ai\sample_video.mp4"
+    
+    # Generate complete metadata
+    metadata = generator.generate_complete_metadata(video_path=video_path)
+    
+    # Print results
+    print("Generated Metadata:")
+    print("-" * 50)
+    print(f"Title: {metadata['title']}")
+    print(f"\nDescription:\n{metadata['description']}")
+    
+    # Save to file
+    output_file = r"c:\Users\DELL\OneDrive\Desktop\youtube automation ai\metadata_output.json"
     generator.save_metadata(metadata, output_file)
\ No newline at end of file
@@ -1,383 +1,907 @@
-from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for
-import os
-import uuid
-import threading
-from datetime import datetime
-from typing import Dict, Any
-import logging
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Import our modules
-from downloader import download_reel_with_audio  # Ensure downloader.py defines this function
-from uploader import upload_to_youtube, check_authentication, authenticate_youtube, get_youtube_service, get_channel_info, logout_youtube
-from ai_genrator import AIMetadataGenerator  # Fixed import to use the correct class
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__) 
-
-app = Flask(__name__)
-
-# Configuration
-DOWNLOAD_FOLDER = 'downloads'
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')  # Now properly loads from .env file
-
-# Ensure download folder exists
-os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
-
-# Task storage (in production, use Redis or database)
-tasks = {}
-
-class TaskStatus:
-    def __init__(self, task_id: str):
-        self.task_id = task_id
-        self.status = 'started'
-        self.progress = 0
-        self.message = 'Task started'
-        self.error = None
-        self.result = None
-        self.metadata = None
-        self.youtube_url = None
-        self.created_at = datetime.now()
-
-def update_task_status(task_id: str, status: str, message: str = '', progress: int = 0, **kwargs):
-    """Update task status"""
-    if task_id in tasks:
-        task = tasks[task_id]
-        task.status = status
-        task.message = message
-        task.progress = progress
-        
-        # Update additional fields
-        for key, value in kwargs.items():
-            setattr(task, key, value)
-        
-        logger.info(f"Task {task_id}: {status} - {message}")
-
-def background_upload_task(task_id: str, reel_url: str):
-    """Background task for downloading and uploading"""
-    video_path = None
-    try:
-        update_task_status(task_id, 'downloading', 'Downloading reel from Instagram...', 20)
-        
-        # Download the reel
-        video_path = download_reel_with_audio(reel_url, DOWNLOAD_FOLDER)
-        
-        if not video_path or not os.path.exists(video_path):
-            raise Exception("Failed to download video file")
-        
-        print(f"✅ Video downloaded: {video_path}")
-        
-        update_task_status(task_id, 'generating_metadata', 'AI analyzing video content and generating metadata...', 50)
-        
-        # Generate metadata using AI with actual video analysis
-        try:
-            # Create AI Metadata Generator instance
-            ai_generator = AIMetadataGenerator(GEMINI_API_KEY)
-            
-            # Generate metadata based on actual video content
-            generated_metadata = ai_generator.generate_complete_metadata(
-                video_path=video_path,
-                target_audience="social media users"
-            )
-            
-            # Extract needed fields for YouTube upload
-            metadata = {
-                'title': generated_metadata['title'],
-                'description': generated_metadata['description'],
-                'tags': generated_metadata['tags'],
-                'keywords': generated_metadata['keywords'],
-                'hashtags': generated_metadata['hashtags'],
-                'video_analysis': generated_metadata.get('video_analysis', 'Content analysis unavailable')
-            }
-            
-            print(f"✅ AI metadata generated successfully")
-            print(f"📝 Title: {metadata['title']}")
-            
-        except Exception as e:
-            logger.warning(f"AI metadata generation failed: {str(e)}. Using fallback metadata.")
-            # Fallback metadata - still better than generic
-            filename = os.path.basename(video_path)
-            metadata = {
-                'title': f'Amazing Social Media Content - {filename}',
-                'description': f'Check out this amazing content!\n\nOriginal source: {reel_url}\n\n#SocialMedia #Viral #Content #Entertainment',
-                'tags': ['social media', 'viral', 'entertainment', 'content', 'video'],
-                'keywords': ['social media video', 'viral content', 'entertainment'],
-                'hashtags': ['#SocialMedia', '#Viral', '#Content']
-            }
-        
-        update_task_status(task_id, 'uploading', 'Uploading to YouTube...', 80, metadata=metadata)
-        
-        # Upload to YouTube with better error handling
-        try:
-            video_id = upload_to_youtube(
-                video_path=video_path,
-                title=metadata['title'],
-                description=metadata['description'],
-                tags=metadata['tags'],
-                privacy_status="unlisted"
-            )
-            
-            youtube_url = f"https://www.youtube.com/watch?v={video_id}"
-            
-            update_task_status(
-                task_id, 
-                'completed', 
-                'Upload completed successfully!', 
-                100,
-                result={'video_id': video_id},
-                youtube_url=youtube_url,
-                metadata=metadata
-            )
-            
-        except Exception as upload_error:
-            raise Exception(f"YouTube upload failed: {str(upload_error)}")
-        
-    except Exception as e:
-        logger.error(f"Task {task_id} failed: {str(e)}")
-        update_task_status(task_id, 'failed', str(e), error=str(e))
-    finally:
-        # Clean up downloaded file after successful upload or failure
-        if video_path and os.path.exists(video_path):
-            try:
-                os.remove(video_path)
-                print(f"🧹 Cleaned up temporary file: {video_path}")
-            except Exception as cleanup_error:
-                print(f"⚠️ Could not clean up file {video_path}: {cleanup_error}")
-
-@app.route('/')
-def index():
-    """Render the main page"""
-    return render_template('index.html')
-
-@app.route('/check-auth')
-def check_auth():
-    """Check YouTube authentication status"""
-    try:
-        is_authenticated = check_authentication()
-        return jsonify({'authenticated': is_authenticated})
-    except Exception as e:
-        logger.error(f"Error checking authentication: {str(e)}")
-        return jsonify({'authenticated': False, 'error': str(e)})
-
-@app.route('/authenticate', methods=['POST'])
-def authenticate():
-    """Authenticate with YouTube"""
-    try:
-        credentials = authenticate_youtube()
-        if credentials:
-            return jsonify({'success': True, 'message': 'Authentication successful'})
-        else:
-            return jsonify({'success': False, 'error': 'Authentication failed'})
-    except Exception as e:
-        logger.error(f"Authentication error: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)})
-
-
-
-@app.route('/download', methods=['POST'])
-def download_reel():
-    """Download reel only"""
-    try:
-        data = request.get_json(silent=True) or {}
-        reel_url = data.get('url') or request.form.get('url') or request.args.get('url')
-        
-        if not reel_url:
-            return jsonify({'success': False, 'error': 'URL is required'})
-        
-        # Download the reel
-        video_path = download_reel_with_audio(reel_url, DOWNLOAD_FOLDER)
-        filename = os.path.basename(video_path)
-        
-        return jsonify({
-            'success': True,
-            'message': 'Download completed',
-            'filename': filename
-        })
-        
-    except Exception as e:
-        logger.error(f"Download error: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)})
-
-@app.route('/auto-upload-async', methods=['POST'])
-def auto_upload_async():
-    """Start async upload process"""
-    try:
-        # Check authentication first
-        if not check_authentication():
-            return jsonify({'success': False, 'error': 'Not authenticated with YouTube'}), 401
-        
-        data = request.get_json(silent=True) or {}
-        reel_url = data.get('url') or request.form.get('url') or request.args.get('url')
-        
-        if not reel_url:
-            return jsonify({'success': False, 'error': 'URL is required'})
-        
-        # Create task
-        task_id = str(uuid.uuid4())
-        tasks[task_id] = TaskStatus(task_id)
-        
-        # Start background task
-        thread = threading.Thread(
-            target=background_upload_task,
-            args=(task_id, reel_url)
-        )
-        thread.daemon = True
-        thread.start()
-        
-        return jsonify({
-            'success': True,
-            'task_id': task_id,
-            'message': 'Upload process started'
-        })
-        
-    except Exception as e:
-        logger.error(f"Auto upload error: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)})
-
-@app.route('/task-status/<task_id>')
-def get_task_status(task_id):
-    """Get task status"""
-    try:
-        if task_id not in tasks:
-            return jsonify({'success': False, 'error': 'Task not found'})
-        
-        task = tasks[task_id]
-        
-        return jsonify({
-            'success': True,
-            'task': {
-                'id': task.task_id,
-                'status': task.status,
-                'message': task.message,
-                'progress': task.progress,
-                'error': task.error,
-                'result': task.result,
-                'metadata': task.metadata,
-                'youtube_url': task.youtube_url
-            }
-        })
-        
-    except Exception as e:
-        logger.error(f"Error getting task status: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)})
-
-@app.route('/get-video/<filename>')
-def get_video(filename):
-    """Download video file"""
-    try:
-        file_path = os.path.join(DOWNLOAD_FOLDER, filename)
-        if os.path.exists(file_path):
-            return send_file(file_path, as_attachment=True)
-        else:
-            return jsonify({'error': 'File not found'}), 404
-    except Exception as e:
-        logger.error(f"Error serving video: {str(e)}")
-        return jsonify({'error': str(e)}), 500
-
-@app.route('/generate-preview', methods=['POST'])
-def generate_preview():
-    """Generate metadata preview by downloading and analyzing video"""
-    try:
-        data = request.get_json(silent=True) or {}
-        reel_url = data.get('url') or request.form.get('url') or request.args.get('url')
-        
-        if not reel_url:
-            return jsonify({'success': False, 'error': 'URL is required'})
-        
-        # Download video temporarily for analysis
-        temp_video_path = None
-        try:
-            # Download the video for analysis
-            temp_video_path = download_reel_with_audio(reel_url, DOWNLOAD_FOLDER)
-            
-            # Create AI Metadata Generator instance
-            ai_generator = AIMetadataGenerator(GEMINI_API_KEY)
-            
-            # Generate metadata based on actual video content
-            generated_metadata = ai_generator.generate_complete_metadata(
-                video_path=temp_video_path,
-                target_audience="social media users"
-            )
-            
-            return jsonify({
-                'success': True,
-                'title': generated_metadata['title'],
-                'description': generated_metadata['description'],
-                'tags': generated_metadata['tags'],
-                'hashtags': generated_metadata['hashtags'],
-                'video_analysis': generated_metadata.get('video_analysis', 'Analysis unavailable')
-            })
-            
-        except Exception as e:
-            logger.warning(f"AI metadata generation preview failed: {str(e)}")
-            # Fallback metadata
-            return jsonify({
-                'success': True,
-                'title': 'Amazing Social Media Content',
-                'description': f'Check out this amazing content from social media!\n\nSource: {reel_url}\n\n#SocialMedia #Viral #Content',
-                'tags': ['social media', 'viral', 'entertainment', 'content'],
-                'hashtags': ['#SocialMedia', '#Viral', '#Content', '#Entertainment']
-            })
-        finally:
-            # Clean up temporary file
-            if temp_video_path and os.path.exists(temp_video_path):
-                try:
-                    os.remove(temp_video_path)
-                except Exception:
-                    pass
-        
-    except Exception as e:
-        logger.error(f"Preview generation error: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)})
-
-@app.route('/get-channel-info')
-def channel_info():
-    """Get information about the connected YouTube channel"""
-    try:
-        if not check_authentication():
-            return jsonify({'authenticated': False})
-            
-        channel_data = get_channel_info()
-        if channel_data:
-            return jsonify({
-                'authenticated': True,
-                'channel': channel_data
-            })
-        else:
-            return jsonify({'authenticated': True, 'channel': None})
-    except Exception as e:
-        logger.error(f"Error getting channel info: {str(e)}")
-        return jsonify({'authenticated': False, 'error': str(e)})
-
-@app.route('/logout', methods=['POST'])
-def logout():
-    """Logout from YouTube by revoking credentials"""
-    try:
-        success = logout_youtube()
-        return jsonify({'success': success})
-    except Exception as e:
-        logger.error(f"Error during logout: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)})
-
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({'error': 'Not found'}), 404
-
-@app.errorhandler(500)
-def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
-
-if __name__ == '__main__':
-    print("🚀 YouTube Automation Machine Starting...")
-   
-    print(f"📁 Downloads folder: {DOWNLOAD_FOLDER}")
-    print(f"🤖 Gemini AI: {'Configured' if GEMINI_API_KEY and GEMINI_API_KEY != 'your-gemini-api-key-here' else 'Not configured (using fallback)'}")
-    print( )
-  
-    
-    app.run(debug=True, threaded=True)
-
+from flask import Flask, render_template, request, jsonify, send_file, redirect, url_for, Response, stream_with_context
+import os
+import json
+import uuid
+import time
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+import logging
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.utils import safe_join
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Import our modules
+from downloader import download_reel_with_audio, download_reel_async, file_sha256, extract_shortcode  # Ensure downloader.py defines this function
+from uploader import upload_to_youtube, upload_to_youtube_async, update_video_metadata, check_authentication, authenticate_youtube, get_youtube_service, get_channel_info, logout_youtube
+from ai_genrator import AIMetadataGenerator  # Fixed import to use the correct class
+from scheduler import JobScheduler, QueueFullError
+from task_store import create_task_store, FINISHED_STATUSES
+from task_events import TaskEventBroker
+from batch import BatchPipeline, build_upload_metadata, build_upload_metadata_async
+from event_loop import get_event_loop_runner
+from job_queue import get_job_queue
+from rate_limiter import quota_status
+import metrics
+import profiling
+import lazy_imports
+from upload_index import get_upload_index, video_identity, record_upload, release_reservation
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__) 
+
+app = Flask(__name__)
+
+# Configuration
+DOWNLOAD_FOLDER = 'downloads'
+GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')  # Now properly loads from .env file
+# 'threads' runs uploads on the worker pool below; 'async' runs them as coroutines on one event loop
+PIPELINE_MODE = os.getenv('PIPELINE_MODE', 'threads').lower()
+# Leave uploads to separate `python worker.py` processes, handed over through the durable job queue
+WORKER_MODE = os.getenv('WORKER_MODE', 'false').lower() == 'true'
+# Start the YouTube upload while AI metadata is still being generated (per-request 'pipelined' overrides)
+PIPELINED_UPLOAD = os.getenv('PIPELINED_UPLOAD', 'false').lower() == 'true'
+# Largest number of reels accepted by one /batch-upload request
+BATCH_MAX_URLS = int(os.getenv('BATCH_MAX_URLS', '500'))
+# Most workers per stage a /batch-upload request may ask for (each one is a thread in this process)
+BATCH_MAX_WORKERS = {
+    'download': int(os.getenv('BATCH_MAX_DOWNLOAD_WORKERS', '8')),
+    'metadata': int(os.getenv('BATCH_MAX_METADATA_WORKERS', '4')),
+    'upload': int(os.getenv('BATCH_MAX_UPLOAD_WORKERS', '4')),
+}
+# Worker counts used for stages a /batch-upload request doesn't set
+BATCH_DEFAULT_WORKERS = {'download': 4, 'metadata': 2, 'upload': 2}
+# Attempts at applying final metadata to a video uploaded with provisional metadata
+METADATA_UPDATE_ATTEMPTS = 3
+# Hand /get-video bodies to a front proxy: 'x-accel' (nginx X-Accel-Redirect) or 'x-sendfile' (Apache/lighttpd)
+VIDEO_OFFLOAD = os.getenv('VIDEO_OFFLOAD', '').lower()
+# Internal nginx location that maps onto DOWNLOAD_FOLDER, used with VIDEO_OFFLOAD=x-accel
+VIDEO_ACCEL_PREFIX = os.getenv('VIDEO_ACCEL_PREFIX', '/protected-downloads/')
+# How long browsers may reuse a served video before revalidating its ETag
+VIDEO_CACHE_MAX_AGE = int(os.getenv('VIDEO_CACHE_MAX_AGE', '3600'))
+
+app.config['USE_X_SENDFILE'] = VIDEO_OFFLOAD == 'x-sendfile'
+
+# Ensure download folder exists
+os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
+
+# Task storage: in-memory by default, SQLite (TASK_STORE_BACKEND=sqlite) to share across gunicorn workers
+tasks = create_task_store()
+if WORKER_MODE and os.getenv('TASK_STORE_BACKEND', 'memory').lower() != 'sqlite':
+    logger.warning("WORKER_MODE needs TASK_STORE_BACKEND=sqlite, or task progress from workers is never seen here")
+
+# Pushes task updates to /task-events subscribers in this process
+task_events = TaskEventBroker()
+
+# How often an idle event stream re-reads the task store (catches updates made by other workers)
+SSE_STORE_POLL_SECONDS = float(os.getenv('SSE_STORE_POLL_SECONDS', '5'))
+# Each open event stream holds a server thread: cap them per process (extra clients get a 503 and poll)
+# and end each one after a while, telling the browser to reconnect after SSE_RETRY_MS
+SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', '4'))
+SSE_MAX_STREAM_SECONDS = float(os.getenv('SSE_MAX_STREAM_SECONDS', '300'))
+SSE_RETRY_MS = 3000
+sse_slots = threading.BoundedSemaphore(max(1, SSE_MAX_STREAMS))
+
+# Bounded worker pool for background uploads, with separate limits per pipeline stage
+scheduler = JobScheduler(
+    max_workers=int(os.getenv('WORKER_POOL_SIZE', '4')),
+    max_queue_size=int(os.getenv('TASK_QUEUE_SIZE', '100')),
+    stage_limits={
+        'download': int(os.getenv('DOWNLOAD_CONCURRENCY', '2')),
+        'metadata': int(os.getenv('METADATA_CONCURRENCY', '2')),
+        'upload': int(os.getenv('UPLOAD_CONCURRENCY', '2')),
+    }
+)
+
+def queue_stats() -> Dict[str, int]:
+    """Queued/running counts from the durable job queue in worker mode, else from the local pool"""
+    return get_job_queue().stats() if WORKER_MODE else scheduler.stats()
+
+metrics.register_gauge('reel_tasks_queued', 'Upload tasks waiting for a worker',
+                       lambda: queue_stats()['queued'])
+metrics.register_gauge('reel_tasks_in_flight', 'Upload tasks currently running',
+                       lambda: queue_stats()['running'])
+metrics.register_gauge('reel_worker_pool_size', 'Upload worker threads',
+                       lambda: scheduler.stats()['max_workers'])
+metrics.register_gauge('reel_async_tasks_in_flight', 'Upload coroutines running on the event loop',
+                       lambda: get_event_loop_runner().stats()['in_flight'])
+metrics.register_gauge('youtube_quota_units_used', 'YouTube Data API units charged since the last midnight-Pacific reset',
+                       lambda: quota_status()['youtube_units_used'])
+metrics.register_gauge('youtube_daily_quota_units', 'YouTube Data API units available per day (YOUTUBE_DAILY_QUOTA)',
+                       lambda: quota_status()['youtube_daily_quota'])
+
+class TaskStatus:
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.status = 'queued'
+        self.progress = 0
+        self.message = 'Waiting in queue'
+        self.error = None
+        self.result = None
+        self.metadata = None
+        self.youtube_url = None
+        self.queue_position = None
+        self.created_at = datetime.now()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form kept in the task store"""
+        return {
+            'task_id': self.task_id,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.message,
+            'error': self.error,
+            'result': self.result,
+            'metadata': self.metadata,
+            'youtube_url': self.youtube_url,
+            'queue_position': self.queue_position,
+            'created_at': self.created_at.isoformat()
+        }
+
+def update_task_status(task_id: str, status: str, message: str = '', progress: int = 0, **kwargs):
+    """Update task status"""
+    fields = {'status': status, 'message': message, 'progress': progress}
+    fields.update(kwargs)
+    
+    task = tasks.update(task_id, fields)
+    if task is not None:
+        task_events.publish(task_id, task)
+        logger.info(f"Task {task_id}: {status} - {message}")
+        if status in FINISHED_STATUSES:
+            metrics.tasks_finished.inc(status=status)
+
+def generate_upload_metadata(video_path: str, reel_url: str, use_metadata_cache: bool = True) -> Dict[str, Any]:
+    """Generate YouTube metadata for a downloaded reel within the metadata stage limit"""
+    with scheduler.stage('metadata'):
+        return build_upload_metadata(video_path, reel_url, GEMINI_API_KEY, use_metadata_cache)
+
+def upload_progress_reporter(task_id: str, progress_range: Optional[tuple] = None):
+    """Callback feeding upload bytes into the task; maps them onto progress_range=(start, end) if given"""
+    last_percent = [-1]
+    
+    def report(bytes_sent: int, total_bytes: int):
+        percent = int(100 * bytes_sent / total_bytes) if total_bytes else 100
+        if percent == last_percent[0]:
+            return
+        last_percent[0] = percent
+        
+        fields = {'upload_bytes_sent': bytes_sent, 'upload_bytes_total': total_bytes}
+        if progress_range:
+            start, end = progress_range
+            fields['progress'] = start + (end - start) * percent // 100
+        task = tasks.update(task_id, fields)
+        if task is not None:
+            task_events.publish(task_id, task)
+    
+    return report
+
+def quota_wait_reporter(task_id: str):
+    """Callback telling the user a task is held until the YouTube quota resets"""
+    def report(wait_seconds: float):
+        task = tasks.update(task_id, {'message': f'Daily YouTube quota used up; waiting {wait_seconds / 3600:.1f}h for the reset...'})
+        if task is not None:
+            task_events.publish(task_id, task)
+    
+    return report
+
+def upload_with_metadata(video_path: str, metadata: Dict[str, Any], privacy_status: str = "unlisted",
+                         progress_callback=None, on_quota_wait=None) -> str:
+    """Upload a video within the upload stage limit; returns the YouTube video id"""
+    with scheduler.stage('upload'):
+        return upload_to_youtube(
+            video_path=video_path,
+            title=metadata['title'],
+            description=metadata['description'],
+            tags=metadata['tags'],
+            privacy_status=privacy_status,
+            progress_callback=progress_callback,
+            on_quota_wait=on_quota_wait
+        )
+
+def complete_as_duplicate(task_id: str, duplicate: Dict[str, Any]):
+    """Finish a task by pointing at the earlier upload of the same reel"""
+    update_task_status(
+        task_id,
+        'completed',
+        f"Already uploaded (matched by {duplicate['match'].replace('_', ' ')})",
+        100,
+        result={'video_id': duplicate['video_id'], 'duplicate': True, 'matched_by': duplicate['match']},
+        youtube_url=duplicate['youtube_url']
+    )
+
+def background_upload_task(task_id: str, reel_url: str, use_metadata_cache: bool = True,
+                           pipelined: Optional[bool] = None, skip_duplicates: bool = True):
+    """Background task for downloading and uploading"""
+    video_path = None
+    started = time.monotonic()
+    task = tasks.get(task_id)
+    if task:
+        queued_for = (datetime.now() - datetime.fromisoformat(task['created_at'])).total_seconds()
+        metrics.stage_seconds.observe(max(0.0, queued_for), stage='queue_wait')
+    try:
+        update_task_status(task_id, 'started', 'Task started', 10, queue_position=None)
+        update_task_status(task_id, 'downloading', 'Downloading reel from Instagram...', 20)
+        
+        # Download the reel (the file stays in the download cache, which evicts by size and age)
+        with scheduler.stage('download'):
+            video_path = download_reel_with_audio(reel_url, download_dir=DOWNLOAD_FOLDER)
+        
+        if not video_path or not os.path.exists(video_path):
+            raise Exception("Failed to download video file")
+        
+        print(f"✅ Video downloaded: {video_path}")
+        
+        # Same content (or a re-encoded copy) may have been uploaded under another shortcode
+        identity = video_identity(reel_url, video_path)
+        if skip_duplicates:
+            duplicate = get_upload_index().find(content_hash=identity['content_hash'],
+                                                fingerprint=identity['fingerprint'])
+            if duplicate:
+                complete_as_duplicate(task_id, duplicate)
+                return
+        
+        if PIPELINED_UPLOAD if pipelined is None else pipelined:
+            pipelined_upload(task_id, video_path, reel_url, identity, use_metadata_cache)
+            return
+        
+        update_task_status(task_id, 'generating_metadata', 'AI analyzing video content and generating metadata...', 50)
+        
+        # Generate metadata using AI with actual video analysis
+        metadata = generate_upload_metadata(video_path, reel_url, use_metadata_cache)
+        
+        update_task_status(task_id, 'uploading', 'Uploading to YouTube...', 80, metadata=metadata)
+        
+        # Upload to YouTube with better error handling
+        try:
+            video_id = upload_with_metadata(video_path, metadata,
+                                            progress_callback=upload_progress_reporter(task_id, (80, 99)),
+                                            on_quota_wait=quota_wait_reporter(task_id))
+            
+            youtube_url = f"https://www.youtube.com/watch?v={video_id}"
+            
+            update_task_status(
+                task_id, 
+                'completed', 
+                'Upload completed successfully!', 
+                100,
+                result={'video_id': video_id},
+                youtube_url=youtube_url,
+                metadata=metadata
+            )
+            record_upload(reel_url, identity, video_id, task_id)
+            
+        except Exception as upload_error:
+            raise Exception(f"YouTube upload failed: {str(upload_error)}")
+        
+    except Exception as e:
+        logger.error(f"Task {task_id} failed: {str(e)}")
+        update_task_status(task_id, 'failed', str(e), error=str(e))
+    finally:
+        if skip_duplicates:
+            # No-op once the upload was recorded; otherwise lets the reel be submitted again
+            release_reservation(reel_url, task_id)
+        metrics.stage_seconds.observe(time.monotonic() - started, stage='task')
+
+def profiled_upload_task(task_id: str, reel_url: str, **kwargs):
+    """background_upload_task() under cProfile/tracemalloc, noting in the task whether the profiler was free"""
+    with profiling.profile(task_id) as profiled:
+        tasks.update(task_id, {'profiled': profiled})
+        background_upload_task(task_id, reel_url, **kwargs)
+
+async def async_background_upload_task(task_id: str, reel_url: str, use_metadata_cache: bool = True,
+                                       skip_duplicates: bool = True):
+    """background_upload_task() as a coroutine, for PIPELINE_MODE=async.
+
+    Network waits happen on the event loop; task store writes, fingerprinting and
+    frame extraction go to its worker threads. The stages of one task run in
+    sequence (no pipelined upload): the overlap comes from running many tasks at once.
+    """
+    started = time.monotonic()
+    set_status = partial(asyncio.to_thread, update_task_status, task_id)
+    try:
+        await set_status('started', 'Task started', 10, queue_position=None)
+        await set_status('downloading', 'Downloading reel from Instagram...', 20)
+        
+        video_path = await download_reel_async(reel_url, download_dir=DOWNLOAD_FOLDER)
+        if not video_path or not os.path.exists(video_path):
+            raise Exception("Failed to download video file")
+        
+        print(f"✅ Video downloaded: {video_path}")
+        
+        identity = await asyncio.to_thread(video_identity, reel_url, video_path)
+        if skip_duplicates:
+            duplicate = await asyncio.to_thread(get_upload_index().find, content_hash=identity['content_hash'],
+                                                fingerprint=identity['fingerprint'])
+            if duplicate:
+                await asyncio.to_thread(complete_as_duplicate, task_id, duplicate)
+                return
+        
+        await set_status('generating_metadata', 'AI analyzing video content and generating metadata...', 50)
+        metadata = await build_upload_metadata_async(video_path, reel_url, GEMINI_API_KEY, use_metadata_cache)
+        
+        await set_status('uploading', 'Uploading to YouTube...', 80, metadata=metadata)
+        try:
+            video_id = await upload_to_youtube_async(
+                video_path=video_path,
+                title=metadata['title'],
+                description=metadata['description'],
+                tags=metadata['tags'],
+                progress_callback=upload_progress_reporter(task_id, (80, 99)),
+                on_quota_wait=quota_wait_reporter(task_id)
+            )
+        except Exception as upload_error:
+            raise Exception(f"YouTube upload failed: {str(upload_error)}")
+        
+        await set_status(
+            'completed',
+            'Upload completed successfully!',
+            100,
+            result={'video_id': video_id},
+            youtube_url=f"https://www.youtube.com/watch?v={video_id}",
+            metadata=metadata
+        )
+        await asyncio.to_thread(record_upload, reel_url, identity, video_id, task_id)
+        
+    except Exception as e:
+        logger.error(f"Task {task_id} failed: {str(e)}")
+        await set_status('failed', str(e), error=str(e))
+    finally:
+        if skip_duplicates:
+            await asyncio.to_thread(release_reservation, reel_url, task_id)
+        metrics.stage_seconds.observe(time.monotonic() - started, stage='task')
+
+def pipelined_upload(task_id: str, video_path: str, reel_url: str, identity: Dict[str, Any],
+                     use_metadata_cache: bool = True) -> Optional[str]:
+    """Upload with provisional metadata while AI metadata is generated, then apply it with videos.update.
+
+    The video stays private until the final metadata is applied. The task only completes
+    once both the upload and the update succeed; if generating or applying the metadata
+    fails, the task fails but still reports the uploaded video so it can be fixed by hand.
+    Every finished upload is recorded in the duplicate index, so the reel isn't uploaded twice.
+    Returns the video id once the task completed, otherwise None.
+    """
+    provisional_metadata = {
+        'title': f'Processing {os.path.splitext(os.path.basename(video_path))[0]}',
+        'description': f'Original source: {reel_url}',
+        'tags': []
+    }
+    
+    update_task_status(task_id, 'generating_metadata', 'Uploading to YouTube while AI generates metadata...', 50)
+    
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'upload-{task_id[:8]}')
+    try:
+        upload_future = executor.submit(upload_with_metadata, video_path, provisional_metadata, "private",
+                                        upload_progress_reporter(task_id), quota_wait_reporter(task_id))
+    finally:
+        executor.shutdown(wait=False)
+    
+    metadata, metadata_error = None, None
+    try:
+        metadata = generate_upload_metadata(video_path, reel_url, use_metadata_cache)
+        update_task_status(task_id, 'uploading', 'AI metadata ready, finishing upload...', 80, metadata=metadata)
+    except Exception as e:
+        # The upload is already under way: let it finish so the video is recorded
+        metadata_error = e
+    
+    try:
+        video_id = upload_future.result()
+    except Exception as upload_error:
+        if metadata_error is not None:
+            raise metadata_error
+        raise Exception(f"YouTube upload failed: {str(upload_error)}")
+    
+    # The video is on YouTube now, whatever happens to its metadata
+    record_upload(reel_url, identity, video_id, task_id)
+    youtube_url = f"https://www.youtube.com/watch?v={video_id}"
+    
+    if metadata_error is not None:
+        error = (f"Video uploaded as private with provisional metadata, but generating the AI metadata failed: "
+                 f"{str(metadata_error)}")
+        update_task_status(
+            task_id,
+            'failed',
+            error,
+            error=error,
+            result={'video_id': video_id, 'metadata_applied': False},
+            youtube_url=youtube_url
+        )
+        return None
+    
+    last_error = None
+    for attempt in range(1, METADATA_UPDATE_ATTEMPTS + 1):
+        try:
+            update_video_metadata(
+                video_id,
+                title=metadata['title'],
+                description=metadata['description'],
+                tags=metadata['tags'],
+                privacy_status="unlisted"
+            )
+            break
+        except Exception as update_error:
+            last_error = update_error
+            logger.warning(f"Task {task_id}: metadata update attempt {attempt}/{METADATA_UPDATE_ATTEMPTS} failed: {str(update_error)}")
+            if attempt < METADATA_UPDATE_ATTEMPTS:
+                time.sleep(2 ** attempt)
+    else:
+        error = (f"Video uploaded as private with provisional metadata, but applying the AI metadata failed: "
+                 f"{str(last_error)}")
+        update_task_status(
+            task_id,
+            'failed',
+            error,
+            error=error,
+            result={'video_id': video_id, 'metadata_applied': False},
+            youtube_url=youtube_url,
+            metadata=metadata
+        )
+        return None
+    
+    update_task_status(
+        task_id,
+        'completed',
+        'Upload completed successfully!',
+        100,
+        result={'video_id': video_id, 'metadata_applied': True},
+        youtube_url=youtube_url,
+        metadata=metadata
+    )
+    return video_id
+
+def task_payload(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Client-facing view of a stored task, shared by polling and event stream"""
+    # Live position from this process's queue; the stored one covers tasks queued by another worker
+    if WORKER_MODE:
+        queue_position = get_job_queue().position(task['task_id'])
+    else:
+        queue_position = scheduler.queue_position(task['task_id'])
+    if queue_position is None and task['status'] == 'queued':
+        queue_position = task.get('queue_position')
+    
+    return {
+        'id': task['task_id'],
+        'status': task['status'],
+        'message': task['message'],
+        'progress': task['progress'],
+        'error': task.get('error'),
+        'result': task.get('result'),
+        'metadata': task.get('metadata'),
+        'youtube_url': task.get('youtube_url'),
+        'queue_position': queue_position,
+        'upload_bytes_sent': task.get('upload_bytes_sent'),
+        'upload_bytes_total': task.get('upload_bytes_total'),
+        'profiled': task.get('profiled')
+    }
+
+@app.route('/')
+def index():
+    """Render the main page"""
+    return render_template('index.html')
+
+@app.route('/check-auth')
+def check_auth():
+    """Check YouTube authentication status"""
+    try:
+        is_authenticated = check_authentication()
+        return jsonify({'authenticated': is_authenticated})
+    except Exception as e:
+        logger.error(f"Error checking authentication: {str(e)}")
+        return jsonify({'authenticated': False, 'error': str(e)})
+
+@app.route('/authenticate', methods=['POST'])
+def authenticate():
+    """Authenticate with YouTube"""
+    try:
+        credentials = authenticate_youtube()
+        if credentials:
+            return jsonify({'success': True, 'message': 'Authentication successful'})
+        else:
+            return jsonify({'success': False, 'error': 'Authentication failed'})
+    except Exception as e:
+        logger.error(f"Authentication error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+
+
+@app.route('/download', methods=['POST'])
+def download_reel():
+    """Download reel only"""
+    try:
+        data = request.get_json(silent=True) or {}
+        reel_url = data.get('url') or request.form.get('url') or request.args.get('url')
+        
+        if not reel_url:
+            return jsonify({'success': False, 'error': 'URL is required'})
+        
+        # Download the reel
+        video_path = download_reel_with_audio(reel_url, download_dir=DOWNLOAD_FOLDER)
+        filename = os.path.basename(video_path)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Download completed',
+            'filename': filename
+        })
+        
+    except Exception as e:
+        logger.error(f"Download error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/auto-upload-async', methods=['POST'])
+def auto_upload_async():
+    """Start async upload process"""
+    try:
+        # Check authentication first
+        if not check_authentication():
+            return jsonify({'success': False, 'error': 'Not authenticated with YouTube'}), 401
+        
+        data = request.get_json(silent=True) or {}
+        reel_url = data.get('url') or request.form.get('url') or request.args.get('url')
+        
+        if not reel_url:
+            return jsonify({'success': False, 'error': 'URL is required'})
+        
+        # Create task
+        task_id = str(uuid.uuid4())
+        tasks.put(task_id, TaskStatus(task_id).to_dict())
+        
+        # Already uploaded this shortcode? Answer right away unless the client insists ("force": true).
+        # Otherwise the shortcode stays reserved for this task until its upload is recorded or it ends.
+        skip_duplicates = not data.get('force', False)
+        shortcode = extract_shortcode(reel_url)
+        holder = get_upload_index().reserve(shortcode, task_id, reel_url) if skip_duplicates and shortcode else None
+        if holder and holder.get('pending'):
+            tasks.delete(task_id)
+            return jsonify({
+                'success': False,
+                'error': 'This reel is already being uploaded',
+                'task_id': holder['task_id']
+            }), 409
+        if holder:
+            complete_as_duplicate(task_id, holder)
+            return jsonify({
+                'success': True,
+                'task_id': task_id,
+                'duplicate': True,
+                'youtube_url': holder['youtube_url'],
+                'message': 'This reel was already uploaded'
+            })
+        
+        use_metadata_cache = not data.get('refresh_metadata', False)
+        profile_requested = False
+        try:
+            if WORKER_MODE:
+                # A worker process picks it up; the profiling decision travels with the job
+                profile_requested = profiling.should_profile(bool(data.get('profile')))
+                queue_position = get_job_queue().enqueue(task_id, {
+                    'reel_url': reel_url,
+                    'use_metadata_cache': use_metadata_cache,
+                    'pipelined': data.get('pipelined'),
+                    'skip_duplicates': skip_duplicates,
+                    'profile': profile_requested,
+                })
+            elif PIPELINE_MODE == 'async':
+                # Starts right away on the event loop; profiling and pipelined uploads only apply to the worker pool
+                get_event_loop_runner().submit(
+                    async_background_upload_task(task_id, reel_url, use_metadata_cache, skip_duplicates)
+                )
+                queue_position = None
+            else:
+                # Hand the task to the worker pool, under cProfile/tracemalloc if asked for or sampled
+                profile_requested = profiling.should_profile(bool(data.get('profile')))
+                job = profiled_upload_task if profile_requested else background_upload_task
+                queue_position = scheduler.submit(
+                    task_id, job, task_id, reel_url,
+                    use_metadata_cache=use_metadata_cache,
+                    pipelined=data.get('pipelined'),
+                    skip_duplicates=skip_duplicates
+                )
+        except QueueFullError as e:
+            tasks.delete(task_id)
+            if skip_duplicates:
+                release_reservation(reel_url, task_id)
+            response = jsonify({
+                'success': False,
+                'error': 'Upload queue is full, please try again later',
+                'retry_after': e.retry_after
+            })
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, 429
+        tasks.update(task_id, {'queue_position': queue_position})
+        
+        return jsonify({
+            'success': True,
+            'task_id': task_id,
+            'queue_position': queue_position,
+            # Whether it ran under the profiler shows up as "profiled" in the task status
+            'profile_requested': profile_requested,
+            'message': 'Upload process queued'
+        })
+        
+    except Exception as e:
+        logger.error(f"Auto upload error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/batch-upload', methods=['POST'])
+def batch_upload():
+    """Run a list of reels through the download -> metadata -> upload pipeline, streaming JSONL results"""
+    if not check_authentication():
+        return jsonify({'success': False, 'error': 'Not authenticated with YouTube'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    urls = data.get('urls')
+    if not isinstance(urls, list) or not urls:
+        return jsonify({'success': False, 'error': 'A non-empty list of URLs is required'}), 400
+    if len(urls) > BATCH_MAX_URLS:
+        return jsonify({'success': False, 'error': f'At most {BATCH_MAX_URLS} URLs per batch'}), 413
+    
+    if data.get('privacy', 'unlisted') not in ('private', 'unlisted', 'public'):
+        return jsonify({'success': False, 'error': 'privacy must be private, unlisted or public'}), 400
+    
+    concurrency = data.get('concurrency') or {}
+    if not isinstance(concurrency, dict):
+        return jsonify({'success': False, 'error': 'concurrency must be an object'}), 400
+    workers = {}
+    for stage, limit in BATCH_MAX_WORKERS.items():
+        try:
+            workers[stage] = int(concurrency.get(stage, min(BATCH_DEFAULT_WORKERS[stage], limit)))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': f'concurrency.{stage} must be an integer'}), 400
+        if not 1 <= workers[stage] <= limit:
+            return jsonify({'success': False, 'error': f'concurrency.{stage} must be between 1 and {limit}'}), 400
+    
+    pipeline = BatchPipeline(
+        download_workers=workers['download'],
+        metadata_workers=workers['metadata'],
+        upload_workers=workers['upload'],
+        download_dir=DOWNLOAD_FOLDER,
+        privacy_status=data.get('privacy', 'unlisted'),
+        use_metadata_cache=not data.get('refresh_metadata', False),
+        api_key=GEMINI_API_KEY,
+        scheduler=scheduler,
+        skip_duplicates=not data.get('force', False)
+    )
+    
+    def generate():
+        try:
+            for result in pipeline.run(str(url) for url in urls):
+                yield json.dumps(result, ensure_ascii=False) + '\n'
+        finally:
+            # Client went away: don't start the remaining reels
+            pipeline.stop()
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.route('/task-status/<task_id>')
+def get_task_status(task_id):
+    """Get task status"""
+    try:
+        task = tasks.get(task_id)
+        if task is None:
+            return jsonify({'success': False, 'error': 'Task not found'})
+        
+        return jsonify({
+            'success': True,
+            'task': task_payload(task)
+        })
+        
+    except Exception as e:
+        logger.error(f"Error getting task status: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/task-events/<task_id>')
+def task_event_stream(task_id):
+    """Stream task status changes as Server-Sent Events until the task finishes or the stream's time is up"""
+    task = tasks.get(task_id)
+    if task is None:
+        return jsonify({'success': False, 'error': 'Task not found'}), 404
+    if not sse_slots.acquire(blocking=False):
+        response = jsonify({'success': False, 'error': 'Too many open event streams, poll /task-status instead'})
+        response.headers['Retry-After'] = str(SSE_RETRY_MS // 1000)
+        return response, 503
+    
+    def generate():
+        last_task = task
+        version = task_events.version(task_id)
+        closes_at = time.monotonic() + SSE_MAX_STREAM_SECONDS
+        yield f"retry: {SSE_RETRY_MS}\ndata: {json.dumps(task_payload(last_task))}\n\n"
+        
+        while last_task['status'] not in FINISHED_STATUSES:
+            remaining = closes_at - time.monotonic()
+            if remaining <= 0:
+                # The browser reconnects and gets a fresh stream, freeing this thread meanwhile
+                break
+            event = task_events.wait(task_id, version, timeout=min(SSE_STORE_POLL_SECONDS, remaining))
+            if event is not None:
+                version, current = event
+            else:
+                # No local update; the task may be running in another worker process
+                current = tasks.get(task_id)
+                if current is None:
+                    break
+                if current == last_task:
+                    yield ": keep-alive\n\n"
+                    continue
+            
+            last_task = current
+            yield f"data: {json.dumps(task_payload(last_task))}\n\n"
+    
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # Runs when the server closes the response, even if the stream was never read
+    response.call_on_close(sse_slots.release)
+    return response
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Pipeline metrics of this worker process in the Prometheus text format"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/debug/profiles')
+def debug_profiles():
+    """Recently profiled tasks"""
+    if not profiling.enabled():
+        return jsonify({'success': False, 'error': 'Profiling is disabled'}), 404
+    return jsonify({'success': True, 'profiles': profiling.list_profiles()})
+
+@app.route('/debug/profiles/<task_id>')
+def debug_profile(task_id):
+    """Hottest functions of a profiled task and process-wide allocation sites while it ran; ?format=pstats downloads the raw profile"""
+    if not profiling.enabled():
+        return jsonify({'success': False, 'error': 'Profiling is disabled'}), 404
+    summary = profiling.load_profile(task_id)
+    if summary is None:
+        return jsonify({'success': False, 'error': 'No profile for this task'}), 404
+    if request.args.get('format') == 'pstats':
+        return send_file(os.path.abspath(summary['files']['pstats']), as_attachment=True,
+                         download_name=f"{task_id}.pstats")
+    return jsonify({'success': True, 'profile': summary})
+
+@lru_cache(maxsize=1024)
+def video_etag(file_path: str, size: int, mtime_ns: int) -> str:
+    """Strong ETag from the content hash and mtime; cached per file version so it's hashed once"""
+    return f"{file_sha256(file_path)[:32]}-{mtime_ns:x}"
+
+@app.route('/get-video/<filename>')
+def get_video(filename):
+    """Download video file, with Range and If-None-Match support"""
+    try:
+        file_path = safe_join(DOWNLOAD_FOLDER, filename)
+        if file_path is None or not os.path.isfile(file_path):
+            return jsonify({'error': 'File not found'}), 404
+        
+        stat = os.stat(file_path)
+        etag = video_etag(os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        
+        if VIDEO_OFFLOAD == 'x-accel':
+            # nginx serves the bytes (and ranges) from an internal location; we only answer revalidation
+            response = Response(mimetype='video/mp4')
+            response.headers['X-Accel-Redirect'] = VIDEO_ACCEL_PREFIX.rstrip('/') + '/' + filename
+            response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+            response.set_etag(etag)
+            response.last_modified = stat.st_mtime
+            response.cache_control.max_age = VIDEO_CACHE_MAX_AGE
+            return response.make_conditional(request)
+        
+        # Werkzeug answers Range / If-Range / If-None-Match itself; with USE_X_SENDFILE the body is left to the proxy
+        return send_file(os.path.abspath(file_path), as_attachment=True, conditional=True, etag=etag,
+                         max_age=VIDEO_CACHE_MAX_AGE)
+    except Exception as e:
+        logger.error(f"Error serving video: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/generate-preview', methods=['POST'])
+def generate_preview():
+    """Generate metadata preview by downloading and analyzing video"""
+    try:
+        data = request.get_json(silent=True) or {}
+        reel_url = data.get('url') or request.form.get('url') or request.args.get('url')
+        
+        if not reel_url:
+            return jsonify({'success': False, 'error': 'URL is required'})
+        
+        try:
+            # Download the video for analysis; it stays cached for the upload that usually follows
+            video_path = download_reel_with_audio(reel_url, download_dir=DOWNLOAD_FOLDER)
+            
+            # Create AI Metadata Generator instance
+            ai_generator = AIMetadataGenerator(GEMINI_API_KEY)
+            
+            # Generate metadata based on actual video content
+            generated_metadata = ai_generator.generate_complete_metadata(
+                video_path=video_path,
+                use_cache=not data.get('refresh_metadata', False),
+                content_hash=file_sha256(video_path),
+                target_audience="social media users"
+            )
+            
+            return jsonify({
+                'success': True,
+                'title': generated_metadata['title'],
+                'description': generated_metadata['description'],
+                'tags': generated_metadata['tags'],
+                'hashtags': generated_metadata['hashtags'],
+                'video_analysis': generated_metadata.get('video_analysis', 'Analysis unavailable')
+            })
+            
+        except Exception as e:
+            logger.warning(f"AI metadata generation preview failed: {str(e)}")
+            # Fallback metadata
+            return jsonify({
+                'success': True,
+                'title': 'Amazing Social Media Content',
+                'description': f'Check out this amazing content from social media!\n\nSource: {reel_url}\n\n#SocialMedia #Viral #Content',
+                'tags': ['social media', 'viral', 'entertainment', 'content'],
+                'hashtags': ['#SocialMedia', '#Viral', '#Content', '#Entertainment']
+            })
+        
+    except Exception as e:
+        logger.error(f"Preview generation error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/get-channel-info')
+def channel_info():
+    """Get information about the connected YouTube channel"""
+    try:
+        if not check_authentication():
+            return jsonify({'authenticated': False})
+            
+        channel_data = get_channel_info()
+        if channel_data:
+            return jsonify({
+                'authenticated': True,
+                'channel': channel_data
+            })
+        else:
+            return jsonify({'authenticated': True, 'channel': None})
+    except Exception as e:
+        logger.error(f"Error getting channel info: {str(e)}")
+        return jsonify({'authenticated': False, 'error': str(e)})
+
+@app.route('/logout', methods=['POST'])
+def logout():
+    """Logout from YouTube by revoking credentials"""
+    try:
+        success = logout_youtube()
+        return jsonify({'success': success})
+    except Exception as e:
+        logger.error(f"Error during logout: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.errorhandler(404)
+def not_found(error):
+    return jsonify({'error': 'Not found'}), 404
+
+@app.errorhandler(500)
+def internal_error(error):
+    return jsonify({'error': 'Internal server error'}), 500
+
+def warm_up():
+    """Import the lazily loaded heavy modules (OpenCV, NumPy, Gemini, Instaloader, YouTube client).
+
+    Called from gunicorn's master with preload_app so every worker inherits them
+    through copy-on-write instead of importing them on its first upload.
+    """
+    started = time.monotonic()
+    lazy_imports.load_all()
+    logger.info(f"Warm-up imports finished in {time.monotonic() - started:.2f}s")
+
+if __name__ == '__main__':
+    print("🚀 YouTube Automation Machine Starting...")
+   
+    print(f"📁 Downloads folder: {DOWNLOAD_FOLDER}")
+    print(f"🤖 Gemini AI: {'Configured' if GEMINI_API_KEY and GEMINI_API_KEY != 'your-gemini-api-key-here' else 'Not configured (using fallback)'}")
+    print( )
+  
+    
+    app.run(debug=True, threaded=True)
+
@@ -0,0 +1,310 @@
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import asyncio
+import logging
+import argparse
+import threading
+from contextlib import nullcontext, redirect_stdout
+from typing import Any, Dict, Iterable, Iterator, Optional
+from dotenv import load_dotenv
+
+from downloader import download_reel_with_audio, extract_shortcode, file_sha256
+from uploader import upload_to_youtube
+from ai_genrator import AIMetadataGenerator
+from scheduler import JobScheduler
+from metrics import stage_seconds, tasks_finished
+from upload_index import get_upload_index, video_identity, record_upload, release_reservation
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the input in a stage queue
+_DONE = object()
+
+
+def build_upload_metadata(video_path: str, reel_url: str, api_key: Optional[str] = None,
+                          use_metadata_cache: bool = True) -> Dict[str, Any]:
+    """Generate YouTube metadata for a downloaded reel, falling back to generic metadata on failure"""
+    try:
+        # Create AI Metadata Generator instance
+        ai_generator = AIMetadataGenerator(api_key)
+
+        # Generate metadata based on actual video content
+        generated_metadata = ai_generator.generate_complete_metadata(
+            video_path=video_path,
+            use_cache=use_metadata_cache,
+            content_hash=file_sha256(video_path),
+            target_audience="social media users"
+        )
+        metadata = _upload_fields(generated_metadata)
+
+    except Exception as e:
+        logger.warning(f"AI metadata generation failed: {str(e)}. Using fallback metadata.")
+        metadata = _fallback_upload_metadata(video_path, reel_url)
+
+    return metadata
+
+
+async def build_upload_metadata_async(video_path: str, reel_url: str, api_key: Optional[str] = None,
+                                      use_metadata_cache: bool = True) -> Dict[str, Any]:
+    """build_upload_metadata() for coroutines"""
+    try:
+        ai_generator = AIMetadataGenerator(api_key)
+        generated_metadata = await ai_generator.generate_complete_metadata_async(
+            video_path=video_path,
+            use_cache=use_metadata_cache,
+            content_hash=await asyncio.to_thread(file_sha256, video_path),
+            target_audience="social media users"
+        )
+        metadata = _upload_fields(generated_metadata)
+
+    except Exception as e:
+        logger.warning(f"AI metadata generation failed: {str(e)}. Using fallback metadata.")
+        metadata = _fallback_upload_metadata(video_path, reel_url)
+
+    return metadata
+
+
+def _upload_fields(generated_metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of a generated metadata package needed for the YouTube upload"""
+    metadata = {
+        'title': generated_metadata['title'],
+        'description': generated_metadata['description'],
+        'tags': generated_metadata['tags'],
+        'keywords': generated_metadata['keywords'],
+        'hashtags': generated_metadata['hashtags'],
+        'video_analysis': generated_metadata.get('video_analysis', 'Content analysis unavailable')
+    }
+
+    print(f"✅ AI metadata generated successfully")
+    print(f"📝 Title: {metadata['title']}")
+    return metadata
+
+
+def _fallback_upload_metadata(video_path: str, reel_url: str) -> Dict[str, Any]:
+    # Fallback metadata - still better than generic
+    filename = os.path.basename(video_path)
+    return {
+        'title': f'Amazing Social Media Content - {filename}',
+        'description': f'Check out this amazing content!\n\nOriginal source: {reel_url}\n\n#SocialMedia #Viral #Content #Entertainment',
+        'tags': ['social media', 'viral', 'entertainment', 'content', 'video'],
+        'keywords': ['social media video', 'viral content', 'entertainment'],
+        'hashtags': ['#SocialMedia', '#Viral', '#Content']
+    }
+
+
+class BatchPipeline:
+    """Streams reels through download -> metadata -> upload stages, each with its own worker count.
+
+    Stages are connected by bounded queues, so a slow stage applies backpressure
+    instead of piling up downloaded files. Results are yielded as each reel
+    finishes (in completion order), one dict per input URL. Given a scheduler, each
+    stage also holds a slot of the scheduler's limit for that stage, so batches and
+    single uploads in one process share the same caps. Reels found in the upload
+    index are reported as duplicates instead of being uploaded again, unless
+    ``skip_duplicates`` is off.
+    """
+
+    def __init__(self, download_workers: int = 4, metadata_workers: int = 2, upload_workers: int = 2,
+                 download_dir: str = 'downloads', privacy_status: str = 'unlisted',
+                 use_metadata_cache: bool = True, api_key: Optional[str] = None,
+                 scheduler: Optional[JobScheduler] = None, skip_duplicates: bool = True):
+        self.workers = {
+            'download': max(1, download_workers),
+            'metadata': max(1, metadata_workers),
+            'upload': max(1, upload_workers),
+        }
+        self.download_dir = download_dir
+        self.privacy_status = privacy_status
+        self.use_metadata_cache = use_metadata_cache
+        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+        self.scheduler = scheduler
+        self.skip_duplicates = skip_duplicates
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """Stop feeding new URLs; reels already in flight still finish"""
+        self._stopped.set()
+
+    def run(self, urls: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Process the URLs and yield one result per reel as soon as it finishes"""
+        queues = {stage: queue.Queue(maxsize=workers * 2) for stage, workers in self.workers.items()}
+        results = queue.Queue()
+        next_stage = {'download': 'metadata', 'metadata': 'upload', 'upload': None}
+        handlers = {'download': self._download, 'metadata': self._metadata, 'upload': self._upload}
+        submitted = [0]
+        feeding_done = threading.Event()
+
+        def feed():
+            try:
+                for url in urls:
+                    if self._stopped.is_set():
+                        break
+                    url = url.strip()
+                    if not url:
+                        continue
+                    queues['download'].put({'index': submitted[0], 'url': url, 'timings': {},
+                                            'queued_at': time.monotonic(),
+                                            'reservation_id': f'batch-{uuid.uuid4()}'})
+                    submitted[0] += 1
+            finally:
+                feeding_done.set()
+                for _ in range(self.workers['download']):
+                    queues['download'].put(_DONE)
+
+        def work(stage: str):
+            while True:
+                item = queues[stage].get()
+                if item is _DONE:
+                    return
+                started = time.monotonic()
+                if stage == 'download':
+                    stage_seconds.observe(started - item['queued_at'], stage='queue_wait')
+                try:
+                    with self.scheduler.stage(stage) if self.scheduler else nullcontext():
+                        handlers[stage](item)
+                except Exception as e:
+                    item.update({'status': 'failed', 'stage': stage, 'error': str(e)})
+                item['timings'][stage] = round(time.monotonic() - started, 3)
+                if item.get('status') or next_stage[stage] is None:
+                    if self.skip_duplicates:
+                        # No-op once the upload was recorded; otherwise lets the reel be submitted again
+                        release_reservation(item['url'], item['reservation_id'])
+                    results.put(item)
+                else:
+                    queues[next_stage[stage]].put(item)
+
+        def run_stage(stage: str):
+            threads = [threading.Thread(target=work, args=(stage,), name=f'batch-{stage}-{i}', daemon=True)
+                       for i in range(self.workers[stage])]
+            for thread in threads:
+                thread.start()
+            return threads
+
+        threading.Thread(target=feed, name='batch-feed', daemon=True).start()
+        stage_threads = {stage: run_stage(stage) for stage in self.workers}
+
+        def close_downstream():
+            # Once a stage drains, tell the next one there is nothing more coming
+            for stage in ('download', 'metadata'):
+                for thread in stage_threads[stage]:
+                    thread.join()
+                for _ in range(self.workers[next_stage[stage]]):
+                    queues[next_stage[stage]].put(_DONE)
+
+        threading.Thread(target=close_downstream, name='batch-close', daemon=True).start()
+
+        finished = 0
+        while not (feeding_done.is_set() and finished >= submitted[0]):
+            try:
+                item = results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            finished += 1
+            item.setdefault('status', 'completed')
+            for key in ('video_path', 'identity', 'reservation_id'):
+                item.pop(key, None)
+            stage_seconds.observe(time.monotonic() - item.pop('queued_at'), stage='task')
+            tasks_finished.inc(status=item['status'])
+            yield item
+
+    def _download(self, item: Dict[str, Any]):
+        shortcode = extract_shortcode(item['url'])
+        if self.skip_duplicates and shortcode:
+            holder = get_upload_index().reserve(shortcode, item['reservation_id'], item['url'])
+            if holder and holder.get('pending'):
+                raise Exception("This reel is already being uploaded")
+            if holder:
+                self._complete_as_duplicate(item, holder)
+                return
+
+        item['video_path'] = download_reel_with_audio(item['url'], download_dir=self.download_dir)
+        item['identity'] = video_identity(item['url'], item['video_path'])
+        if self.skip_duplicates:
+            duplicate = get_upload_index().find(content_hash=item['identity']['content_hash'],
+                                                fingerprint=item['identity']['fingerprint'])
+            if duplicate:
+                self._complete_as_duplicate(item, duplicate)
+
+    @staticmethod
+    def _complete_as_duplicate(item: Dict[str, Any], duplicate: Dict[str, Any]):
+        item.update({'status': 'completed', 'duplicate': True, 'matched_by': duplicate['match'],
+                     'video_id': duplicate['video_id'], 'youtube_url': duplicate['youtube_url']})
+
+    def _metadata(self, item: Dict[str, Any]):
+        item['metadata'] = build_upload_metadata(item['video_path'], item['url'], self.api_key,
+                                                 self.use_metadata_cache)
+
+    def _upload(self, item: Dict[str, Any]):
+        metadata = item['metadata']
+        video_id = upload_to_youtube(
+            video_path=item['video_path'],
+            title=metadata['title'],
+            description=metadata['description'],
+            tags=metadata['tags'],
+            privacy_status=self.privacy_status
+        )
+        item['video_id'] = video_id
+        item['youtube_url'] = f"https://www.youtube.com/watch?v={video_id}"
+        record_upload(item['url'], item['identity'], video_id, item['reservation_id'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Download, describe and upload many Instagram reels')
+    parser.add_argument('input', help='File with one reel URL per line, or - for stdin')
+    parser.add_argument('--output', default='-', help='JSONL results file (default: stdout)')
+    parser.add_argument('--download-workers', type=int, default=4, help='Concurrent downloads (default: 4)')
+    parser.add_argument('--metadata-workers', type=int, default=2, help='Concurrent AI metadata generations (default: 2)')
+    parser.add_argument('--upload-workers', type=int, default=2, help='Concurrent YouTube uploads (default: 2)')
+    parser.add_argument('--download-dir', default='downloads', help='Download folder (default: downloads)')
+    parser.add_argument('--privacy', default='unlisted', choices=['private', 'unlisted', 'public'],
+                        help='Privacy setting (default: unlisted)')
+    parser.add_argument('--refresh-metadata', action='store_true', help='Bypass the AI metadata cache')
+    parser.add_argument('--force', action='store_true', help='Upload reels that were already uploaded')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    input_file = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    output_file = sys.stdout if args.output == '-' else open(args.output, 'a', encoding='utf-8')
+
+    pipeline = BatchPipeline(
+        download_workers=args.download_workers,
+        metadata_workers=args.metadata_workers,
+        upload_workers=args.upload_workers,
+        download_dir=args.download_dir,
+        privacy_status=args.privacy,
+        use_metadata_cache=not args.refresh_metadata,
+        skip_duplicates=not args.force
+    )
+
+    completed = failed = 0
+    try:
+        # Progress chatter from the stages goes to stderr so stdout stays valid JSONL
+        with redirect_stdout(sys.stderr):
+            for result in pipeline.run(input_file):
+                output_file.write(json.dumps(result, ensure_ascii=False) + '\n')
+                output_file.flush()
+                if result['status'] == 'completed':
+                    completed += 1
+                else:
+                    failed += 1
+    except KeyboardInterrupt:
+        pipeline.stop()
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    print(f"Batch finished: {completed} completed, {failed} failed", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Local stand-ins for the Instagram CDN, the Gemini REST API and the YouTube upload API.
+
+One threaded HTTP server answers all three, so the pipeline can be benchmarked
+without network access or credentials:
+
+- ``GET/HEAD /cdn/<name>.mp4`` serves the sample video, with byte ranges
+- ``POST /v1beta/models/<model>:generateContent`` answers like Gemini
+- ``POST .../upload/.../videos?uploadType=resumable`` starts a resumable upload session,
+  ``PUT /upload-session/<id>`` takes chunks, ``PUT .../videos`` is videos.update
+"""
+import re
+import json
+import time
+import uuid
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+FAKE_METADATA = {
+    'frames': ['A person walks through a busy street', 'Close-up of a street food stall', 'Sunset over the city'],
+    'summary': 'A short walk through a city ending at sunset.',
+    'title': 'City Walk at Sunset 🌇 #shorts',
+    'description': 'A quick walk through the city.\n\n#shorts #viral #trending',
+    'tags': ['city', 'walk', 'sunset', 'street food', 'travel'],
+    'keywords': ['city walk', 'sunset', 'travel vlog'],
+    'trending_keywords': ['shorts', 'travel'],
+    'hashtags': ['#shorts', '#viral', '#trending'],
+}
+
+
+def make_sample_video(path: str, seconds: float = 6, width: int = 720, height: int = 1280, fps: int = 30):
+    """Write an MP4 with a visibly different scene every second, so frame selection has work to do"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    rng = np.random.default_rng(0)
+    try:
+        for second in range(int(np.ceil(seconds))):
+            base = rng.integers(0, 256, size=(height // 40, width // 40, 3), dtype=np.uint8)
+            scene = cv2.resize(base, (width, height), interpolation=cv2.INTER_NEAREST)
+            for i in range(fps):
+                frame = scene.copy()
+                cv2.putText(frame, f'{second}:{i:02d}', (40, 120), cv2.FONT_HERSHEY_SIMPLEX, 3, (255, 255, 255), 6)
+                writer.write(frame)
+    finally:
+        writer.release()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: 'FakeServices'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, status: int, body: bytes = b'', headers: Optional[Dict[str, str]] = None,
+              content_type: str = 'application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _json(self, status: int, data, headers: Optional[Dict[str, str]] = None):
+        self._send(status, json.dumps(data).encode('utf-8'), headers)
+
+    # Instagram CDN
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        if not self.path.startswith('/cdn/'):
+            return self._json(404, {'error': 'not found'})
+        self.server.count('cdn_requests')
+        time.sleep(self.server.cdn_latency)
+        video = self.server.video
+        match = re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        if not match:
+            if self.command == 'GET':
+                self.server.count('cdn_bytes', len(video))
+            return self._send(200, video, {'Accept-Ranges': 'bytes'}, 'video/mp4')
+        start = int(match.group(1))
+        end = min(int(match.group(2) or len(video) - 1), len(video) - 1)
+        if start >= len(video):
+            return self._send(416, headers={'Content-Range': f'bytes */{len(video)}'})
+        chunk = video[start:end + 1]
+        if self.command == 'GET':
+            self.server.count('cdn_bytes', len(chunk))
+        self._send(206, chunk, {'Accept-Ranges': 'bytes', 'Content-Range': f'bytes {start}-{end}/{len(video)}'},
+                   'video/mp4')
+
+    # Gemini and YouTube
+
+    def do_POST(self):
+        body = self._body()
+        if ':generateContent' in self.path:
+            return self._generate_content(json.loads(body or b'{}'))
+        if '/upload/' in self.path and 'uploadType=resumable' in self.path:
+            return self._start_upload()
+        self._json(404, {'error': 'not found'})
+
+    def do_PUT(self):
+        body = self._body()
+        if self.path.startswith('/upload-session/'):
+            return self._upload_chunk(self.path.rsplit('/', 1)[-1], body)
+        if re.search(r'/videos(\?|$)', self.path):
+            self.server.count('youtube_updates')
+            time.sleep(self.server.youtube_latency)
+            return self._json(200, json.loads(body or b'{}'))
+        self._json(404, {'error': 'not found'})
+
+    def _generate_content(self, request: Dict):
+        self.server.count('gemini_requests')
+        time.sleep(self.server.gemini_latency)
+        parts = [part for content in request.get('contents', []) for part in content.get('parts', [])]
+        prompt = ' '.join(part.get('text', '') for part in parts)
+        config = request.get('generationConfig') or request.get('generation_config') or {}
+        wants_json = 'json' in json.dumps(config).lower() or 'JSON' in prompt
+        text = json.dumps(FAKE_METADATA) if wants_json else FAKE_METADATA['title']
+        self._json(200, {
+            'candidates': [{
+                'content': {'parts': [{'text': text}], 'role': 'model'},
+                'finishReason': 'STOP',
+                'index': 0,
+            }],
+            'usageMetadata': {'promptTokenCount': len(prompt) // 4, 'candidatesTokenCount': len(text) // 4},
+        })
+
+    def _start_upload(self):
+        self.server.count('youtube_sessions')
+        time.sleep(self.server.youtube_latency)
+        session_id = uuid.uuid4().hex
+        total = int(self.headers.get('X-Upload-Content-Length') or 0)
+        with self.server.lock:
+            self.server.sessions[session_id] = {'received': 0, 'total': total}
+        host, port = self.server.server_address[:2]
+        self._json(200, {}, {'Location': f'http://{host}:{port}/upload-session/{session_id}'})
+
+    def _upload_chunk(self, session_id: str, body: bytes):
+        with self.server.lock:
+            session = self.server.sessions.get(session_id)
+        if session is None:
+            return self._json(404, {'error': 'upload session not found'})
+        time.sleep(self.server.youtube_latency)
+
+        content_range = self.headers.get('Content-Range', '')
+        match = re.match(r'bytes (\d+)-(\d+)/(\d+|\*)', content_range)
+        if match:
+            self.server.count('youtube_chunks')
+            self.server.count('youtube_bytes', len(body))
+            if match.group(3) != '*':
+                session['total'] = int(match.group(3))
+            session['received'] = int(match.group(2)) + 1
+        elif content_range.startswith('bytes */'):
+            # Status query after an error
+            session['total'] = int(content_range.split('/')[-1])
+
+        if session['total'] and session['received'] >= session['total']:
+            return self._json(200, {'id': f'fake{session_id[:7]}', 'kind': 'youtube#video'})
+        headers = {'Range': f"bytes=0-{session['received'] - 1}"} if session['received'] else {}
+        self._send(308, headers=headers)
+
+
+class FakeServices(ThreadingHTTPServer):
+    """Threaded server for all three stand-ins; use as a context manager"""
+
+    daemon_threads = True
+
+    def __init__(self, video: bytes, gemini_latency: float = 0.2, youtube_latency: float = 0.05,
+                 cdn_latency: float = 0.0, port: int = 0):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.video = video
+        self.gemini_latency = gemini_latency
+        self.youtube_latency = youtube_latency
+        self.cdn_latency = cdn_latency
+        self.sessions: Dict[str, Dict] = {}
+        self.stats: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.stats[name] = self.stats.get(name, 0) + amount
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='fake-services', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,117 @@
+"""Import-time benchmark for app.py.
+
+Imports the app in fresh interpreters with ``-X importtime``, reports the median
+total and the slowest modules, and fails if a module that is supposed to load
+lazily (OpenCV, NumPy, Gemini, Instaloader, the YouTube API client, aiohttp) was imported,
+if the median exceeds --max-ms, or if it regressed against --baseline.
+
+    python benchmarks/import_time.py --runs 5 --output import_baseline.json
+    python benchmarks/import_time.py --runs 5 --baseline import_baseline.json
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that importing app.py must not pull in
+LAZY_MODULES = (
+    'cv2',
+    'numpy',
+    'PIL.Image',
+    'google.generativeai',
+    'instaloader',
+    'googleapiclient.discovery',
+    'google_auth_oauthlib.flow',
+    'aiohttp',
+    'httplib2',
+    'google_auth_httplib2',
+)
+
+PROBE = (
+    "import sys, json; import app; "
+    "print(json.dumps([m for m in %r if m in sys.modules]))" % (LAZY_MODULES,)
+)
+
+
+def import_once() -> Tuple[float, Dict[str, float], List[str]]:
+    """Import app in a new interpreter; returns (total ms, cumulative ms per module app imports directly, eager lazy modules)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+        env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing app failed:\n{result.stderr[-2000:]}")
+
+    # Children are listed before their parent, indented two spaces per nesting level
+    total, modules, children = 0.0, {}, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, field = line[len('import time:'):].split('|')
+        name = field.strip()
+        depth = (len(field) - len(field.lstrip()) - 1) // 2
+        if depth == 1:
+            children[name] = int(cumulative) / 1000
+        elif depth == 0:
+            if name == 'app':
+                total, modules = int(cumulative) / 1000, children
+            children = {}
+    eager = json.loads(result.stdout.strip().splitlines()[-1])
+    return total, modules, eager
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure how long importing app.py takes')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to time (default: 5)')
+    parser.add_argument('--top', type=int, default=10, help='Slowest direct imports to report (default: 10)')
+    parser.add_argument('--max-ms', type=float, help='Fail if the median import takes longer than this')
+    parser.add_argument('--output', help='Write the JSON report here as well as to stdout')
+    parser.add_argument('--baseline', help='Baseline JSON report to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='Allowed increase of the median against the baseline (default: 0.25)')
+    args = parser.parse_args()
+
+    # The first run mostly measures a cold OS file cache; don't count it
+    import_once()
+    runs = [import_once() for _ in range(max(1, args.runs))]
+
+    totals = [total for total, _, _ in runs]
+    slowest = sorted(runs[-1][1].items(), key=lambda item: item[1], reverse=True)
+    eager = sorted(set(module for _, _, modules in runs for module in modules))
+    report = {
+        'python': sys.version.split()[0],
+        'runs': len(runs),
+        'median_ms': round(statistics.median(totals), 1),
+        'min_ms': round(min(totals), 1),
+        'max_ms': round(max(totals), 1),
+        'slowest_imports_ms': {name: round(ms, 1) for name, ms in slowest[:args.top]},
+        'eagerly_imported': eager,
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+    problems = [f"{module} is imported by app.py but should load lazily" for module in eager]
+    if args.max_ms is not None and report['median_ms'] > args.max_ms:
+        problems.append(f"median import {report['median_ms']}ms > budget {args.max_ms}ms")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if report['median_ms'] > baseline['median_ms'] * (1 + args.max_regression):
+            problems.append(f"median import {report['median_ms']}ms > baseline {baseline['median_ms']}ms")
+    for problem in problems:
+        print(f"REGRESSION: {problem}", file=sys.stderr)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+"""End-to-end pipeline benchmark against local stand-ins for Instagram, Gemini and YouTube.
+
+Runs N reels through background_upload_task, either through the Flask routes
+(/auto-upload-async + /task-status polling, using the app's scheduler) or by
+calling the task directly from a thread pool, and reports throughput, per-stage
+latency percentiles and peak RSS as JSON. Every fake reel serves the same sample
+video, so duplicate-upload detection is turned off; each task then downloads,
+generates metadata and uploads. With --baseline it exits non-zero when
+throughput or latency regressed past --max-regression, for use in CI.
+
+    python benchmarks/pipeline.py --tasks 40 --concurrency 4 --output bench.json
+    python benchmarks/pipeline.py --tasks 40 --concurrency 4 --baseline bench.json
+
+With --async the tasks run as coroutines on the app's event loop (PIPELINE_MODE=async)
+instead, all at once; --concurrency then only sizes the thread pool for blocking steps.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import shutil
+import argparse
+import tempfile
+import threading
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_services import FakeServices, make_sample_video  # noqa: E402
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5 - 1e-9)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        stage: {
+            'count': len(values),
+            'mean': round(sum(values) / len(values), 4),
+            'p50': round(percentile(values, 50), 4),
+            'p95': round(percentile(values, 95), 4),
+            'p99': round(percentile(values, 99), 4),
+        }
+        for stage, values in sorted(samples.items()) if values
+    }
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def write_fake_token(path: str):
+    """Credentials that never need a refresh; only the fake YouTube endpoint ever sees them"""
+    with open(path, 'w') as f:
+        json.dump({
+            'token': 'benchmark-token',
+            'refresh_token': 'benchmark-refresh',
+            'client_id': 'benchmark',
+            'client_secret': 'benchmark',
+            'token_uri': 'http://127.0.0.1:9/token',
+            'scopes': ['https://www.googleapis.com/auth/youtube.upload',
+                       'https://www.googleapis.com/auth/youtube.force-ssl'],
+            'expiry': '2099-01-01T00:00:00Z',
+        }, f)
+
+
+def configure_environment(args, services: FakeServices):
+    """Point the app at the stand-ins; must run before the app modules are imported"""
+    os.environ.update({
+        'GEMINI_API_KEY': 'benchmark',
+        'GEMINI_API_ENDPOINT': services.url,
+        'YOUTUBE_API_ENDPOINT': services.url + '/',
+        'TASK_STORE_BACKEND': 'memory',
+        'TASK_QUEUE_SIZE': str(max(args.tasks, 1)),
+        'WORKER_POOL_SIZE': str(args.concurrency),
+        'PIPELINED_UPLOAD': 'true' if args.pipelined else 'false',
+        'PIPELINE_MODE': 'async' if args.use_async else 'threads',
+        'ASYNC_MAX_TASKS': str(max(args.tasks, 1)),
+        'ASYNC_THREAD_WORKERS': str(args.concurrency),
+        'GEMINI_RPM': '1000000',
+        'GEMINI_TPM': '1000000000',
+        'YOUTUBE_DAILY_QUOTA': '1000000000',
+    })
+    # Stage limits default to the worker count; set them in the environment to benchmark other splits
+    for name in ('DOWNLOAD_CONCURRENCY', 'METADATA_CONCURRENCY', 'UPLOAD_CONCURRENCY'):
+        os.environ.setdefault(name, str(args.concurrency))
+    os.environ.pop('IG_SESSIONID', None)
+
+
+def instrument(app_module, samples: Dict[str, List[float]]):
+    """Wrap the stage entry points the app calls so each call's duration is recorded"""
+    lock = threading.Lock()
+
+    def record(stage, started):
+        with lock:
+            samples.setdefault(stage, []).append(time.monotonic() - started)
+
+    def timed(stage, fn):
+        if asyncio.iscoroutinefunction(fn):
+            async def async_wrapper(*args, **kwargs):
+                started = time.monotonic()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    record(stage, started)
+            return async_wrapper
+
+        def wrapper(*args, **kwargs):
+            started = time.monotonic()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(stage, started)
+        return wrapper
+
+    app_module.download_reel_with_audio = timed('download', app_module.download_reel_with_audio)
+    app_module.build_upload_metadata = timed('metadata', app_module.build_upload_metadata)
+    app_module.upload_to_youtube = timed('upload', app_module.upload_to_youtube)
+    app_module.background_upload_task = timed('task', app_module.background_upload_task)
+    app_module.download_reel_async = timed('download', app_module.download_reel_async)
+    app_module.build_upload_metadata_async = timed('metadata', app_module.build_upload_metadata_async)
+    app_module.upload_to_youtube_async = timed('upload', app_module.upload_to_youtube_async)
+    app_module.async_background_upload_task = timed('task', app_module.async_background_upload_task)
+
+
+def patch_external_lookups(services: FakeServices):
+    """Send Instagram lookups and YouTube media uploads to the stand-ins"""
+    import downloader
+    import googleapiclient.discovery as discovery
+
+    downloader.resolve_video_url = lambda shortcode, sessionid: f'{services.url}/cdn/{shortcode}.mp4'
+
+    # The client library keeps https for media uploads when only the host is overridden
+    original = discovery._fix_up_media_path_base_url
+
+    def keep_base_scheme(media_path_url, base_url):
+        from urllib.parse import urlparse, urlunparse
+        fixed = urlparse(original(media_path_url, base_url))
+        return urlunparse(fixed._replace(scheme=urlparse(base_url).scheme))
+
+    discovery._fix_up_media_path_base_url = keep_base_scheme
+
+
+def run_routes(app_module, urls: List[str], poll_interval: float):
+    """Submit through /auto-upload-async and poll /task-status; returns (latency, final task) per task id"""
+    client = app_module.app.test_client()
+    submitted = {}
+    for url in urls:
+        response = client.post('/auto-upload-async', json={'url': url, 'refresh_metadata': True, 'force': True})
+        data = response.get_json()
+        if response.status_code != 200 or not data.get('success'):
+            raise RuntimeError(f"Submit failed ({response.status_code}): {data}")
+        submitted[data['task_id']] = time.monotonic()
+
+    latencies, statuses = {}, {}
+    while len(latencies) < len(submitted):
+        for task_id, started in submitted.items():
+            if task_id in latencies:
+                continue
+            task = client.get(f'/task-status/{task_id}').get_json()['task']
+            if task['status'] in app_module.FINISHED_STATUSES:
+                latencies[task_id] = time.monotonic() - started
+                statuses[task_id] = task
+        time.sleep(poll_interval)
+    return latencies, statuses
+
+
+def run_direct(app_module, urls: List[str], concurrency: int):
+    """Call background_upload_task from a thread pool, bypassing the routes and the scheduler"""
+    task_ids = []
+    for url in urls:
+        task = app_module.TaskStatus(f'bench-{len(task_ids):05d}')
+        app_module.tasks.put(task.task_id, task.to_dict())
+        task_ids.append(task.task_id)
+
+    started = time.monotonic()
+    latencies = {}
+
+    if app_module.PIPELINE_MODE == 'async':
+        async def run_async(task_id, url):
+            await app_module.async_background_upload_task(task_id, url, use_metadata_cache=False,
+                                                          skip_duplicates=False)
+            latencies[task_id] = time.monotonic() - started
+
+        runner = app_module.get_event_loop_runner()
+        for future in [runner.submit(run_async(task_id, url)) for task_id, url in zip(task_ids, urls)]:
+            future.result()
+        return latencies, {task_id: app_module.tasks.get(task_id) for task_id in task_ids}
+
+    def run(task_id, url):
+        app_module.background_upload_task(task_id, url, use_metadata_cache=False, skip_duplicates=False)
+        latencies[task_id] = time.monotonic() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(run, task_id, url) for task_id, url in zip(task_ids, urls)]:
+            future.result()
+    return latencies, {task_id: app_module.tasks.get(task_id) for task_id in task_ids}
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions of this run against a baseline report"""
+    problems = []
+    if report['tasks_per_second'] < baseline['tasks_per_second'] * (1 - tolerance):
+        problems.append(f"throughput {report['tasks_per_second']} tasks/s < baseline "
+                        f"{baseline['tasks_per_second']} tasks/s")
+    for stage, stats in report['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if base and stats['p95'] > base['p95'] * (1 + tolerance):
+            problems.append(f"{stage} p95 {stats['p95']}s > baseline {base['p95']}s")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline end-to-end pipeline benchmark')
+    parser.add_argument('--tasks', type=int, default=20, help='Reels to process (default: 20)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Worker threads (default: 4)')
+    parser.add_argument('--mode', choices=['routes', 'direct'], default='routes',
+                        help='Drive the Flask routes, or call background_upload_task directly (default: routes)')
+    parser.add_argument('--pipelined', action='store_true', help='Upload while metadata is generated')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Run tasks as coroutines on the event loop (PIPELINE_MODE=async)')
+    parser.add_argument('--video', help='Sample MP4 to serve (default: generate one)')
+    parser.add_argument('--video-seconds', type=float, default=6, help='Length of the generated sample (default: 6)')
+    parser.add_argument('--gemini-latency', type=float, default=0.2, help='Seconds per Gemini call (default: 0.2)')
+    parser.add_argument('--youtube-latency', type=float, default=0.05,
+                        help='Seconds per YouTube request (default: 0.05)')
+    parser.add_argument('--cdn-latency', type=float, default=0.0, help='Seconds per CDN request (default: 0)')
+    parser.add_argument('--poll-interval', type=float, default=0.05, help='Task status polling interval')
+    parser.add_argument('--output', help='Write the JSON report here as well as to stdout')
+    parser.add_argument('--baseline', help='Baseline JSON report to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.15,
+                        help='Allowed throughput drop / p95 increase against the baseline (default: 0.15)')
+    parser.add_argument('--verbose', action='store_true', help='Show the app\'s own output')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='reel-bench-')
+    previous_cwd = os.getcwd()
+    output_path = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    video_path = os.path.abspath(args.video) if args.video else os.path.join(workdir, 'sample.mp4')
+
+    try:
+        # Task store, caches, quota ledger, token.json and downloads all live in the scratch directory
+        os.chdir(workdir)
+        if not args.video:
+            make_sample_video(video_path, seconds=args.video_seconds)
+        with open(video_path, 'rb') as f:
+            video = f.read()
+        write_fake_token('token.json')
+
+        with FakeServices(video, args.gemini_latency, args.youtube_latency, args.cdn_latency) as services:
+            configure_environment(args, services)
+            sink = sys.stderr if args.verbose else open(os.devnull, 'w')
+            with redirect_stdout(sink):
+                import logging
+                import app as app_module
+                if not args.verbose:
+                    logging.getLogger().setLevel(logging.ERROR)
+                patch_external_lookups(services)
+                samples: Dict[str, List[float]] = {}
+                instrument(app_module, samples)
+
+                urls = [f'https://www.instagram.com/reel/BENCH{i:05d}/' for i in range(args.tasks)]
+                started = time.monotonic()
+                if args.mode == 'routes':
+                    latencies, statuses = run_routes(app_module, urls, args.poll_interval)
+                else:
+                    latencies, statuses = run_direct(app_module, urls, args.concurrency)
+                wall = time.monotonic() - started
+
+            samples['end_to_end'] = list(latencies.values())
+            failures = [task.get('error') for task in statuses.values() if task and task['status'] != 'completed']
+            report = {
+                'config': {
+                    'tasks': args.tasks, 'concurrency': args.concurrency, 'mode': args.mode,
+                    'pipelined': args.pipelined, 'async': args.use_async, 'video_bytes': len(video),
+                    'gemini_latency': args.gemini_latency, 'youtube_latency': args.youtube_latency,
+                    'cdn_latency': args.cdn_latency,
+                },
+                'completed': args.tasks - len(failures),
+                'failed': len(failures),
+                'errors': sorted(set(failures))[:5],
+                'wall_seconds': round(wall, 3),
+                'tasks_per_second': round(args.tasks / wall, 3) if wall else None,
+                'stages': summarize(samples),
+                'peak_rss_mb': peak_rss_mb(),
+                'fake_services': dict(sorted(services.stats.items())),
+            }
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if output_path:
+        with open(output_path, 'w') as f:
+            f.write(text + '\n')
+
+    problems = [f"{report['failed']} task(s) failed"] if report['failed'] else []
+    if baseline_path:
+        with open(baseline_path) as f:
+            problems += compare(report, json.load(f), args.max_regression)
+    for problem in problems:
+        print(f"REGRESSION: {problem}", file=sys.stderr)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
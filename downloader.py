@@ -1,82 +1,628 @@
-import instaloader
-import os
-import requests
-from urllib.parse import urlparse
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-
-def extract_shortcode(reel_url: str) -> str:
-    """Extract shortcode from Instagram URL"""
-    path = urlparse(reel_url).path.strip("/")
-    parts = [p for p in path.split("/") if p]
-    if len(parts) >= 2 and parts[0] in {"reel", "p"}:
-        return parts[1]
-    return parts[-1] if parts else ""
-
-def download_reel_with_audio(reel_url: str, sessionid: str, download_dir: str = "downloads") -> str:
-    """Download Instagram Reel with audio"""
-    try:
-        L = instaloader.Instaloader()
-
-        # 🔑 Use sessionid from environment
-        L.context._session.cookies.set("sessionid", sessionid, domain=".instagram.com")
-
-        shortcode = extract_shortcode(reel_url)
-        post = instaloader.Post.from_shortcode(L.context, shortcode)
-
-        video_url = post.video_url
-        if not video_url and post.typename == "GraphSidecar":
-            for node in post.get_sidecar_nodes():
-                if node.is_video:
-                    video_url = node.video_url
-                    break
-
-        if not video_url:
-            raise Exception("No video URL found for this post")
-
-        os.makedirs(download_dir, exist_ok=True)
-        filepath = os.path.join(download_dir, f"reel_{shortcode}.mp4")
-
-        print("⬇️ Downloading video with audio...")
-        r = requests.get(video_url, stream=True)
-        with open(filepath, "wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-
-        return filepath
-
-    except Exception as e:
-        raise Exception(f"Failed to download reel: {str(e)}")
-
-def main():
-    print("Instagram Reel Downloader with Audio")
-    print("="*40)
-
-    try:
-        reel_url = input("Enter Instagram reel URL: ").strip()
-        if not reel_url:
-            print("No URL provided")
-            return
-
-        # Get sessionid from environment variable (now loaded from .env)
-        sessionid = os.getenv("IG_SESSIONID")
-        if not sessionid:
-            raise Exception("No IG_SESSIONID found! Please set in .env file.")
-
-        video_path = download_reel_with_audio(reel_url, sessionid)
-
-        print(f"\n✅ Successfully downloaded with audio!")
-        print(f"📁 File location: {video_path}")
-        print(f"📊 File size: {os.path.getsize(video_path) / 1024 / 1024:.2f} MB")
-
-    except Exception as e:
-        print(f"\n❌ Error: {str(e)}")
-        print("\nTips:")
-        print("- Make sure IG_SESSIONID is set in the .env file")
-        print("- If expired, grab a new sessionid from Chrome cookies")
-
-if __name__ == "__main__":
-    main()
+import os
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+
+from metrics import bytes_transferred, stage_seconds
+from lazy_imports import lazy_import
+from event_loop import http_session
+
+# Only needed to resolve a reel's video URL; loaded on first download
+instaloader = lazy_import('instaloader')
+# Only needed by the async pipeline
+aiohttp = lazy_import('aiohttp')
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Size bound for the on-disk reel cache
+DOWNLOAD_CACHE_MAX_BYTES = int(float(os.getenv("DOWNLOAD_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+# Entries used more recently than this are never evicted, so in-flight tasks keep their file
+DOWNLOAD_CACHE_MIN_AGE = float(os.getenv("DOWNLOAD_CACHE_MIN_AGE_SECONDS", "3600"))
+
+# Media download tuning: bytes per read, (connect, read) timeouts in seconds, pooled connections per host
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(1024 * 1024)))
+DOWNLOAD_TIMEOUT = (
+    float(os.getenv("DOWNLOAD_CONNECT_TIMEOUT", "10")),
+    float(os.getenv("DOWNLOAD_READ_TIMEOUT", "60"))
+)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+# Files at least this large are fetched as DOWNLOAD_CONNECTIONS parallel byte ranges
+DOWNLOAD_CONNECTIONS = int(os.getenv("DOWNLOAD_CONNECTIONS", "4"))
+PARALLEL_DOWNLOAD_MIN_BYTES = int(float(os.getenv("PARALLEL_DOWNLOAD_MIN_MB", "8")) * 1024 * 1024)
+# Attempts per download; each retry resumes from the .part file
+DOWNLOAD_ATTEMPTS = 3
+
+class ClientManager:
+    """Process-wide HTTP clients, so lookups and downloads reuse warm TCP/TLS connections.
+
+    Holds one pooled requests.Session for CDN downloads and one Instaloader per
+    Instagram sessionid. Clients are rebuilt after a fork, since pooled sockets
+    must not be shared between processes.
+    """
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE):
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._session = None
+        self._loaders = {}  # sessionid -> (Instaloader, lock)
+
+    def _reset_after_fork(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._session = None
+            self._loaders = {}
+
+    @property
+    def session(self) -> requests.Session:
+        """Pooled session for media downloads, retrying idempotent requests on transient errors"""
+        with self._lock:
+            self._reset_after_fork()
+            if self._session is None:
+                retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                              allowed_methods=["GET", "HEAD"])
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._session = session
+            return self._session
+
+    def instaloader(self, sessionid: Optional[str]):
+        """(Instaloader, lock) for a sessionid; hold the lock while using it, its context isn't thread-safe"""
+        with self._lock:
+            self._reset_after_fork()
+            if sessionid not in self._loaders:
+                L = instaloader.Instaloader(quiet=True)
+                if sessionid:
+                    L.context._session.cookies.set("sessionid", sessionid, domain=".instagram.com")
+                self._loaders[sessionid] = (L, threading.Lock())
+            return self._loaders[sessionid]
+
+clients = ClientManager()
+
+class DownloadCache:
+    """Size-bounded LRU cache of downloaded reels, keyed by Instagram shortcode.
+
+    Files live directly in the download folder as reel_<shortcode>.mp4; an SQLite
+    index next to them records size, SHA-256 and last use so every worker process
+    sees the same cache.
+    """
+
+    INDEX_NAME = ".reel_cache.db"
+
+    def __init__(self, cache_dir: str, max_bytes: int = DOWNLOAD_CACHE_MAX_BYTES,
+                 min_age: float = DOWNLOAD_CACHE_MIN_AGE):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.min_age = min_age
+        self.index_path = os.path.join(cache_dir, self.INDEX_NAME)
+        self._local = threading.local()
+        self._flight_lock = threading.Lock()
+        self._flights = {}  # shortcode -> [lock, waiter count]
+        self._async_flights = {}  # shortcode -> [asyncio.Lock, waiter count], only used on the event loop
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn().execute("""
+            CREATE TABLE IF NOT EXISTS reels (
+                shortcode TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.index_path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def single_flight(self, shortcode: str):
+        """Serialize work on one shortcode so concurrent requests share a single download"""
+        with self._flight_lock:
+            flight = self._flights.setdefault(shortcode, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                yield
+        finally:
+            with self._flight_lock:
+                flight[1] -= 1
+                if flight[1] == 0:
+                    self._flights.pop(shortcode, None)
+
+    @asynccontextmanager
+    async def async_single_flight(self, shortcode: str):
+        """single_flight() for coroutines running on the async pipeline's event loop"""
+        flight = self._async_flights.setdefault(shortcode, [asyncio.Lock(), 0])
+        flight[1] += 1
+        try:
+            async with flight[0]:
+                yield
+        finally:
+            flight[1] -= 1
+            if flight[1] == 0:
+                self._async_flights.pop(shortcode, None)
+
+    def get(self, shortcode: str) -> Optional[str]:
+        """Path of the cached reel, or None if missing or its file no longer matches the index"""
+        row = self._conn().execute(
+            "SELECT filename, size FROM reels WHERE shortcode = ?", (shortcode,)
+        ).fetchone()
+        if not row:
+            return None
+
+        filepath = os.path.join(self.cache_dir, row[0])
+        if not os.path.exists(filepath) or os.path.getsize(filepath) != row[1]:
+            self._conn().execute("DELETE FROM reels WHERE shortcode = ?", (shortcode,))
+            return None
+
+        self._conn().execute("UPDATE reels SET last_used = ? WHERE shortcode = ?", (time.time(), shortcode))
+        return filepath
+
+    def add(self, shortcode: str, filepath: str, sha256: str):
+        """Register a freshly downloaded file and evict old entries if over the size bound"""
+        self._conn().execute(
+            "INSERT OR REPLACE INTO reels (shortcode, filename, sha256, size, last_used) VALUES (?, ?, ?, ?, ?)",
+            (shortcode, os.path.basename(filepath), sha256, os.path.getsize(filepath), time.time())
+        )
+        self.evict()
+
+    def content_hash(self, filepath: str) -> Optional[str]:
+        """SHA-256 recorded when the file was downloaded, if it is a cached reel"""
+        row = self._conn().execute(
+            "SELECT sha256, size FROM reels WHERE filename = ?", (os.path.basename(filepath),)
+        ).fetchone()
+        if row and os.path.exists(filepath) and os.path.getsize(filepath) == row[1]:
+            return row[0]
+        return None
+
+    def evict(self):
+        """Drop least recently used reels until the cache fits in max_bytes"""
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM reels").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        cutoff = time.time() - self.min_age
+        for shortcode, filename, size in conn.execute(
+            "SELECT shortcode, filename, size FROM reels WHERE last_used < ? ORDER BY last_used", (cutoff,)
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, filename))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"⚠️ Could not evict cached reel {filename}: {e}")
+                continue
+            conn.execute("DELETE FROM reels WHERE shortcode = ?", (shortcode,))
+            total -= size
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_download_cache(download_dir: str = "downloads") -> DownloadCache:
+    """Shared DownloadCache for a download folder"""
+    key = os.path.abspath(download_dir)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = DownloadCache(download_dir)
+        return _caches[key]
+
+def file_sha256(filepath: str) -> str:
+    """SHA-256 of a file, reusing the hash recorded by the download cache when available"""
+    # Only consult a cache that already exists; any other folder (maybe read-only) is just hashed
+    cache_dir = os.path.dirname(filepath) or "."
+    if os.path.exists(os.path.join(cache_dir, DownloadCache.INDEX_NAME)):
+        try:
+            cached = get_download_cache(cache_dir).content_hash(filepath)
+        except (OSError, sqlite3.Error):
+            cached = None
+        if cached:
+            return cached
+
+    return _hash_file(filepath)
+
+def extract_shortcode(reel_url: str) -> str:
+    """Extract shortcode from Instagram URL"""
+    path = urlparse(reel_url).path.strip("/")
+    parts = [p for p in path.split("/") if p]
+    if len(parts) >= 2 and parts[0] in {"reel", "p"}:
+        return parts[1]
+    return parts[-1] if parts else ""
+
+def download_reel_with_audio(reel_url: str, sessionid: Optional[str] = None, download_dir: str = "downloads",
+                             use_cache: bool = True) -> str:
+    """Download Instagram Reel with audio, reusing a cached copy of the same shortcode"""
+    try:
+        # 🔑 Use sessionid from environment unless one is given
+        sessionid = sessionid or os.getenv("IG_SESSIONID")
+        shortcode = extract_shortcode(reel_url)
+        cache = get_download_cache(download_dir)
+
+        with cache.single_flight(shortcode):
+            if use_cache:
+                cached_path = cache.get(shortcode)
+                if cached_path:
+                    print(f"♻️ Using cached download for {shortcode}")
+                    return cached_path
+
+            filepath, sha256 = _fetch_reel(shortcode, sessionid, download_dir)
+            cache.add(shortcode, filepath, sha256)
+            return filepath
+
+    except Exception as e:
+        raise Exception(f"Failed to download reel: {str(e)}")
+
+async def download_reel_async(reel_url: str, sessionid: Optional[str] = None, download_dir: str = "downloads",
+                              use_cache: bool = True) -> str:
+    """download_reel_with_audio() for coroutines; the media is streamed with aiohttp.
+
+    Instaloader has no asyncio API, so the Instagram lookup and the cache index
+    updates run on worker threads.
+    """
+    try:
+        sessionid = sessionid or os.getenv("IG_SESSIONID")
+        shortcode = extract_shortcode(reel_url)
+        cache = get_download_cache(download_dir)
+
+        async with cache.async_single_flight(shortcode):
+            if use_cache:
+                cached_path = await asyncio.to_thread(cache.get, shortcode)
+                if cached_path:
+                    print(f"♻️ Using cached download for {shortcode}")
+                    return cached_path
+
+            video_url = await asyncio.to_thread(resolve_video_url, shortcode, sessionid)
+            filepath = _reel_path(shortcode, download_dir)
+
+            print("⬇️ Downloading video with audio...")
+            with stage_seconds.time(stage='download'):
+                sha256 = await stream_to_file_async(video_url, filepath)
+            await asyncio.to_thread(cache.add, shortcode, filepath, sha256)
+            return filepath
+
+    except Exception as e:
+        raise Exception(f"Failed to download reel: {str(e)}")
+
+def _fetch_reel(shortcode: str, sessionid: Optional[str], download_dir: str) -> Tuple[str, str]:
+    """Resolve the reel's video URL and stream it to disk; returns (path, sha256)"""
+    video_url = resolve_video_url(shortcode, sessionid)
+    filepath = _reel_path(shortcode, download_dir)
+
+    print("⬇️ Downloading video with audio...")
+    with stage_seconds.time(stage='download'):
+        sha256 = stream_to_file(video_url, filepath)
+    return filepath, sha256
+
+def _reel_path(shortcode: str, download_dir: str) -> str:
+    os.makedirs(download_dir, exist_ok=True)
+    return os.path.join(download_dir, f"reel_{shortcode}.mp4")
+
+def resolve_video_url(shortcode: str, sessionid: Optional[str]) -> str:
+    """Look up the CDN URL of a post's video through the shared Instaloader for this sessionid"""
+    L, lock = clients.instaloader(sessionid)
+    with lock, stage_seconds.time(stage='instagram_lookup'):
+        post = instaloader.Post.from_shortcode(L.context, shortcode)
+
+        video_url = post.video_url
+        if not video_url and post.typename == "GraphSidecar":
+            for node in post.get_sidecar_nodes():
+                if node.is_video:
+                    video_url = node.video_url
+                    break
+
+    if not video_url:
+        raise Exception("No video URL found for this post")
+    return video_url
+
+def stream_to_file(url: str, filepath: str) -> str:
+    """Download a URL to filepath with HTTP Range resume; returns the content SHA-256.
+
+    Bytes accumulate in <filepath>.part, so an interrupted download picks up where it
+    stopped on the next attempt. Large files are fetched as parallel byte ranges. The
+    size is checked against the length announced by the GET (or, failing that, the
+    HEAD probe) before the atomic rename into place.
+    """
+    part_path, lock_fd = _claim_part(filepath, threading.get_ident())
+    try:
+        total, ranges_supported = _probe(url)
+        last_error = None
+        for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+            try:
+                if (ranges_supported and total and total >= PARALLEL_DOWNLOAD_MIN_BYTES
+                        and DOWNLOAD_CONNECTIONS > 1):
+                    _download_ranges(url, part_path, total)
+                    sha256, expected = _hash_file(part_path), total
+                else:
+                    sha256, announced = _download_stream(url, part_path, ranges_supported)
+                    expected = announced if announced is not None else total
+
+                _finish_part(part_path, filepath, expected)
+                return sha256
+            except Exception as e:
+                last_error = e
+                print(f"⚠️ Download attempt {attempt}/{DOWNLOAD_ATTEMPTS} failed: {e}")
+                if attempt < DOWNLOAD_ATTEMPTS:
+                    time.sleep(_retry_delay(attempt))
+        raise Exception(f"Download failed after {DOWNLOAD_ATTEMPTS} attempts: {last_error}")
+    finally:
+        _release_part(part_path, lock_fd)
+
+async def stream_to_file_async(url: str, filepath: str) -> str:
+    """stream_to_file() for coroutines, over one pooled aiohttp connection.
+
+    Resumes from <filepath>.part and checks the result like the threaded version,
+    through the same helpers; only the HTTP transfer itself is async. Files aren't
+    split into parallel ranges: the event loop already overlaps many downloads at once.
+    """
+    part_path, lock_fd = _claim_part(filepath, id(asyncio.current_task()))
+    try:
+        last_error = None
+        for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+            try:
+                sha256, total = await _download_stream_async(url, part_path)
+                _finish_part(part_path, filepath, total)
+                return sha256
+            except Exception as e:
+                last_error = e
+                print(f"⚠️ Download attempt {attempt}/{DOWNLOAD_ATTEMPTS} failed: {e}")
+                if attempt < DOWNLOAD_ATTEMPTS:
+                    await asyncio.sleep(_retry_delay(attempt))
+        raise Exception(f"Download failed after {DOWNLOAD_ATTEMPTS} attempts: {last_error}")
+    finally:
+        _release_part(part_path, lock_fd)
+
+def _claim_part(filepath: str, owner: int) -> Tuple[str, Optional[int]]:
+    """(.part path, lock fd) for downloading filepath.
+
+    The shared <filepath>.part is resumable across attempts and restarts. If another
+    download holds its lock, a private part file named after owner is used instead
+    (and no lock fd is returned).
+    """
+    part_path = f"{filepath}.part"
+    lock_fd = _try_lock(f"{part_path}.lock")
+    if lock_fd is None:
+        # Another process is filling the .part file; download separately rather than corrupt it
+        part_path = f"{filepath}.{os.getpid()}.{owner}.part"
+    return part_path, lock_fd
+
+def _release_part(part_path: str, lock_fd: Optional[int]):
+    """Unlock the shared part file (keeping it for a later resume), or delete a private one"""
+    if lock_fd is not None:
+        os.close(lock_fd)
+        _remove_quietly(f"{part_path}.lock")
+    else:
+        _remove_quietly(part_path)
+        _remove_quietly(f"{part_path}.json")
+
+def _finish_part(part_path: str, filepath: str, expected: Optional[int]):
+    """Check the part file against the announced size and move it into place"""
+    size = os.path.getsize(part_path)
+    if expected is not None and size != expected:
+        raise Exception(f"Incomplete download: got {size} of {expected} bytes")
+
+    # Atomic so other processes never see a half-written reel
+    os.replace(part_path, filepath)
+    _remove_quietly(f"{part_path}.json")
+
+def _retry_delay(attempt: int) -> float:
+    return min(2 ** attempt, 10)
+
+def _try_lock(lock_path: str, stale_after: float = 900) -> Optional[int]:
+    """Exclusive lock file descriptor, or None if another live download holds it"""
+    for _ in range(2):
+        try:
+            return os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) < stale_after:
+                    return None
+                # Left behind by a crashed process
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+    return None
+
+def _probe(url: str) -> Tuple[Optional[int], bool]:
+    """(Content-Length or None, whether byte ranges are supported) from a HEAD request"""
+    try:
+        r = clients.session.head(url, allow_redirects=True, timeout=DOWNLOAD_TIMEOUT)
+        r.raise_for_status()
+    except requests.RequestException:
+        return None, False
+    length = r.headers.get("Content-Length")
+    total = int(length) if length and length.isdigit() else None
+    return total, r.headers.get("Accept-Ranges", "").lower() == "bytes"
+
+def _download_stream(url: str, part_path: str, ranges_supported: bool) -> Tuple[str, Optional[int]]:
+    """Single-connection download appending to part_path, resuming from its current size.
+
+    Returns (sha256, file size announced by the response or None).
+    """
+    offset = _resume_offset(part_path, ranges_supported)
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    with clients.session.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT, headers=headers) as r:
+        if r.status_code == 416:
+            # Range starts at the end: the previous attempt had everything
+            return _hash_file(part_path), _range_total(r.headers.get("Content-Range"))
+        r.raise_for_status()
+        offset, total = _resume_plan(offset, r.status_code, r.headers)
+
+        digest = hashlib.sha256()
+        if offset:
+            _hash_file(part_path, digest)
+        with open(part_path, "ab" if offset else "wb") as f:
+            for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+                    digest.update(chunk)
+                    bytes_transferred.inc(len(chunk), direction='download')
+    return digest.hexdigest(), total
+
+async def _download_stream_async(url: str, part_path: str) -> Tuple[str, Optional[int]]:
+    """_download_stream() for coroutines; returns (sha256, expected size or None)"""
+    offset = _resume_offset(part_path)
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    timeout = aiohttp.ClientTimeout(sock_connect=DOWNLOAD_TIMEOUT[0], sock_read=DOWNLOAD_TIMEOUT[1])
+
+    async with http_session().get(url, headers=headers, timeout=timeout) as r:
+        if r.status == 416:
+            # Range starts at the end: the previous attempt had everything
+            return await asyncio.to_thread(_hash_file, part_path), _range_total(r.headers.get("Content-Range"))
+        r.raise_for_status()
+        offset, total = _resume_plan(offset, r.status, r.headers)
+
+        digest = hashlib.sha256()
+        if offset:
+            await asyncio.to_thread(_hash_file, part_path, digest)
+        with open(part_path, "ab" if offset else "wb") as f:
+            async for chunk in r.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+                bytes_transferred.inc(len(chunk), direction='download')
+    return digest.hexdigest(), total
+
+def _resume_offset(part_path: str, ranges_supported: bool = True) -> int:
+    """Bytes of part_path a single-stream download can resume after"""
+    if os.path.exists(f"{part_path}.json"):
+        # Preallocated by an interrupted ranged download; its size says nothing about progress
+        _remove_quietly(part_path)
+        _remove_quietly(f"{part_path}.json")
+    return os.path.getsize(part_path) if ranges_supported and os.path.exists(part_path) else 0
+
+def _resume_plan(offset: int, status: int, headers) -> Tuple[int, Optional[int]]:
+    """(offset to append the response body at, complete file size or None) for a ranged GET's response"""
+    if offset and status != 206:
+        # Server ignored the Range header; start over
+        offset = 0
+    return offset, _response_total(status, headers)
+
+def _response_total(status: int, headers) -> Optional[int]:
+    """Complete file size announced by a GET: the Content-Range total for 206, else Content-Length"""
+    if status == 206:
+        return _range_total(headers.get("Content-Range"))
+    if headers.get("Content-Encoding", "identity").lower() != "identity":
+        # Content-Length counts the encoded bytes, not what ends up on disk
+        return None
+    length = headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+def _range_total(content_range: Optional[str]) -> Optional[int]:
+    """Complete length from a Content-Range header ("bytes 0-99/1234" or "bytes */1234")"""
+    total = (content_range or "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+def _download_ranges(url: str, part_path: str, total: int):
+    """Fetch a file as parallel byte ranges into a preallocated part_path.
+
+    Finished ranges are recorded in <part_path>.json so a retry only fetches the rest.
+    """
+    range_size = -(-total // DOWNLOAD_CONNECTIONS)
+    ranges = [(start, min(start + range_size, total) - 1) for start in range(0, total, range_size)]
+
+    state_path = f"{part_path}.json"
+    done = set()
+    if os.path.exists(part_path) and os.path.getsize(part_path) == total and os.path.exists(state_path):
+        with open(state_path) as f:
+            state = json.load(f)
+        if state.get("total") == total and state.get("ranges") == len(ranges):
+            done = set(state.get("done", []))
+    else:
+        with open(part_path, "wb") as f:
+            f.truncate(total)
+
+    state_lock = threading.Lock()
+
+    def fetch(index: int):
+        start, end = ranges[index]
+        headers = {"Range": f"bytes={start}-{end}"}
+        with clients.session.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT, headers=headers) as r:
+            r.raise_for_status()
+            if r.status_code != 206:
+                raise Exception("Server ignored the byte range request")
+            with open(part_path, "r+b") as f:
+                f.seek(start)
+                written = 0
+                for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if chunk:
+                        f.write(chunk)
+                        written += len(chunk)
+                        bytes_transferred.inc(len(chunk), direction='download')
+        if written != end - start + 1:
+            raise Exception(f"Range {start}-{end} returned {written} bytes")
+
+        with state_lock:
+            done.add(index)
+            with open(state_path, "w") as f:
+                json.dump({"total": total, "ranges": len(ranges), "done": sorted(done)}, f)
+
+    pending = [i for i in range(len(ranges)) if i not in done]
+    with ThreadPoolExecutor(max_workers=min(DOWNLOAD_CONNECTIONS, len(pending) or 1)) as executor:
+        for future in [executor.submit(fetch, i) for i in pending]:
+            future.result()
+
+def _hash_file(filepath: str, digest=None) -> str:
+    """Feed a file into a SHA-256 digest (a new one unless given) and return the hex digest"""
+    digest = digest or hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def main():
+    print("Instagram Reel Downloader with Audio")
+    print("="*40)
+
+    try:
+        reel_url = input("Enter Instagram reel URL: ").strip()
+        if not reel_url:
+            print("No URL provided")
+            return
+
+        # Get sessionid from environment variable (now loaded from .env)
+        sessionid = os.getenv("IG_SESSIONID")
+        if not sessionid:
+            raise Exception("No IG_SESSIONID found! Please set in .env file.")
+
+        video_path = download_reel_with_audio(reel_url, sessionid)
+
+        print(f"\n✅ Successfully downloaded with audio!")
+        print(f"📁 File location: {video_path}")
+        print(f"📊 File size: {os.path.getsize(video_path) / 1024 / 1024:.2f} MB")
+
+    except Exception as e:
+        print(f"\n❌ Error: {str(e)}")
+        print("\nTips:")
+        print("- Make sure IG_SESSIONID is set in the .env file")
+        print("- If expired, grab a new sessionid from Chrome cookies")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import os
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Coroutine, Dict
+
+from lazy_imports import lazy_import
+from scheduler import QueueFullError
+
+# Only needed by the async pipeline; loaded on first use
+aiohttp = lazy_import('aiohttp')
+
+# Connections the shared aiohttp session keeps open across all hosts
+ASYNC_HTTP_CONNECTIONS = int(os.getenv('ASYNC_HTTP_CONNECTIONS', '100'))
+
+_sessions = weakref.WeakKeyDictionary()  # event loop -> aiohttp.ClientSession
+_sessions_lock = threading.Lock()
+
+
+def http_session() -> 'aiohttp.ClientSession':
+    """Pooled aiohttp session for the running event loop; call from a coroutine"""
+    loop = asyncio.get_running_loop()
+    with _sessions_lock:
+        session = _sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=ASYNC_HTTP_CONNECTIONS))
+            _sessions[loop] = session
+        return session
+
+
+class EventLoopRunner:
+    """One asyncio event loop on a daemon thread, shared by every async upload task.
+
+    Coroutines are handed over from any thread with submit(). Blocking and CPU-bound
+    steps inside them (frame extraction, SQLite, Instaloader) go to the loop's default
+    executor, capped at max_threads, so a single thread can keep thousands of network
+    waits in flight. The loop is started on first use, and again after a fork, since
+    threads don't survive it.
+    """
+
+    def __init__(self, max_tasks: int = 1000, max_threads: int = 16):
+        self.max_tasks = max(1, max_tasks)
+        self.max_threads = max(1, max_threads)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._pid = None
+        self._in_flight = 0
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        if self._pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=self.max_threads,
+                                                         thread_name_prefix='async-pipeline'))
+            threading.Thread(target=self._run, args=(loop,), name='async-pipeline-loop', daemon=True).start()
+            self._loop = loop
+            self._pid = os.getpid()
+            self._in_flight = 0
+        return self._loop
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def submit(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the loop; raises QueueFullError when max_tasks are already in flight"""
+        with self._lock:
+            if self._in_flight >= self.max_tasks:
+                coro.close()
+                raise QueueFullError(retry_after=30)
+            loop = self._ensure_started()
+            self._in_flight += 1
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        future.add_done_callback(self._task_done)
+        return future
+
+    def _task_done(self, future: Future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'in_flight': self._in_flight if self._pid == os.getpid() else 0, 'max_tasks': self.max_tasks}
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_event_loop_runner() -> EventLoopRunner:
+    """Process-wide runner configured from ASYNC_MAX_TASKS / ASYNC_THREAD_WORKERS"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = EventLoopRunner(
+                int(os.getenv('ASYNC_MAX_TASKS', '1000')),
+                int(os.getenv('ASYNC_THREAD_WORKERS', str(min(32, (os.cpu_count() or 1) + 4))))
+            )
+        return _runner
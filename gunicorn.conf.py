@@ -0,0 +1,29 @@
+import gc
+import os
+import threading
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+# Import the app once in the master and fork workers from it, so they share its memory pages
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+
+def when_ready(server):
+    """With preload_app, load the heavy modules in the master before any worker is forked"""
+    if not preload_app:
+        return
+    from app import warm_up
+    warm_up()
+    # Keep the garbage collector from touching (and so copying) the preloaded objects in every worker
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    """Without preload_app, load the heavy modules in the background so the first upload doesn't wait for them"""
+    if preload_app:
+        return
+    from app import warm_up
+    threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from scheduler import QueueFullError
+
+
+class JobQueue:
+    """Durable FIFO of upload jobs in SQLite, shared by the web and worker processes.
+
+    A worker claims a job by leasing it for ``lease_seconds`` and keeps the lease
+    alive with heartbeat() while the job runs. If the worker dies (crash, OOM kill,
+    redeploy) the lease runs out and another worker picks the job up again, until
+    it has been attempted ``max_attempts`` times.
+    """
+
+    def __init__(self, path: str = 'jobs.db', max_size: int = 100, lease_seconds: float = 120,
+                 max_attempts: int = 3):
+        self.path = path
+        self.max_size = max(1, max_size)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._local = threading.local()
+        self._conn().execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                task_id TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                leased_until REAL,
+                created_at REAL NOT NULL
+            )
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def enqueue(self, task_id: str, payload: Dict) -> int:
+        """Add a job and return its 1-based queue position; raises QueueFullError when full"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE leased_until IS NULL").fetchone()[0]
+            if queued >= self.max_size:
+                raise QueueFullError(retry_after=30)
+            conn.execute("INSERT INTO jobs (task_id, payload, created_at) VALUES (?, ?, ?)",
+                         (task_id, json.dumps(payload), time.time()))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return queued + 1
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """Lease the oldest waiting job (or one whose worker stopped heartbeating) to worker"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE (leased_until IS NULL OR leased_until < ?) AND attempts < ?"
+                " ORDER BY id LIMIT 1", (now, self.max_attempts)
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE jobs SET attempts = attempts + 1, worker = ?, leased_until = ? WHERE id = ?",
+                             (worker, now + self.lease_seconds, row['id']))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return {'id': row['id'], 'task_id': row['task_id'], 'attempt': row['attempts'] + 1,
+                'payload': json.loads(row['payload'])}
+
+    def heartbeat(self, job_ids: List[int], worker: str):
+        """Extend the leases worker holds on job_ids"""
+        if job_ids:
+            self._conn().executemany(
+                "UPDATE jobs SET leased_until = ? WHERE id = ? AND worker = ?",
+                [(time.time() + self.lease_seconds, job_id, worker) for job_id in job_ids]
+            )
+
+    def complete(self, job_id: int):
+        """Remove a finished job; its outcome lives in the task store"""
+        self._conn().execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def reap(self) -> List[Dict]:
+        """Drop jobs whose lease ran out on their last attempt; returns their task ids and payloads"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT id, task_id, payload FROM jobs WHERE leased_until < ? AND attempts >= ?",
+                (time.time(), self.max_attempts)
+            ).fetchall()
+            conn.executemany("DELETE FROM jobs WHERE id = ?", [(row['id'],) for row in rows])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [{'task_id': row['task_id'], 'payload': json.loads(row['payload'])} for row in rows]
+
+    def position(self, task_id: str) -> Optional[int]:
+        """1-based position of a waiting job, or None once it has been claimed (or is unknown)"""
+        row = self._conn().execute(
+            "SELECT (SELECT COUNT(*) FROM jobs AS ahead WHERE ahead.leased_until IS NULL AND ahead.id <= jobs.id)"
+            " FROM jobs WHERE task_id = ? AND leased_until IS NULL", (task_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def stats(self) -> Dict[str, int]:
+        """Waiting and leased job counts"""
+        row = self._conn().execute(
+            "SELECT COALESCE(SUM(leased_until IS NULL), 0), COALESCE(SUM(leased_until IS NOT NULL), 0) FROM jobs"
+        ).fetchone()
+        return {'queued': row[0], 'running': row[1], 'max_queue_size': self.max_size}
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide queue configured from JOB_QUEUE_PATH / TASK_QUEUE_SIZE / JOB_LEASE_SECONDS / JOB_MAX_ATTEMPTS"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(
+                os.getenv('JOB_QUEUE_PATH', 'jobs.db'),
+                int(os.getenv('TASK_QUEUE_SIZE', '100')),
+                float(os.getenv('JOB_LEASE_SECONDS', '120')),
+                int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+            )
+        return _queue
@@ -0,0 +1,65 @@
+import importlib
+import threading
+from types import ModuleType
+from typing import List, Tuple
+
+# Every lazy module created so far, so warm_up() can load them all in one go
+_registry: List['LazyModule'] = []
+_registry_lock = threading.Lock()
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+
+    ``submodules`` are imported along with the module, so code written as
+    ``import googleapiclient.discovery`` / ``googleapiclient.discovery.build(...)``
+    keeps working unchanged.
+    """
+
+    def __init__(self, name: str, submodules: Tuple[str, ...] = ()):
+        self.__dict__['_name'] = name
+        self.__dict__['_submodules'] = submodules
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__['_module']
+        if module is None:
+            with self.__dict__['_lock']:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    for submodule in self._submodules:
+                        importlib.import_module(f"{self._name}.{submodule}")
+                    self.__dict__['_module'] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name: str, *submodules: str) -> LazyModule:
+    """Module proxy that defers ``import name`` (and its submodules) until first use"""
+    module = LazyModule(name, submodules)
+    with _registry_lock:
+        _registry.append(module)
+    return module
+
+
+def load_all():
+    """Import every module registered through lazy_import"""
+    with _registry_lock:
+        modules = list(_registry)
+    for module in modules:
+        module._load()
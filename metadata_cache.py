@@ -0,0 +1,77 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+
+class MetadataCache:
+    """Persistent cache of generated metadata, keyed by video content hash plus generator version.
+
+    Entries older than ``ttl_seconds`` are treated as misses and purged on write.
+    """
+
+    def __init__(self, path: str = 'metadata_cache.db', ttl_seconds: float = 7 * 86400):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._conn().execute("""
+            CREATE TABLE IF NOT EXISTS metadata (
+                cache_key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def make_key(content_hash: str, **version_parts) -> str:
+        """Cache key from the video hash and everything that changes the generated output"""
+        parts = json.dumps(version_parts, sort_keys=True, default=str)
+        return hashlib.sha256(f"{content_hash}:{parts}".encode('utf-8')).hexdigest()
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        row = self._conn().execute(
+            "SELECT data, created_at FROM metadata WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+        if not row or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def put(self, cache_key: str, metadata: Dict):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO metadata (cache_key, data, created_at) VALUES (?, ?, ?)",
+            (cache_key, json.dumps(metadata, ensure_ascii=False), now)
+        )
+        conn.execute("DELETE FROM metadata WHERE created_at < ?", (now - self.ttl_seconds,))
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_metadata_cache() -> MetadataCache:
+    """Process-wide cache configured from METADATA_CACHE_PATH / METADATA_CACHE_TTL_SECONDS"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = MetadataCache(
+                os.getenv('METADATA_CACHE_PATH', 'metadata_cache.db'),
+                float(os.getenv('METADATA_CACHE_TTL_SECONDS', str(7 * 86400)))
+            )
+        return _default_cache
@@ -0,0 +1,205 @@
+import time
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds in seconds; reels take seconds to minutes per stage, Gemini calls well under a minute
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(zip(labelnames, values)) + list((extra or {}).items())
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return '\n'.join(header + self.samples())
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in values]
+
+
+class Gauge(_Metric):
+    """A gauge read from a callback at scrape time, e.g. the scheduler's queue depth"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.read = read
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_format_value(self.read())}"]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._values: Dict[Tuple, Tuple[List[int], List[float]]] = {}  # key -> (bucket counts, [sum])
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * len(self.buckets), [0.0]))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe how long the block takes, whether or not it raises"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, {'le': _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Metrics of this process, rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            # Re-registering (e.g. a gauge bound again on app reload) replaces the old one
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = Registry()
+
+stage_seconds = REGISTRY.register(Histogram(
+    'reel_stage_duration_seconds',
+    'Time spent in each pipeline stage (task covers a whole reel end to end)',
+    ['stage']
+))
+bytes_transferred = REGISTRY.register(Counter(
+    'reel_bytes_transferred_total',
+    'Video bytes fetched from Instagram (download) or acknowledged by YouTube (upload)',
+    ['direction']
+))
+gemini_calls = REGISTRY.register(Counter(
+    'gemini_calls_total',
+    'Gemini generate_content calls by call site',
+    ['call']
+))
+gemini_failures = REGISTRY.register(Counter(
+    'gemini_call_failures_total',
+    'Gemini generate_content calls that raised, by call site',
+    ['call']
+))
+gemini_seconds = REGISTRY.register(Histogram(
+    'gemini_call_duration_seconds',
+    'Latency of Gemini generate_content calls, excluding rate-limit waits',
+    ['call']
+))
+tasks_finished = REGISTRY.register(Counter(
+    'reel_tasks_finished_total',
+    'Upload tasks that reached a final status',
+    ['status']
+))
+
+
+def register_gauge(name: str, documentation: str, read: Callable[[], float]) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, read))
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port: int, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+    """Serve /metrics on a daemon thread, for processes without a web app (e.g. worker.py)"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
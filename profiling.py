@@ -0,0 +1,170 @@
+import os
+import re
+import io
+import json
+import time
+import pstats
+import random
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Where per-task profiles are written: <task_id>.pstats, <task_id>.alloc.txt and <task_id>.json
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+# Fraction of tasks profiled without being asked to (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+# Allow clients to ask for a profile per task, and serve the /debug/profiles endpoints
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+# Profiles kept on disk; the oldest are deleted when a new one would exceed this
+PROFILE_MAX_COUNT = int(os.getenv('PROFILE_MAX_COUNT', '100'))
+# Stack depth recorded per allocation, and how many functions / allocation sites the summary keeps
+TRACEMALLOC_FRAMES = 10
+SUMMARY_TOP_N = 25
+
+_TASK_ID = re.compile(r'^[\w-]+$')
+
+# cProfile and tracemalloc are process-wide, so only one task is profiled at a time
+_slot = threading.Lock()
+
+
+def enabled() -> bool:
+    """True when profiles can be produced, either on request or by sampling"""
+    return PROFILING_ENABLED or PROFILE_SAMPLE_RATE > 0
+
+
+def should_profile(requested: bool = False) -> bool:
+    """Decide whether to profile a new task: asked for explicitly, or picked by the sample rate"""
+    if requested and PROFILING_ENABLED:
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+@contextmanager
+def profile(task_id: str):
+    """Run the block under cProfile and tracemalloc and write the results for task_id.
+
+    Yields whether the block is actually profiled: if another task is already being
+    profiled, it runs unprofiled. cProfile only sees the calling thread; work handed
+    to helper threads (parallel Gemini calls, pipelined uploads) shows up as time
+    spent waiting on them. tracemalloc traces the whole process, so the memory
+    figures also include allocations of every other task running at the same time.
+    """
+    if not _TASK_ID.match(task_id):
+        print(f"⚠️ Not profiling task {task_id}: the id can't be used as a file name")
+        yield False
+        return
+    if not _slot.acquire(blocking=False):
+        print(f"⚠️ Not profiling task {task_id}: another task is being profiled")
+        yield False
+        return
+
+    try:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        profiler = cProfile.Profile()
+        started = time.time()
+        profiler.enable()
+        try:
+            yield True
+        finally:
+            profiler.disable()
+            wall_seconds = time.time() - started
+            snapshot = tracemalloc.take_snapshot()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            try:
+                _write_profile(task_id, profiler, snapshot, wall_seconds, peak_bytes, started)
+            except Exception as e:
+                print(f"❌ Failed to write profile for task {task_id}: {e}")
+    finally:
+        _slot.release()
+
+
+def _write_profile(task_id: str, profiler: cProfile.Profile, snapshot: tracemalloc.Snapshot,
+                   wall_seconds: float, peak_bytes: int, started: float):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, task_id)
+    profiler.dump_stats(f"{base}.pstats")
+
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ])
+    allocations = snapshot.statistics('lineno')
+    with open(f"{base}.alloc.txt", 'w', encoding='utf-8') as f:
+        f.write("Process-wide allocations while this task ran (includes other tasks running at the same time)\n\n")
+        for stat in allocations[:SUMMARY_TOP_N]:
+            f.write(f"{stat}\n")
+        f.write("\nLargest allocation sites with call stacks:\n")
+        for stat in snapshot.statistics('traceback')[:5]:
+            f.write(f"\n{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+            f.write('\n'.join(stat.traceback.format()) + '\n')
+
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+    summary = {
+        'task_id': task_id,
+        'started_at': started,
+        'wall_seconds': round(wall_seconds, 3),
+        # tracemalloc can't tell tasks apart: memory figures cover the whole process
+        'process_peak_traced_bytes': peak_bytes,
+        'top_functions': [
+            {
+                'function': f"{os.path.basename(filename)}:{line}({name})",
+                'calls': total_calls,
+                'self_seconds': round(self_time, 4),
+                'cumulative_seconds': round(cumulative, 4),
+            }
+            for (filename, line, name), (_, total_calls, self_time, cumulative, _) in functions[:SUMMARY_TOP_N]
+        ],
+        'process_top_allocations': [
+            {'location': str(stat.traceback[0]), 'size_bytes': stat.size, 'blocks': stat.count}
+            for stat in allocations[:SUMMARY_TOP_N]
+        ],
+        'files': {'pstats': f"{base}.pstats", 'allocations': f"{base}.alloc.txt"},
+    }
+    with open(f"{base}.json", 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    print(f"🔬 Profile for task {task_id} written to {base}.*")
+    _prune_profiles()
+
+
+def _prune_profiles():
+    """Delete the oldest profiles beyond PROFILE_MAX_COUNT"""
+    names = [name for name in os.listdir(PROFILE_DIR) if name.endswith('.json')]
+    paths = sorted((os.path.join(PROFILE_DIR, name) for name in names), key=os.path.getmtime, reverse=True)
+    for path in paths[max(1, PROFILE_MAX_COUNT):]:
+        base = path[:-len('.json')]
+        for suffix in ('.json', '.pstats', '.alloc.txt'):
+            try:
+                os.remove(base + suffix)
+            except OSError:
+                pass
+
+
+def load_profile(task_id: str) -> Optional[Dict]:
+    """Summary written for task_id, or None if it was not profiled"""
+    if not _TASK_ID.match(task_id):
+        return None
+    try:
+        with open(os.path.join(PROFILE_DIR, f"{task_id}.json"), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def list_profiles(limit: int = 50) -> List[Dict]:
+    """Most recent profiles, newest first, without the per-function detail"""
+    try:
+        names = [name for name in os.listdir(PROFILE_DIR) if name.endswith('.json')]
+    except OSError:
+        return []
+    paths = sorted((os.path.join(PROFILE_DIR, name) for name in names), key=os.path.getmtime, reverse=True)
+    profiles = []
+    for path in paths[:limit]:
+        summary = load_profile(os.path.basename(path)[:-len('.json')])
+        if summary:
+            profiles.append({key: summary.get(key) for key in ('task_id', 'started_at', 'wall_seconds',
+                                                                'process_peak_traced_bytes')})
+    return profiles
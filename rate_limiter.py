@@ -0,0 +1,248 @@
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+try:
+    from zoneinfo import ZoneInfo
+    PACIFIC = ZoneInfo('America/Los_Angeles')
+except Exception:
+    # No tz database available (e.g. Windows without tzdata); PST is close enough for a quota day
+    PACIFIC = timezone(timedelta(hours=-8))
+
+# YouTube Data API quota costs, in units
+YOUTUBE_COSTS = {
+    'videos.insert': 1600,
+    'videos.update': 50,
+    'channels.list': 1,
+}
+
+# Longest single sleep while waiting, so waiters notice budget changes made by other processes
+MAX_WAIT_STEP = 5.0
+
+
+class RateLimiter:
+    """Token buckets and a daily quota ledger shared by every process through one SQLite file.
+
+    ``acquire`` and ``reserve_daily`` never fail for lack of budget: they block until
+    the bucket has refilled or the quota day has rolled over, so queued work waits
+    instead of erroring halfway through a batch.
+    """
+
+    def __init__(self, path: str = 'quota.db'):
+        self.path = path
+        self._local = threading.local()
+        self._buckets = {}  # name -> (capacity, refill per second)
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS daily_usage (
+                api TEXT NOT NULL,
+                day TEXT NOT NULL,
+                used INTEGER NOT NULL,
+                PRIMARY KEY (api, day)
+            )
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def configure(self, name: str, capacity: float, refill_per_second: float):
+        """Declare a token bucket; it starts full"""
+        self._buckets[name] = (capacity, refill_per_second)
+
+    def _try_take(self, name: str, cost: float) -> float:
+        """Take cost tokens if available; returns 0, or the seconds until they will be"""
+        capacity, rate = self._buckets[name]
+        cost = min(cost, capacity)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / rate if rate > 0 else MAX_WAIT_STEP
+            conn.execute("INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                         (name, tokens, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def acquire(self, name: str, cost: float = 1.0, on_wait: Optional[Callable[[float], None]] = None) -> float:
+        """Block until the bucket holds cost tokens and take them; returns seconds spent waiting"""
+        if name not in self._buckets:
+            return 0.0
+        waited = 0.0
+        while True:
+            wait = self._try_take(name, cost)
+            if wait <= 0:
+                return waited
+            if on_wait:
+                on_wait(wait)
+            step = min(wait, MAX_WAIT_STEP)
+            time.sleep(step)
+            waited += step
+
+    async def acquire_async(self, name: str, cost: float = 1.0,
+                            on_wait: Optional[Callable[[float], None]] = None) -> float:
+        """acquire() for coroutines: the ledger is updated on a worker thread and waits don't block the loop"""
+        if name not in self._buckets:
+            return 0.0
+        waited = 0.0
+        while True:
+            wait = await asyncio.to_thread(self._try_take, name, cost)
+            if wait <= 0:
+                return waited
+            if on_wait:
+                on_wait(wait)
+            step = min(wait, MAX_WAIT_STEP)
+            await asyncio.sleep(step)
+            waited += step
+
+    @staticmethod
+    def quota_day(now: Optional[datetime] = None) -> str:
+        """Current quota day; YouTube quotas reset at midnight Pacific time"""
+        return (now or datetime.now(PACIFIC)).astimezone(PACIFIC).strftime('%Y-%m-%d')
+
+    @staticmethod
+    def seconds_until_reset() -> float:
+        now = datetime.now(PACIFIC)
+        tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return max(1.0, (tomorrow - now).total_seconds())
+
+    def _try_reserve(self, api: str, units: int, daily_budget: int, force: bool = False) -> bool:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            day = self.quota_day()
+            row = conn.execute("SELECT used FROM daily_usage WHERE api = ? AND day = ?", (api, day)).fetchone()
+            used = row[0] if row else 0
+            # A single request bigger than the whole budget can never fit; let it through on a fresh day
+            ok = force or used + units <= daily_budget or (used == 0 and units > daily_budget)
+            if ok:
+                conn.execute("INSERT OR REPLACE INTO daily_usage (api, day, used) VALUES (?, ?, ?)",
+                             (api, day, used + units))
+                conn.execute("DELETE FROM daily_usage WHERE day < ?", (day,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return ok
+
+    def reserve_daily(self, api: str, units: int, daily_budget: int,
+                      on_wait: Optional[Callable[[float], None]] = None, block: bool = True) -> float:
+        """Record units against today's budget, waiting for the next quota day if it is spent.
+
+        With block=False the units are recorded immediately even over budget; use it for
+        cheap calls made while serving a web request.
+        """
+        if not block:
+            self._try_reserve(api, units, daily_budget, force=True)
+            return 0.0
+        waited = 0.0
+        while not self._try_reserve(api, units, daily_budget):
+            wait = self.seconds_until_reset()
+            if on_wait:
+                on_wait(wait)
+            # Re-check periodically in case the budget was raised or the ledger edited
+            step = min(wait, 60.0)
+            time.sleep(step)
+            waited += step
+        return waited
+
+    async def reserve_daily_async(self, api: str, units: int, daily_budget: int,
+                                  on_wait: Optional[Callable[[float], None]] = None) -> float:
+        """reserve_daily() for coroutines, waiting for the quota reset without blocking the loop"""
+        waited = 0.0
+        while not await asyncio.to_thread(self._try_reserve, api, units, daily_budget):
+            wait = self.seconds_until_reset()
+            if on_wait:
+                on_wait(wait)
+            step = min(wait, 60.0)
+            await asyncio.sleep(step)
+            waited += step
+        return waited
+
+    def daily_usage(self, api: str) -> int:
+        row = self._conn().execute(
+            "SELECT used FROM daily_usage WHERE api = ? AND day = ?", (api, self.quota_day())
+        ).fetchone()
+        return row[0] if row else 0
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter with the Gemini buckets configured from the environment"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            limiter = RateLimiter(os.getenv('QUOTA_DB_PATH', 'quota.db'))
+            rpm = float(os.getenv('GEMINI_RPM', '60'))
+            tpm = float(os.getenv('GEMINI_TPM', '1000000'))
+            limiter.configure('gemini_requests', rpm, rpm / 60)
+            limiter.configure('gemini_tokens', tpm, tpm / 60)
+            _limiter = limiter
+        return _limiter
+
+
+def acquire_gemini(estimated_tokens: int, on_wait: Optional[Callable[[float], None]] = None) -> float:
+    """Wait for room under the Gemini requests-per-minute and tokens-per-minute limits"""
+    limiter = get_rate_limiter()
+    waited = limiter.acquire('gemini_requests', 1, on_wait)
+    waited += limiter.acquire('gemini_tokens', estimated_tokens, on_wait)
+    return waited
+
+
+async def acquire_gemini_async(estimated_tokens: int, on_wait: Optional[Callable[[float], None]] = None) -> float:
+    """acquire_gemini() for coroutines"""
+    limiter = get_rate_limiter()
+    waited = await limiter.acquire_async('gemini_requests', 1, on_wait)
+    waited += await limiter.acquire_async('gemini_tokens', estimated_tokens, on_wait)
+    return waited
+
+
+def reserve_youtube_quota(operation: str, on_wait: Optional[Callable[[float], None]] = None,
+                          block: bool = True) -> float:
+    """Charge a YouTube API operation against the daily quota, waiting for the reset if it is spent"""
+    budget = int(os.getenv('YOUTUBE_DAILY_QUOTA', '10000'))
+    return get_rate_limiter().reserve_daily('youtube', YOUTUBE_COSTS[operation], budget, on_wait, block)
+
+
+async def reserve_youtube_quota_async(operation: str, on_wait: Optional[Callable[[float], None]] = None) -> float:
+    """reserve_youtube_quota() for coroutines"""
+    budget = int(os.getenv('YOUTUBE_DAILY_QUOTA', '10000'))
+    return await get_rate_limiter().reserve_daily_async('youtube', YOUTUBE_COSTS[operation], budget, on_wait)
+
+
+def quota_status() -> Dict:
+    """Today's YouTube quota usage"""
+    limiter = get_rate_limiter()
+    return {
+        'youtube_units_used': limiter.daily_usage('youtube'),
+        'youtube_daily_quota': int(os.getenv('YOUTUBE_DAILY_QUOTA', '10000')),
+        'quota_day': limiter.quota_day(),
+    }
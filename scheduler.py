@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no room for another task"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobScheduler:
+    """Fixed-size worker pool with a bounded FIFO queue and per-stage concurrency limits"""
+
+    def __init__(self, max_workers: int = 4, max_queue_size: int = 100,
+                 stage_limits: Optional[Dict[str, int]] = None):
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max(1, max_queue_size)
+        self.stage_limits = dict(stage_limits or {})
+
+        self._pending = deque()
+        self._pending_ids = set()
+        self._running = set()
+        self._cond = threading.Condition()
+        self._stage_semaphores = {
+            name: threading.BoundedSemaphore(max(1, limit))
+            for name, limit in self.stage_limits.items()
+        }
+        self._workers = []
+        self._owner_pid = None
+        # Exponentially weighted average job duration, used for Retry-After hints
+        self._avg_duration = 30.0
+
+    def _ensure_started(self):
+        """Start worker threads on first use (and again after a fork, since threads don't survive it)"""
+        if self._owner_pid == os.getpid():
+            return
+        self._owner_pid = os.getpid()
+        self._workers = []
+        for i in range(self.max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        logger.info(f"Job scheduler started with {self.max_workers} workers (queue size {self.max_queue_size})")
+
+    def submit(self, job_id: str, fn: Callable, *args, **kwargs) -> int:
+        """Queue a job and return its 1-based queue position; raises QueueFullError when full"""
+        with self._cond:
+            self._ensure_started()
+            if len(self._pending) >= self.max_queue_size:
+                raise QueueFullError(self.retry_after())
+            self._pending.append((job_id, fn, args, kwargs))
+            self._pending_ids.add(job_id)
+            self._cond.notify()
+            return len(self._pending)
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """1-based position of a waiting job, or None once it has started (or is unknown)"""
+        with self._cond:
+            if job_id not in self._pending_ids:
+                return None
+            for position, (pending_id, _, _, _) in enumerate(self._pending, start=1):
+                if pending_id == job_id:
+                    return position
+        return None
+
+    def retry_after(self) -> int:
+        """Estimated seconds until a queue slot frees up (one job finishing on any worker)"""
+        return max(1, int(self._avg_duration / self.max_workers))
+
+    @contextmanager
+    def stage(self, name: str):
+        """Hold a slot of the named stage's concurrency limit for the duration of the block"""
+        semaphore = self._stage_semaphores.get(name)
+        if semaphore is None:
+            yield
+            return
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    def stats(self) -> Dict:
+        """Snapshot of queue depth and in-flight jobs"""
+        with self._cond:
+            return {
+                'queued': len(self._pending),
+                'running': len(self._running),
+                'max_workers': self.max_workers,
+                'max_queue_size': self.max_queue_size,
+            }
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                job_id, fn, args, kwargs = self._pending.popleft()
+                self._pending_ids.discard(job_id)
+                self._running.add(job_id)
+
+            started = time.monotonic()
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Job {job_id} raised an unhandled error: {str(e)}")
+            finally:
+                elapsed = time.monotonic() - started
+                with self._cond:
+                    self._running.discard(job_id)
+                    self._avg_duration = 0.8 * self._avg_duration + 0.2 * elapsed
@@ -0,0 +1,42 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class TaskEventBroker:
+    """In-process fan-out of task status changes to Server-Sent Events streams.
+
+    Each task keeps only its latest state plus a version counter, so a slow
+    subscriber skips intermediate updates instead of building a backlog.
+    """
+
+    def __init__(self, max_tasks: int = 10000):
+        self.max_tasks = max_tasks
+        self._cond = threading.Condition()
+        self._latest = OrderedDict()  # task_id -> (version, data)
+
+    def publish(self, task_id: str, data: Dict):
+        """Record a new state for the task and wake up its subscribers"""
+        with self._cond:
+            version = self._latest.pop(task_id, (0, None))[0] + 1
+            self._latest[task_id] = (version, data)
+            while len(self._latest) > self.max_tasks:
+                self._latest.popitem(last=False)
+            self._cond.notify_all()
+
+    def version(self, task_id: str) -> int:
+        """Current version of the task's state (0 if nothing was published yet)"""
+        with self._cond:
+            return self._latest.get(task_id, (0, None))[0]
+
+    def wait(self, task_id: str, after_version: int, timeout: float) -> Optional[Tuple[int, Dict]]:
+        """Block until the task has a state newer than after_version; None on timeout"""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._latest.get(task_id, (0, None))[0] > after_version,
+                timeout=timeout
+            )
+            version, data = self._latest.get(task_id, (0, None))
+            if version > after_version:
+                return version, data
+            return None
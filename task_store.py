@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Task states after which a task can be evicted
+FINISHED_STATUSES = {'completed', 'failed'}
+
+
+class TaskStore(ABC):
+    """Key-value store for task status dicts with TTL/LRU eviction of finished tasks.
+
+    Finished tasks are evicted once they have not been written for ``ttl_seconds``
+    or when more than ``max_finished`` finished tasks are held (least recently
+    updated first). Active tasks are never evicted.
+    """
+
+    def __init__(self, ttl_seconds: float = 86400, max_finished: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_finished = max_finished
+
+    @abstractmethod
+    def get(self, task_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def put(self, task_id: str, data: Dict):
+        ...
+
+    @abstractmethod
+    def update(self, task_id: str, fields: Dict) -> Optional[Dict]:
+        """Merge fields into an existing task; returns the new task dict or None if unknown"""
+
+    @abstractmethod
+    def delete(self, task_id: str):
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def __contains__(self, task_id: str) -> bool:
+        return self.get(task_id) is not None
+
+
+class MemoryTaskStore(TaskStore):
+    """In-process store; lookups are plain dict hits and eviction pops from the front of an OrderedDict"""
+
+    def __init__(self, ttl_seconds: float = 86400, max_finished: int = 1000):
+        super().__init__(ttl_seconds, max_finished)
+        self._lock = threading.Lock()
+        self._tasks = {}
+        # task_id -> last write time, ordered oldest first
+        self._finished = OrderedDict()
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        with self._lock:
+            data = self._tasks.get(task_id)
+            return dict(data) if data is not None else None
+
+    def put(self, task_id: str, data: Dict):
+        with self._lock:
+            self._tasks[task_id] = dict(data)
+            self._track(task_id, data)
+            self._evict()
+
+    def update(self, task_id: str, fields: Dict) -> Optional[Dict]:
+        with self._lock:
+            data = self._tasks.get(task_id)
+            if data is None:
+                return None
+            data.update(fields)
+            self._track(task_id, data)
+            self._evict()
+            return dict(data)
+
+    def delete(self, task_id: str):
+        with self._lock:
+            self._tasks.pop(task_id, None)
+            self._finished.pop(task_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tasks)
+
+    def _track(self, task_id: str, data: Dict):
+        self._finished.pop(task_id, None)
+        if data.get('status') in FINISHED_STATUSES:
+            self._finished[task_id] = time.time()
+
+    def _evict(self):
+        cutoff = time.time() - self.ttl_seconds
+        while self._finished:
+            task_id, touched = next(iter(self._finished.items()))
+            if touched >= cutoff and len(self._finished) <= self.max_finished:
+                break
+            self._finished.popitem(last=False)
+            self._tasks.pop(task_id, None)
+
+
+class SQLiteTaskStore(TaskStore):
+    """Embedded SQLite store in WAL mode, shared by every worker process on the machine"""
+
+    # Run the eviction sweep at most this often
+    EVICT_INTERVAL = 60
+
+    def __init__(self, path: str = 'tasks.db', ttl_seconds: float = 86400, max_finished: int = 1000):
+        super().__init__(ttl_seconds, max_finished)
+        self.path = path
+        self._local = threading.local()
+        self._last_evict = 0.0
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                finished INTEGER NOT NULL DEFAULT 0,
+                touched REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_finished ON tasks (finished, touched)")
+
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread connection, reopened after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, task_id: str) -> Optional[Dict]:
+        row = self._conn().execute("SELECT data FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, task_id: str, data: Dict):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO tasks (task_id, data, finished, touched) VALUES (?, ?, ?, ?)",
+            (task_id, json.dumps(data, default=str), int(data.get('status') in FINISHED_STATUSES), time.time())
+        )
+        self._maybe_evict()
+
+    def update(self, task_id: str, fields: Dict) -> Optional[Dict]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT data FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            data = json.loads(row[0])
+            data.update(fields)
+            conn.execute(
+                "UPDATE tasks SET data = ?, finished = ?, touched = ? WHERE task_id = ?",
+                (json.dumps(data, default=str), int(data.get('status') in FINISHED_STATUSES), time.time(), task_id)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._maybe_evict()
+        return data
+
+    def delete(self, task_id: str):
+        self._conn().execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def _maybe_evict(self):
+        now = time.time()
+        if now - self._last_evict < self.EVICT_INTERVAL:
+            return
+        self._last_evict = now
+        conn = self._conn()
+        conn.execute("DELETE FROM tasks WHERE finished = 1 AND touched < ?", (now - self.ttl_seconds,))
+        conn.execute("""
+            DELETE FROM tasks WHERE task_id IN (
+                SELECT task_id FROM tasks WHERE finished = 1
+                ORDER BY touched DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_finished,))
+
+
+def create_task_store(backend: Optional[str] = None) -> TaskStore:
+    """Build the task store selected by TASK_STORE_BACKEND ('memory' or 'sqlite')"""
+    backend = (backend or os.getenv('TASK_STORE_BACKEND', 'memory')).lower()
+    ttl_seconds = float(os.getenv('TASK_TTL_SECONDS', '86400'))
+    max_finished = int(os.getenv('TASK_STORE_MAX_FINISHED', '1000'))
+
+    if backend == 'sqlite':
+        return SQLiteTaskStore(os.getenv('TASK_STORE_PATH', 'tasks.db'), ttl_seconds, max_finished)
+    if backend == 'memory':
+        return MemoryTaskStore(ttl_seconds, max_finished)
+    raise ValueError(f"Unknown task store backend: {backend}")
@@ -0,0 +1,266 @@
+import os
+import time
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+from lazy_imports import lazy_import
+from ai_genrator import dhash
+from downloader import extract_shortcode, file_sha256
+from metrics import stage_seconds
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+# Frames sampled for the perceptual fingerprint
+FINGERPRINT_FRAMES = 16
+# The fingerprint is split into 4 indexed 16-bit bands: any two fingerprints within
+# 3 bits of each other share at least one band, so a lookup only scans rows that do
+FINGERPRINT_BANDS = 4
+BAND_BITS = 64 // FINGERPRINT_BANDS
+# Fingerprints with fewer set (or unset) bits than this carry too little information to match on
+MIN_FINGERPRINT_BITS = 8
+
+
+def video_fingerprint(video_path: str, num_frames: int = FINGERPRINT_FRAMES) -> Optional[int]:
+    """64-bit perceptual fingerprint: per-bit majority vote over the dHashes of evenly spaced frames.
+
+    Survives re-encoding, rescaling and small crops; returns None for unreadable or
+    featureless (e.g. all-black) videos.
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if frame_count <= 0:
+            return None
+        wanted = {int(frame_count * (i + 0.5) / num_frames) for i in range(num_frames)}
+        votes = np.zeros(64, dtype=np.int32)
+        hashed = 0
+        for index in range(max(wanted) + 1):
+            if not cap.grab():
+                break
+            if index not in wanted:
+                continue
+            ok, frame = cap.retrieve()
+            if not ok:
+                continue
+            frame_hash = dhash(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+            votes += np.unpackbits(np.frombuffer(frame_hash.to_bytes(8, 'big'), dtype=np.uint8))
+            hashed += 1
+    finally:
+        cap.release()
+
+    if not hashed:
+        return None
+    fingerprint = int.from_bytes(np.packbits(votes * 2 > hashed).tobytes(), 'big')
+    ones = bin(fingerprint).count('1')
+    if ones < MIN_FINGERPRINT_BITS or ones > 64 - MIN_FINGERPRINT_BITS:
+        return None
+    return fingerprint
+
+
+def _bands(fingerprint: int):
+    mask = (1 << BAND_BITS) - 1
+    return [(fingerprint >> (BAND_BITS * i)) & mask for i in range(FINGERPRINT_BANDS)]
+
+
+_UPLOADS_TABLE = """
+    CREATE TABLE IF NOT EXISTS uploads (
+        id INTEGER PRIMARY KEY,
+        shortcode TEXT,
+        content_hash TEXT,
+        fingerprint TEXT,
+        band0 INTEGER,
+        band1 INTEGER,
+        band2 INTEGER,
+        band3 INTEGER,
+        video_id TEXT,
+        youtube_url TEXT,
+        reel_url TEXT,
+        task_id TEXT,
+        created_at REAL NOT NULL
+    )
+"""
+
+
+class UploadIndex:
+    """Persistent record of uploaded reels, looked up by shortcode, content hash or fingerprint.
+
+    Lookups by fingerprint find any upload within ``max_distance`` bits (at most 3,
+    the limit the band index guarantees) using only indexed equality matches.
+    A shortcode is reserved (a row without video_id) while its upload runs, so two
+    submissions of the same reel can't both upload it; a reservation older than
+    ``reservation_seconds`` is taken to belong to a task that died.
+    """
+
+    def __init__(self, path: str = 'uploads.db', max_distance: int = 3, reservation_seconds: float = 86400):
+        self.path = path
+        self.max_distance = max(0, min(max_distance, FINGERPRINT_BANDS - 1))
+        self.reservation_seconds = reservation_seconds
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(_UPLOADS_TABLE)
+        columns = [row['name'] for row in conn.execute("PRAGMA table_info(uploads)")]
+        if 'task_id' not in columns:
+            # Indexes written before reservations existed: video_id was NOT NULL and there was no task_id
+            conn.execute("ALTER TABLE uploads RENAME TO uploads_old")
+            conn.execute(_UPLOADS_TABLE)
+            conn.execute(f"INSERT INTO uploads ({', '.join(columns)}) SELECT {', '.join(columns)} FROM uploads_old")
+            conn.execute("DROP TABLE uploads_old")
+        conn.execute("CREATE INDEX IF NOT EXISTS uploads_shortcode ON uploads (shortcode)")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS uploads_reserved_shortcode ON uploads (shortcode)"
+                     " WHERE video_id IS NULL")
+        conn.execute("CREATE INDEX IF NOT EXISTS uploads_content_hash ON uploads (content_hash)")
+        for band in range(FINGERPRINT_BANDS):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS uploads_band{band} ON uploads (band{band})")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def reserve(self, shortcode: str, task_id: str, reel_url: Optional[str] = None) -> Optional[Dict]:
+        """Reserve shortcode for task_id's upload, atomically with the duplicate check.
+
+        Returns None once reserved. Otherwise returns what holds the shortcode: the
+        earlier upload (``match='shortcode'``) or another task's live reservation
+        (``pending=True``).
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            holder = None
+            row = conn.execute(
+                "SELECT * FROM uploads WHERE shortcode = ? AND video_id IS NOT NULL ORDER BY id LIMIT 1", (shortcode,)
+            ).fetchone()
+            if row:
+                holder = dict(row, match='shortcode')
+            else:
+                row = conn.execute("SELECT * FROM uploads WHERE shortcode = ? AND video_id IS NULL",
+                                   (shortcode,)).fetchone()
+                if row and row['task_id'] != task_id and row['created_at'] > time.time() - self.reservation_seconds:
+                    holder = dict(row, pending=True)
+                else:
+                    conn.execute("DELETE FROM uploads WHERE shortcode = ? AND video_id IS NULL", (shortcode,))
+                    conn.execute("INSERT INTO uploads (shortcode, reel_url, task_id, created_at) VALUES (?, ?, ?, ?)",
+                                 (shortcode, reel_url, task_id, time.time()))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return holder
+
+    def release(self, shortcode: str, task_id: str):
+        """Drop task_id's reservation of shortcode if its upload never finished"""
+        self._conn().execute("DELETE FROM uploads WHERE shortcode = ? AND task_id = ? AND video_id IS NULL",
+                             (shortcode, task_id))
+
+    def add(self, video_id: str, youtube_url: str, shortcode: Optional[str] = None,
+            content_hash: Optional[str] = None, fingerprint: Optional[int] = None, reel_url: Optional[str] = None,
+            task_id: Optional[str] = None):
+        """Record a finished upload, completing task_id's reservation of shortcode if it holds one"""
+        bands = _bands(fingerprint) if fingerprint is not None else [None] * FINGERPRINT_BANDS
+        values = (content_hash, None if fingerprint is None else f"{fingerprint:016x}", *bands,
+                  video_id, youtube_url, reel_url, time.time())
+        conn = self._conn()
+        if shortcode and task_id:
+            updated = conn.execute(
+                "UPDATE uploads SET content_hash = ?, fingerprint = ?, band0 = ?, band1 = ?, band2 = ?, band3 = ?,"
+                " video_id = ?, youtube_url = ?, reel_url = ?, created_at = ?"
+                " WHERE shortcode = ? AND task_id = ? AND video_id IS NULL",
+                values + (shortcode, task_id)
+            ).rowcount
+            if updated:
+                return
+        conn.execute(
+            "INSERT INTO uploads (content_hash, fingerprint, band0, band1, band2, band3,"
+            " video_id, youtube_url, reel_url, created_at, shortcode, task_id)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            values + (shortcode, task_id)
+        )
+
+    def find(self, shortcode: Optional[str] = None, content_hash: Optional[str] = None,
+             fingerprint: Optional[int] = None) -> Optional[Dict]:
+        """Earliest upload matching the shortcode, the exact content, or a near-identical fingerprint"""
+        conn = self._conn()
+        for column, value in (('shortcode', shortcode), ('content_hash', content_hash)):
+            if value:
+                row = conn.execute(
+                    f"SELECT * FROM uploads WHERE {column} = ? AND video_id IS NOT NULL ORDER BY id LIMIT 1",
+                    (value,)
+                ).fetchone()
+                if row:
+                    return dict(row, match=column)
+
+        if fingerprint is None:
+            return None
+        bands = _bands(fingerprint)
+        where = ' OR '.join(f"band{i} = ?" for i in range(FINGERPRINT_BANDS))
+        best = None
+        for row in conn.execute(f"SELECT * FROM uploads WHERE {where} ORDER BY id", bands):
+            distance = bin(int(row['fingerprint'], 16) ^ fingerprint).count('1')
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, row)
+        if best is None:
+            return None
+        return dict(best[1], match='fingerprint', distance=best[0])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_upload_index() -> UploadIndex:
+    """Process-wide index configured from UPLOAD_INDEX_PATH / DUPLICATE_MAX_DISTANCE / UPLOAD_RESERVATION_SECONDS"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = UploadIndex(
+                os.getenv('UPLOAD_INDEX_PATH', 'uploads.db'),
+                int(os.getenv('DUPLICATE_MAX_DISTANCE', '3')),
+                float(os.getenv('UPLOAD_RESERVATION_SECONDS', '86400'))
+            )
+        return _index
+
+
+def video_identity(reel_url: str, video_path: str) -> Dict[str, Any]:
+    """Shortcode, content hash and perceptual fingerprint used by the duplicate-upload index"""
+    try:
+        with stage_seconds.time(stage='fingerprint'):
+            fingerprint = video_fingerprint(video_path)
+    except Exception as e:
+        logger.warning(f"Could not fingerprint {video_path}: {str(e)}")
+        fingerprint = None
+    return {
+        'shortcode': extract_shortcode(reel_url),
+        'content_hash': file_sha256(video_path),
+        'fingerprint': fingerprint
+    }
+
+
+def record_upload(reel_url: str, identity: Dict[str, Any], video_id: str, task_id: Optional[str] = None):
+    """Remember a finished upload so the same reel (or a re-encoded copy) isn't uploaded again"""
+    try:
+        get_upload_index().add(video_id, f"https://www.youtube.com/watch?v={video_id}", reel_url=reel_url,
+                               task_id=task_id, **identity)
+    except Exception as e:
+        logger.warning(f"Could not record upload {video_id} in the duplicate index: {str(e)}")
+
+
+def release_reservation(reel_url: str, task_id: str):
+    """Let the reel be submitted again after task_id ended without uploading it"""
+    shortcode = extract_shortcode(reel_url)
+    if not shortcode:
+        return
+    try:
+        get_upload_index().release(shortcode, task_id)
+    except Exception as e:
+        logger.warning(f"Could not release the reservation of {shortcode}: {str(e)}")
@@ -1,255 +1,592 @@
-import os
-import argparse
-import google_auth_oauthlib.flow
-import googleapiclient.discovery
-import googleapiclient.errors
-from googleapiclient.http import MediaFileUpload
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-
-def get_credentials():
-    """Get or refresh YouTube API credentials"""
-    creds = None
-    token_path = 'token.json'
-    
-    # The file token.json stores the user's access and refresh tokens.
-    if os.path.exists(token_path):
-        creds = Credentials.from_authorized_user_file(token_path, 
-            ["https://www.googleapis.com/auth/youtube.upload"])
-    
-    # If there are no (valid) credentials available, let the user log in.
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                print(f"Token refresh failed: {e}")
-                # Delete invalid token and re-authenticate
-                if os.path.exists(token_path):
-                    os.remove(token_path)
-                return None
-        else:
-            return None
-        
-        # Save the credentials for the next run
-        with open(token_path, 'w') as token:
-            token.write(creds.to_json())
-    
-    return creds
-
-def authenticate_youtube():
-    """Authenticate with YouTube API - creates new credentials if needed"""
-    try:
-        scopes = ["https://www.googleapis.com/auth/youtube.upload"]
-        client_secrets_file = "client_secret.json"
-        
-        if not os.path.exists(client_secrets_file):
-            raise Exception("client_secret.json file not found. Please download it from Google Cloud Console.")
-        
-        flow = google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file(
-            client_secrets_file, scopes)
-        
-        # Use run_local_server for web-based auth
-        credentials = flow.run_local_server(
-            port=8080,
-            prompt='consent',
-            authorization_prompt_message='Please visit this URL to authorize the application: {url}',
-            success_message='The auth flow is complete; you may close this window.',
-            open_browser=True
-        )
-        
-        # Save the credentials for the next run
-        with open('token.json', 'w') as token:
-            token.write(credentials.to_json())
-        
-        return credentials
-        
-    except Exception as e:
-        raise Exception(f"Authentication failed: {str(e)}")
-
-def check_authentication():
-    """Check if valid YouTube authentication exists"""
-    try:
-        creds = get_credentials()
-        return creds is not None and creds.valid
-    except Exception:
-        return False
-
-def get_youtube_service():
-    """Get authenticated YouTube service"""
-    creds = get_credentials()
-    if not creds:
-        raise Exception("Not authenticated. Please run authentication first.")
-    
-    return googleapiclient.discovery.build("youtube", "v3", credentials=creds)
-
-def upload_to_youtube(video_path, title, description, tags, privacy_status="unlisted", category_id="22"):
-    """Upload video to YouTube with proper error handling"""
-    try:
-        # Verify file exists and is accessible
-        if not os.path.exists(video_path):
-            raise Exception(f"Video file not found: {video_path}")
-        
-        # Get file size for validation
-        file_size = os.path.getsize(video_path)
-        if file_size == 0:
-            raise Exception("Video file is empty")
-        
-        print(f"Uploading video: {os.path.basename(video_path)} ({file_size / 1024 / 1024:.2f} MB)")
-        print(f"Privacy status: {privacy_status}")
-        
-        # Get YouTube service
-        youtube = get_youtube_service()
-
-        # Prepare video metadata
-        video_metadata = {
-            "snippet": {
-                "title": title[:100],  # YouTube title limit
-                "description": description[:5000],  # YouTube description limit
-                "tags": tags[:500] if isinstance(tags, list) else [],  # YouTube tags limit
-                "categoryId": str(category_id)
-            },
-            "status": {
-                "privacyStatus": privacy_status,
-                "selfDeclaredMadeForKids": False
-            }
-        }
-
-        # Create media upload object
-        media = MediaFileUpload(
-            video_path, 
-            chunksize=1024*1024,  # 1MB chunks
-            resumable=True,
-            mimetype="video/*"
-        )
-
-        # Create upload request
-        request = youtube.videos().insert(
-            part="snippet,status",
-            body=video_metadata,
-            media_body=media
-        )
-
-        # Execute upload with retry logic
-        response = None
-        max_retries = 3
-        retry_count = 0
-        
-        while retry_count < max_retries:
-            try:
-                print(f"Upload attempt {retry_count + 1}/{max_retries}")
-                response = request.execute()
-                break
-            except Exception as upload_error:
-                retry_count += 1
-                if retry_count >= max_retries:
-                    raise upload_error
-                print(f"Upload failed, retrying... Error: {str(upload_error)}")
-        
-        if not response or 'id' not in response:
-            raise Exception("Upload completed but no video ID returned")
-            
-        video_id = response["id"]
-        print(f"✅ Upload successful! Video ID: {video_id}")
-        print(f"🔗 Video URL: https://www.youtube.com/watch?v={video_id}")
-        
-        return video_id
-        
-    except Exception as e:
-        print(f"❌ Upload failed: {str(e)}")
-        raise Exception(f"Failed to upload video: {str(e)}")
-
-def get_channel_info():
-    """Get information about the authenticated YouTube channel"""
-    try:
-        youtube = get_youtube_service()
-        
-        # Call the channels.list method to get the channel info
-        request = youtube.channels().list(
-            part="snippet,statistics",
-            mine=True
-        )
-        response = request.execute()
-        
-        if not response.get('items'):
-            return None
-            
-        channel = response['items'][0]
-        
-        # Extract relevant information
-        channel_info = {
-            'id': channel['id'],
-            'title': channel['snippet']['title'],
-            'description': channel['snippet'].get('description', ''),
-            'thumbnail': channel['snippet']['thumbnails'].get('default', {}).get('url', ''),
-            'subscriberCount': channel['statistics'].get('subscriberCount', '0'),
-            'videoCount': channel['statistics'].get('videoCount', '0'),
-            'viewCount': channel['statistics'].get('viewCount', '0')
-        }
-        
-        return channel_info
-    except Exception as e:
-        print(f"Error getting channel info: {e}")
-        return None
-
-def logout_youtube():
-    """Revoke credentials and log out from YouTube"""
-    token_path = 'token.json'
-    try:
-        if os.path.exists(token_path):
-            creds = Credentials.from_authorized_user_file(token_path)
-            
-            # Revoke the token
-            import google.oauth2.credentials
-            import google.auth.transport.requests
-            import requests
-            
-            transport = google.auth.transport.requests.Request()
-            
-            # Try to revoke the token
-            try:
-                requests.post(
-                    'https://oauth2.googleapis.com/revoke',
-                    params={'token': creds.token},
-                    headers={'content-type': 'application/x-www-form-urlencoded'}
-                )
-            except Exception as e:
-                print(f"Error revoking token: {e}")
-            
-            # Remove the token file
-            os.remove(token_path)
-            return True
-    except Exception as e:
-        print(f"Error during logout: {e}")
-    
-    return False
-
-def main():
-    parser = argparse.ArgumentParser(description='Upload a video to YouTube')
-    parser.add_argument('--video-path', required=True, help='Path to the video file')
-    parser.add_argument('--title', required=True, help='Title of the video')
-    parser.add_argument('--description', default='', help='Description of the video')
-    parser.add_argument('--tags', nargs='*', default=[], help='Tags for the video')
-    parser.add_argument('--privacy', default='unlisted', choices=['private', 'unlisted', 'public'], 
-                      help='Privacy setting (default: unlisted)')
-    
-    args = parser.parse_args()
-    
-    if not os.path.exists(args.video_path):
-        print(f"Error: Video file not found at {args.video_path}")
-        return
-    
-    try:
-        video_id = upload_to_youtube(
-            video_path=args.video_path,
-            title=args.title,
-            description=args.description,
-            tags=args.tags,
-            privacy_status=args.privacy
-        )
-        print(f"Video uploaded successfully! Video ID: {video_id}")
-    except Exception as e:
-        print(f"Error uploading video: {str(e)}")
-
-if __name__ == "__main__":
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from rate_limiter import reserve_youtube_quota, reserve_youtube_quota_async
+from metrics import bytes_transferred, stage_seconds
+from lazy_imports import lazy_import
+
+# The API client and OAuth flow load on first use; checking credentials doesn't need them
+google_auth_oauthlib = lazy_import('google_auth_oauthlib', 'flow')
+googleapiclient = lazy_import('googleapiclient', 'discovery', 'errors', 'http')
+httplib2 = lazy_import('httplib2')
+google_auth_httplib2 = lazy_import('google_auth_httplib2')
+
+# youtube.force-ssl is needed for videos.update (pipelined uploads); tokens granted
+# before it was added keep working for plain uploads until the user re-authenticates
+SCOPES = [
+    "https://www.googleapis.com/auth/youtube.upload",
+    "https://www.googleapis.com/auth/youtube.force-ssl"
+]
+
+# Base URL override for the YouTube Data API, e.g. http://127.0.0.1:8080/
+YOUTUBE_API_ENDPOINT = os.getenv('YOUTUBE_API_ENDPOINT')
+
+class YouTubeClientCache:
+    """Process-wide cache of the YouTube credentials and service object.
+
+    token.json is only re-read when its mtime or size changes, access tokens are
+    refreshed by a background thread shortly before they expire (outside the lock, so
+    requests keep using the current token meanwhile), and the service is built once from the static discovery document bundled with the client library.
+    Each API request gets its own AuthorizedHttp, since httplib2 isn't thread-safe.
+    """
+
+    # Refresh this long before the access token expires
+    REFRESH_MARGIN = 300
+
+    def __init__(self, token_path='token.json'):
+        self.token_path = token_path
+        self._lock = threading.RLock()
+        # Serializes refreshes; taken before self._lock, never while holding it
+        self._refresh_lock = threading.Lock()
+        self._creds = None
+        self._service = None
+        self._token_stat = None
+        self._refresher_pid = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.token_path)
+            return (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def invalidate(self):
+        """Forget cached credentials and service (after login/logout)"""
+        with self._lock:
+            self._creds = None
+            self._service = None
+            self._token_stat = None
+
+    def _save(self, creds):
+        # Web workers and upload workers refresh on their own; replace the file so none reads half a token
+        temp_path = f"{self.token_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w') as token:
+            token.write(creds.to_json())
+        os.replace(temp_path, self.token_path)
+        with self._lock:
+            self._token_stat = self._stat()
+
+    def get_credentials(self):
+        """Valid credentials, or None if the user has to log in"""
+        with self._lock:
+            token_stat = self._stat()
+            if token_stat != self._token_stat:
+                # token.json was written, replaced or removed by someone else
+                self._creds = None
+                self._service = None
+                self._token_stat = token_stat
+                if token_stat is not None:
+                    self._creds = Credentials.from_authorized_user_file(self.token_path)
+            creds = self._creds
+        
+        if creds and not creds.valid:
+            if not self._refresh(creds):
+                return None
+        if creds:
+            self._ensure_refresher()
+        return creds
+
+    def _refresh(self, creds):
+        """Refresh and persist the access token; drops the token file once the refresh token is rejected"""
+        with self._refresh_lock:
+            if not (creds.expired or self._expires_soon(creds)) or not creds.refresh_token:
+                return creds.valid
+            try:
+                creds.refresh(Request())
+            except RefreshError as e:
+                # Revoked or expired refresh token (invalid_grant): the user has to log in again
+                print(f"Token refresh failed: {e}")
+                with self._lock:
+                    if self._creds is creds:
+                        if os.path.exists(self.token_path):
+                            os.remove(self.token_path)
+                        self.invalidate()
+                return False
+            except Exception as e:
+                # Network trouble; keep the token and try again on the next refresh
+                print(f"Token refresh failed, will retry: {e}")
+                return False
+            
+            # Save the credentials for the next run
+            self._save(creds)
+            return True
+
+    def _expires_soon(self, creds):
+        return creds.expiry is not None and (creds.expiry - datetime.utcnow()).total_seconds() < self.REFRESH_MARGIN
+
+    def _ensure_refresher(self):
+        with self._lock:
+            if self._refresher_pid == os.getpid():
+                return
+            self._refresher_pid = os.getpid()
+        threading.Thread(target=self._refresh_loop, name='youtube-token-refresh', daemon=True).start()
+
+    def _refresh_loop(self):
+        while True:
+            with self._lock:
+                creds = self._creds
+            if creds and creds.refresh_token and self._expires_soon(creds):
+                self._refresh(creds)
+            if creds and creds.expiry is not None:
+                wait = (creds.expiry - datetime.utcnow()).total_seconds() - self.REFRESH_MARGIN
+            else:
+                wait = self.REFRESH_MARGIN
+            # A failed refresh leaves the expiry in the past, so it is retried after 30s
+            time.sleep(min(max(wait, 30), self.REFRESH_MARGIN))
+
+    def get_service(self):
+        """Cached YouTube API service bound to the current credentials"""
+        creds = self.get_credentials()
+        if not creds:
+            raise Exception("Not authenticated. Please run authentication first.")
+        
+        with self._lock:
+            if self._service is None:
+                def build_request(http, *args, **kwargs):
+                    request_http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+                    return googleapiclient.http.HttpRequest(request_http, *args, **kwargs)
+                
+                self._service = googleapiclient.discovery.build(
+                    "youtube", "v3",
+                    http=google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http()),
+                    requestBuilder=build_request,
+                    static_discovery=True,
+                    # Alternative endpoint (a proxy, or the local stand-in used by the benchmarks)
+                    client_options={'api_endpoint': YOUTUBE_API_ENDPOINT} if YOUTUBE_API_ENDPOINT else None
+                )
+            return self._service
+
+_client_cache = YouTubeClientCache()
+
+def get_credentials():
+    """Get or refresh YouTube API credentials"""
+    return _client_cache.get_credentials()
+
+def authenticate_youtube():
+    """Authenticate with YouTube API - creates new credentials if needed"""
+    try:
+        scopes = SCOPES
+        client_secrets_file = "client_secret.json"
+        
+        if not os.path.exists(client_secrets_file):
+            raise Exception("client_secret.json file not found. Please download it from Google Cloud Console.")
+        
+        flow = google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file(
+            client_secrets_file, scopes)
+        
+        # Use run_local_server for web-based auth
+        credentials = flow.run_local_server(
+            port=8080,
+            prompt='consent',
+            authorization_prompt_message='Please visit this URL to authorize the application: {url}',
+            success_message='The auth flow is complete; you may close this window.',
+            open_browser=True
+        )
+        
+        # Save the credentials for the next run
+        _client_cache._save(credentials)
+        _client_cache.invalidate()
+        
+        return credentials
+        
+    except Exception as e:
+        raise Exception(f"Authentication failed: {str(e)}")
+
+def check_authentication():
+    """Check if valid YouTube authentication exists"""
+    try:
+        creds = get_credentials()
+        return creds is not None and creds.valid
+    except Exception:
+        return False
+
+def get_youtube_service():
+    """Get authenticated YouTube service"""
+    return _client_cache.get_service()
+
+class UploadSessionStore:
+    """Persists resumable upload session URIs so an interrupted upload survives a restart.
+
+    Sessions are keyed by file identity and metadata, and forgotten after
+    SESSION_MAX_AGE (YouTube expires them after about a week). They live in SQLite
+    (WAL), so web workers and upload workers can save sessions side by side.
+    """
+
+    SESSION_MAX_AGE = 6 * 86400
+
+    def __init__(self, path='upload_sessions.db'):
+        self.path = path
+        self._local = threading.local()
+
+    @staticmethod
+    def make_key(video_path, body):
+        st = os.stat(video_path)
+        identity = json.dumps([os.path.abspath(video_path), st.st_size, st.st_mtime_ns, body], sort_keys=True)
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    def _conn(self):
+        # The file is only created once an upload needs it
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS upload_sessions ("
+                " key TEXT PRIMARY KEY, resumable_uri TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT resumable_uri FROM upload_sessions WHERE key = ? AND created_at > ?",
+            (key, time.time() - self.SESSION_MAX_AGE)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, resumable_uri):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO upload_sessions (key, resumable_uri, created_at) VALUES (?, ?, ?)",
+                     (key, resumable_uri, now))
+        conn.execute("DELETE FROM upload_sessions WHERE created_at <= ?", (now - self.SESSION_MAX_AGE,))
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM upload_sessions WHERE key = ?", (key,))
+
+upload_sessions = UploadSessionStore(os.getenv('UPLOAD_SESSIONS_PATH', 'upload_sessions.db'))
+
+# Chunk sizes must be multiples of 256 KB; start at 4 MB and adapt to the measured throughput
+CHUNK_UNIT = 256 * 1024
+INITIAL_CHUNK_SIZE = 4 * 1024 * 1024
+MIN_CHUNK_SIZE = 1024 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+# Grow chunks that finish faster than this, shrink ones slower than the upper bound (seconds)
+TARGET_CHUNK_SECONDS = (2, 10)
+
+MAX_UPLOAD_RETRIES = 8
+MAX_BACKOFF_SECONDS = 64
+RETRIABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+# Plus httplib2.HttpLib2Error, added where it's caught so httplib2 isn't imported up front
+RETRIABLE_EXCEPTIONS = (IOError, ConnectionError, TimeoutError)
+
+def build_video_metadata(title, description, tags, privacy_status="unlisted", category_id="22"):
+    """videos.insert / videos.update body for the snippet and status parts"""
+    return {
+        "snippet": {
+            "title": title[:100],  # YouTube title limit
+            "description": description[:5000],  # YouTube description limit
+            "tags": tags[:500] if isinstance(tags, list) else [],  # YouTube tags limit
+            "categoryId": str(category_id)
+        },
+        "status": {
+            "privacyStatus": privacy_status,
+            "selfDeclaredMadeForKids": False
+        }
+    }
+
+def _backoff(retry):
+    """Exponential backoff with full jitter"""
+    delay = random.uniform(0, min(MAX_BACKOFF_SECONDS, 2 ** retry))
+    print(f"Retrying upload chunk in {delay:.1f}s (retry {retry}/{MAX_UPLOAD_RETRIES})")
+    time.sleep(delay)
+
+def upload_to_youtube(video_path, title, description, tags, privacy_status="unlisted", category_id="22",
+                      progress_callback=None, on_quota_wait=None):
+    """Upload video to YouTube with proper error handling.
+
+    Drives the resumable upload chunk by chunk: 5xx/429 responses and network errors
+    are retried with exponential backoff and jitter, progress is reported through
+    progress_callback(bytes_sent, total_bytes), and the session URI is persisted so a
+    later call for the same file and metadata resumes from the last acknowledged byte.
+    When today's YouTube quota is spent, waits for the reset (calling on_quota_wait(seconds)).
+    """
+    try:
+        upload = _prepare_upload(video_path, title, description, tags, privacy_status, category_id)
+        
+        # A resumed session was already charged when it was started
+        if not upload_sessions.get(upload['session_key']):
+            reserve_youtube_quota('videos.insert', on_quota_wait)
+        
+        return _finish_upload(upload, progress_callback)
+        
+    except Exception as e:
+        print(f"❌ Upload failed: {str(e)}")
+        raise Exception(f"Failed to upload video: {str(e)}")
+
+async def upload_to_youtube_async(video_path, title, description, tags, privacy_status="unlisted", category_id="22",
+                                  progress_callback=None, on_quota_wait=None):
+    """upload_to_youtube() for coroutines.
+
+    Only the quota wait, which can last until the daily reset, stays on the event
+    loop. The chunked upload runs on a worker thread through the same client
+    library code as upload_to_youtube(), so progress_callback is called from there.
+    """
+    try:
+        upload = await asyncio.to_thread(_prepare_upload, video_path, title, description, tags,
+                                         privacy_status, category_id)
+        
+        # A resumed session was already charged when it was started
+        if not await asyncio.to_thread(upload_sessions.get, upload['session_key']):
+            await reserve_youtube_quota_async('videos.insert', on_quota_wait)
+        
+        return await asyncio.to_thread(_finish_upload, upload, progress_callback)
+        
+    except Exception as e:
+        print(f"❌ Upload failed: {str(e)}")
+        raise Exception(f"Failed to upload video: {str(e)}")
+
+def _prepare_upload(video_path, title, description, tags, privacy_status, category_id):
+    """Check the file and credentials and build the request body; returns what _finish_upload needs"""
+    # Verify file exists and is accessible
+    if not os.path.exists(video_path):
+        raise Exception(f"Video file not found: {video_path}")
+    
+    # Get file size for validation
+    file_size = os.path.getsize(video_path)
+    if file_size == 0:
+        raise Exception("Video file is empty")
+    
+    print(f"Uploading video: {os.path.basename(video_path)} ({file_size / 1024 / 1024:.2f} MB)")
+    print(f"Privacy status: {privacy_status}")
+    
+    # Get YouTube service
+    youtube = get_youtube_service()
+    
+    # Prepare video metadata
+    video_metadata = build_video_metadata(title, description, tags, privacy_status, category_id)
+    
+    return {
+        'youtube': youtube,
+        'video_path': video_path,
+        'video_metadata': video_metadata,
+        'session_key': UploadSessionStore.make_key(video_path, video_metadata),
+        'file_size': file_size,
+    }
+
+def _finish_upload(upload, progress_callback):
+    """Run the resumable upload prepared by _prepare_upload, once its quota is reserved; returns the video id"""
+    response = None
+    with stage_seconds.time(stage='upload'):
+        while response is None:
+            response = _run_resumable_upload(upload['youtube'], upload['video_path'], upload['video_metadata'],
+                                             upload['session_key'], upload['file_size'], progress_callback)
+    
+    upload_sessions.delete(upload['session_key'])
+    
+    if 'id' not in response:
+        raise Exception("Upload completed but no video ID returned")
+        
+    video_id = response["id"]
+    print(f"✅ Upload successful! Video ID: {video_id}")
+    print(f"🔗 Video URL: https://www.youtube.com/watch?v={video_id}")
+    
+    return video_id
+
+def _run_resumable_upload(youtube, video_path, video_metadata, session_key, file_size, progress_callback):
+    """Upload chunks until done; returns the API response, or None if the saved session expired and must restart"""
+    # Create media upload object
+    media = googleapiclient.http.MediaFileUpload(
+        video_path,
+        chunksize=INITIAL_CHUNK_SIZE,
+        resumable=True,
+        mimetype="video/*"
+    )
+
+    # Create upload request
+    request = youtube.videos().insert(
+        part="snippet,status",
+        body=video_metadata,
+        media_body=media
+    )
+
+    saved_uri = upload_sessions.get(session_key)
+    # Bytes the server had acknowledged at the last check; unknown until it answers a resumed session
+    acknowledged = 0
+    if saved_uri:
+        # Ask the server how much it already has before sending anything
+        print("Resuming previous upload session")
+        request.resumable_uri = saved_uri
+        request._in_error_state = True
+        acknowledged = None
+
+    retry = 0
+    while True:
+        chunk_started = time.monotonic()
+        try:
+            status, response = request.next_chunk()
+        except googleapiclient.errors.HttpError as e:
+            if e.resp.status in (404, 410) and saved_uri:
+                print("Saved upload session expired, starting a new one")
+                upload_sessions.delete(session_key)
+                return None
+            if e.resp.status not in RETRIABLE_STATUS_CODES or retry >= MAX_UPLOAD_RETRIES:
+                raise
+            retry += 1
+            _backoff(retry)
+            continue
+        except (httplib2.HttpLib2Error,) + RETRIABLE_EXCEPTIONS as e:
+            if retry >= MAX_UPLOAD_RETRIES:
+                raise
+            print(f"Upload chunk failed: {e}")
+            if request.resumable_uri:
+                # Resync with the server's view of how many bytes arrived
+                request._in_error_state = True
+            retry += 1
+            _backoff(retry)
+            continue
+
+        retry = 0
+        if request.resumable_uri and request.resumable_uri != saved_uri:
+            upload_sessions.put(session_key, request.resumable_uri)
+            saved_uri = request.resumable_uri
+
+        progress = file_size if response is not None else (status.resumable_progress if status else None)
+        if progress is not None:
+            if acknowledged is not None and progress > acknowledged:
+                bytes_transferred.inc(progress - acknowledged, direction='upload')
+            acknowledged = progress
+
+        if response is not None:
+            if progress_callback:
+                progress_callback(file_size, file_size)
+            return response
+
+        if status and progress_callback:
+            progress_callback(status.resumable_progress, file_size)
+
+        # Grow chunks on fast links and shrink them on slow ones
+        elapsed = time.monotonic() - chunk_started
+        if elapsed < TARGET_CHUNK_SECONDS[0]:
+            media._chunksize = min(media._chunksize * 2, MAX_CHUNK_SIZE)
+        elif elapsed > TARGET_CHUNK_SECONDS[1]:
+            media._chunksize = max(media._chunksize // 2 // CHUNK_UNIT * CHUNK_UNIT, MIN_CHUNK_SIZE)
+
+def update_video_metadata(video_id, title, description, tags, privacy_status="unlisted", category_id="22"):
+    """Replace the snippet and privacy status of an already uploaded video"""
+    try:
+        youtube = get_youtube_service()
+        reserve_youtube_quota('videos.update')
+        
+        video_metadata = {"id": video_id, **build_video_metadata(title, description, tags, privacy_status, category_id)}
+        
+        response = youtube.videos().update(
+            part="snippet,status",
+            body=video_metadata
+        ).execute()
+        
+        print(f"✅ Metadata updated for video {video_id}")
+        return response
+        
+    except Exception as e:
+        print(f"❌ Metadata update failed: {str(e)}")
+        raise Exception(f"Failed to update video metadata: {str(e)}")
+
+def get_channel_info():
+    """Get information about the authenticated YouTube channel"""
+    try:
+        youtube = get_youtube_service()
+        # Served to the web UI, so count it but never wait on the quota here
+        reserve_youtube_quota('channels.list', block=False)
+        
+        # Call the channels.list method to get the channel info
+        request = youtube.channels().list(
+            part="snippet,statistics",
+            mine=True
+        )
+        response = request.execute()
+        
+        if not response.get('items'):
+            return None
+            
+        channel = response['items'][0]
+        
+        # Extract relevant information
+        channel_info = {
+            'id': channel['id'],
+            'title': channel['snippet']['title'],
+            'description': channel['snippet'].get('description', ''),
+            'thumbnail': channel['snippet']['thumbnails'].get('default', {}).get('url', ''),
+            'subscriberCount': channel['statistics'].get('subscriberCount', '0'),
+            'videoCount': channel['statistics'].get('videoCount', '0'),
+            'viewCount': channel['statistics'].get('viewCount', '0')
+        }
+        
+        return channel_info
+    except Exception as e:
+        print(f"Error getting channel info: {e}")
+        return None
+
+def logout_youtube():
+    """Revoke credentials and log out from YouTube"""
+    token_path = 'token.json'
+    try:
+        if os.path.exists(token_path):
+            creds = Credentials.from_authorized_user_file(token_path)
+            
+            # Revoke the token
+            import google.oauth2.credentials
+            import google.auth.transport.requests
+            import requests
+            
+            transport = google.auth.transport.requests.Request()
+            
+            # Try to revoke the token
+            try:
+                requests.post(
+                    'https://oauth2.googleapis.com/revoke',
+                    params={'token': creds.token},
+                    headers={'content-type': 'application/x-www-form-urlencoded'}
+                )
+            except Exception as e:
+                print(f"Error revoking token: {e}")
+            
+            # Remove the token file
+            os.remove(token_path)
+            _client_cache.invalidate()
+            return True
+    except Exception as e:
+        print(f"Error during logout: {e}")
+    
+    return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Upload a video to YouTube')
+    parser.add_argument('--video-path', required=True, help='Path to the video file')
+    parser.add_argument('--title', required=True, help='Title of the video')
+    parser.add_argument('--description', default='', help='Description of the video')
+    parser.add_argument('--tags', nargs='*', default=[], help='Tags for the video')
+    parser.add_argument('--privacy', default='unlisted', choices=['private', 'unlisted', 'public'], 
+                      help='Privacy setting (default: unlisted)')
+    
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.video_path):
+        print(f"Error: Video file not found at {args.video_path}")
+        return
+    
+    try:
+        video_id = upload_to_youtube(
+            video_path=args.video_path,
+            title=args.title,
+            description=args.description,
+            tags=args.tags,
+            privacy_status=args.privacy
+        )
+        print(f"Video uploaded successfully! Video ID: {video_id}")
+    except Exception as e:
+        print(f"Error uploading video: {str(e)}")
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,182 @@
+import os
+import sys
+import time
+import socket
+import signal
+import logging
+import argparse
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+import app as web
+import metrics
+from job_queue import JobQueue, get_job_queue
+from upload_index import release_reservation
+
+logger = logging.getLogger('worker')
+
+# How long an idle worker waits before polling the queue again
+JOB_POLL_SECONDS = float(os.getenv('JOB_POLL_SECONDS', '1'))
+# Where the worker serves its own /metrics (stage timings, Gemini calls, bytes moved); 0 disables
+WORKER_METRICS_PORT = int(os.getenv('WORKER_METRICS_PORT', '9200'))
+
+
+class Worker:
+    """Runs upload jobs from the durable queue, up to ``concurrency`` at a time.
+
+    Jobs run background_upload_task on a thread pool, or as coroutines on the event
+    loop with PIPELINE_MODE=async. Progress is written to the shared task store,
+    where the web process serves it from /task-status and /task-events. Leases on
+    running jobs are renewed in the background, so jobs of a worker that dies are
+    picked up again by another one.
+    """
+
+    def __init__(self, concurrency: int, queue: JobQueue = None, poll_seconds: float = JOB_POLL_SECONDS):
+        self.concurrency = max(1, concurrency)
+        self.queue = queue or get_job_queue()
+        self.poll_seconds = poll_seconds
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._lock = threading.Lock()
+        self._running: Dict[int, Future] = {}
+        self._stop = threading.Event()
+        self._executor = None
+        if web.PIPELINE_MODE != 'async':
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='job')
+        metrics.register_gauge('reel_worker_jobs_running', 'Jobs this worker process is running',
+                               lambda: len(self._running))
+
+    def run(self):
+        """Claim and run jobs until stop() is called, then wait for the running ones"""
+        logger.info(f"Worker {self.name} started: {self.concurrency} concurrent jobs "
+                    f"({web.PIPELINE_MODE} pipeline), queue {self.queue.path}")
+        threading.Thread(target=self._heartbeat_loop, name='job-heartbeat', daemon=True).start()
+        next_reap = 0.0
+        while not self._stop.is_set():
+            if time.monotonic() >= next_reap:
+                self._fail_abandoned()
+                next_reap = time.monotonic() + self.queue.lease_seconds / 2
+            if not self._slots.acquire(timeout=self.poll_seconds):
+                continue
+            job = self.queue.claim(self.name)
+            if job is None:
+                self._slots.release()
+                self._stop.wait(self.poll_seconds)
+                continue
+            self._start(job)
+
+        with self._lock:
+            running = list(self._running.values())
+        if running:
+            logger.info(f"Waiting for {len(running)} running job(s) to finish")
+        for future in running:
+            try:
+                future.result()
+            except Exception:
+                pass
+        if self._executor:
+            self._executor.shutdown(wait=True)
+        logger.info(f"Worker {self.name} stopped")
+
+    def stop(self, *_):
+        """Stop claiming jobs; a second call exits at once, leaving running jobs to be retried elsewhere"""
+        if self._stop.is_set():
+            logger.warning("Exiting without waiting; unfinished jobs are retried once their lease runs out")
+            os._exit(1)
+        logger.info("Stopping: finishing running jobs (signal again to exit now)")
+        self._stop.set()
+
+    def _start(self, job: Dict):
+        task_id, payload = job['task_id'], job['payload']
+        logger.info(f"Job {job['id']}: task {task_id} (attempt {job['attempt']}/{self.queue.max_attempts})")
+        options = {
+            'use_metadata_cache': payload.get('use_metadata_cache', True),
+            'skip_duplicates': payload.get('skip_duplicates', True),
+        }
+        try:
+            if self._executor is None:
+                future = web.get_event_loop_runner().submit(
+                    web.async_background_upload_task(task_id, payload['reel_url'], **options)
+                )
+            else:
+                target = web.profiled_upload_task if payload.get('profile') else web.background_upload_task
+                future = self._executor.submit(target, task_id, payload['reel_url'],
+                                               pipelined=payload.get('pipelined'), **options)
+        except Exception as e:
+            # Lease stays in place and runs out, so the job is retried later
+            logger.error(f"Job {job['id']} could not be started: {str(e)}")
+            self._slots.release()
+            return
+        with self._lock:
+            self._running[job['id']] = future
+        future.add_done_callback(lambda done, job_id=job['id']: self._finished(job_id, done))
+
+    def _finished(self, job_id: int, future: Future):
+        try:
+            if future.exception() is not None:
+                logger.error(f"Job {job_id} raised an unhandled error: {str(future.exception())}")
+            self.queue.complete(job_id)
+        except Exception as e:
+            logger.error(f"Could not mark job {job_id} complete: {str(e)}")
+        finally:
+            with self._lock:
+                self._running.pop(job_id, None)
+            self._slots.release()
+
+    def _heartbeat_loop(self):
+        while True:
+            time.sleep(self.queue.lease_seconds / 3)
+            with self._lock:
+                job_ids = list(self._running)
+            try:
+                self.queue.heartbeat(job_ids, self.name)
+            except Exception as e:
+                logger.warning(f"Job lease heartbeat failed: {str(e)}")
+
+    def _fail_abandoned(self):
+        """Fail the tasks of jobs whose workers kept dying on them"""
+        for job in self.queue.reap():
+            error = f"Gave up after {self.queue.max_attempts} attempts: the worker stopped while processing this task"
+            web.update_task_status(job['task_id'], 'failed', error, error=error)
+            if job['payload'].get('skip_duplicates', True):
+                release_reservation(job['payload']['reel_url'], job['task_id'])
+
+
+def main():
+    default_concurrency = os.getenv('WORKER_CONCURRENCY') or (
+        os.getenv('ASYNC_MAX_TASKS', '1000') if web.PIPELINE_MODE == 'async' else os.getenv('WORKER_POOL_SIZE', '4')
+    )
+    parser = argparse.ArgumentParser(description='Run queued reel uploads outside the web process')
+    parser.add_argument('--concurrency', type=int, default=int(default_concurrency),
+                        help='Jobs run at once (default: WORKER_CONCURRENCY, else WORKER_POOL_SIZE, '
+                             'or ASYNC_MAX_TASKS with PIPELINE_MODE=async)')
+    parser.add_argument('--metrics-port', type=int, default=WORKER_METRICS_PORT,
+                        help='Port serving this worker\'s /metrics; give each worker on a machine its own '
+                             '(default: WORKER_METRICS_PORT or 9200, 0 disables)')
+    args = parser.parse_args()
+
+    if os.getenv('TASK_STORE_BACKEND', 'memory').lower() != 'sqlite':
+        print("❌ The worker reports progress through the task store; set TASK_STORE_BACKEND=sqlite "
+              "(with the same TASK_STORE_PATH as the web process)", file=sys.stderr)
+        sys.exit(2)
+
+    web.warm_up()
+    worker = Worker(args.concurrency)
+    if args.metrics_port:
+        try:
+            metrics.start_http_server(args.metrics_port)
+            logger.info(f"Serving worker metrics on :{args.metrics_port}/metrics")
+        except OSError as e:
+            logger.warning(f"Could not serve worker metrics on port {args.metrics_port}: {str(e)}")
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == '__main__':
+    main()